@@ -3,15 +3,21 @@
 import asyncio
 import logging
 import sys
+from pathlib import Path
 
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 
 from bot.handlers import initialize_media_handlers, router
+from bot.outbound_limiter import OutboundRateLimiter
+from core.http_client import close_http_client
+from core.image_pool import shutdown_image_executor
 from core.logging_config import setup_logging
+from core.message_processor import get_unified_processor
 from core.persistence import close_database, initialize_database, initialize_migrations
 from core.service_registry import initialize_services
+from core.temp_files import run_temp_sweeper
 
 # Import version utilities
 from core.version_info import format_version_info
@@ -64,6 +70,13 @@ async def main() -> None:
         token=settings.telegram_bot_token,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML),
     )
+    bot.session.middleware(
+        OutboundRateLimiter(
+            global_rate=settings.telegram_global_rate_limit,
+            chat_rate=settings.telegram_chat_rate_limit,
+            chat_burst=settings.telegram_chat_burst,
+        )
+    )
 
     # Set global bot instance
     from core.bot_instance import set_bot_instance
@@ -78,6 +91,9 @@ async def main() -> None:
 
     logger.info("Bot initialized successfully")
 
+    # Remove temporary media files left behind by failed or interrupted requests
+    temp_sweeper = asyncio.create_task(run_temp_sweeper(Path(settings.temp_dir)))
+
     try:
         # Start polling
         logger.info("Starting bot polling...")
@@ -85,8 +101,12 @@ async def main() -> None:
     except Exception:
         logger.exception("Error during bot polling")
     finally:
+        temp_sweeper.cancel()
         await bot.session.close()
+        await get_unified_processor().flush_pending_saves()
         await close_database()
+        shutdown_image_executor()
+        await close_http_client()
         logger.info("Bot stopped")
 
 
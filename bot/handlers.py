@@ -1,7 +1,8 @@
 """Telegram bot handlers for Easy Lessons Bot."""
 
 import logging
-from typing import Optional
+from collections.abc import Awaitable, Callable
+from typing import Any, Optional
 
 from aiogram import Router
 from aiogram.filters import Command
@@ -14,6 +15,8 @@ from core.thinking_messages import get_random_thinking_message
 from core.message_processor import get_unified_processor
 from core.formatting.telegram_formatter import TelegramFormatter
 from bot.media_handlers import MediaHandlers
+from bot.streaming_reply import StreamingReply
+from settings.config import get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -58,6 +61,32 @@ async def version_command(message: Message) -> None:
         await message.answer("❌ Не удалось получить информацию о версии.")
 
 
+async def _process_message(
+    message: Message, message_type: str
+) -> tuple[Optional[str], Callable[..., Awaitable[Any]]]:
+    """
+    Run message through unified processor, streaming the reply if enabled.
+
+    Args:
+        message: Incoming Telegram message
+        message_type: Type of message ('text', 'voice', 'photo', 'document')
+
+    Returns:
+        Response text and the function to send the final reply with
+    """
+    processor = get_unified_processor()
+    if not get_settings().llm_streaming_enabled:
+        return await processor.process_message(message, message_type), message.answer
+
+    # Show the reply as it is generated, then format it in place
+    streaming_reply = StreamingReply(message)
+    response_text = await processor.process_message(
+        message, message_type, on_partial=streaming_reply.update
+    )
+    send = streaming_reply.finish if streaming_reply.started else message.answer
+    return response_text, send
+
+
 @router.message(lambda message: message.text is not None)
 async def handle_text_message(message: Message) -> None:
     """Handle text messages from users."""
@@ -67,20 +96,19 @@ async def handle_text_message(message: Message) -> None:
     logger.info("💬 Received text message from user %s: %s", chat_id, user_text[:50])
 
     # Use unified message processor
-    processor = get_unified_processor()
-    response_text = await processor.process_message(message, "text")
+    response_text, send = await _process_message(message, "text")
     
     if response_text:
         # Apply Telegram formatting
         formatted_text = telegram_formatter.format_message(response_text)
         
         try:
-            await message.answer(formatted_text, parse_mode="HTML")
+            await send(formatted_text, parse_mode="HTML")
             logger.info("Sent formatted LLM response to user %s", chat_id)
         except Exception as e:
             # Fallback to plain text if HTML parsing fails
             logger.warning("HTML formatting failed, sending plain text: %s", e)
-            await message.answer(response_text)
+            await send(response_text)
     else:
         await message.answer("Извините, произошла ошибка при обработке сообщения.")
 
@@ -107,20 +135,19 @@ async def handle_voice_message(message: Message) -> None:
                 message.voice.duration if message.voice else "None")
 
     # Use unified message processor
-    processor = get_unified_processor()
-    response_text = await processor.process_message(message, "voice")
+    response_text, send = await _process_message(message, "voice")
     
     if response_text:
         # Apply Telegram formatting
         formatted_text = telegram_formatter.format_message(response_text)
         
         try:
-            await message.answer(formatted_text, parse_mode="HTML")
+            await send(formatted_text, parse_mode="HTML")
             logger.info("Sent formatted voice response to user %s", chat_id)
         except Exception as e:
             # Fallback to plain text if HTML parsing fails
             logger.warning("HTML formatting failed for voice message, sending plain text: %s", e)
-            await message.answer(response_text)
+            await send(response_text)
     else:
         await message.answer("Извините, не удалось обработать голосовое сообщение.")
 
@@ -137,20 +164,19 @@ async def handle_photo_message(message: Message) -> None:
     logger.info("Sent thinking message to user %s: %s", chat_id, thinking_message)
 
     # Use unified message processor
-    processor = get_unified_processor()
-    response_text = await processor.process_message(message, "photo")
+    response_text, send = await _process_message(message, "photo")
     
     if response_text:
         # Apply Telegram formatting
         formatted_text = telegram_formatter.format_message(response_text)
         
         try:
-            await message.answer(formatted_text, parse_mode="HTML")
+            await send(formatted_text, parse_mode="HTML")
             logger.info("Sent formatted photo response to user %s", chat_id)
         except Exception as e:
             # Fallback to plain text if HTML parsing fails
             logger.warning("HTML formatting failed for photo message, sending plain text: %s", e)
-            await message.answer(response_text)
+            await send(response_text)
     else:
         await message.answer("Извините, не удалось обработать изображение.")
 
@@ -162,20 +188,19 @@ async def handle_document_message(message: Message) -> None:
     logger.info("📄 Received document message from user %s", chat_id)
 
     # Use unified message processor
-    processor = get_unified_processor()
-    response_text = await processor.process_message(message, "document")
+    response_text, send = await _process_message(message, "document")
     
     if response_text:
         # Apply Telegram formatting
         formatted_text = telegram_formatter.format_message(response_text)
         
         try:
-            await message.answer(formatted_text, parse_mode="HTML")
+            await send(formatted_text, parse_mode="HTML")
             logger.info("Sent formatted document response to user %s", chat_id)
         except Exception as e:
             # Fallback to plain text if HTML parsing fails
             logger.warning("HTML formatting failed for document message, sending plain text: %s", e)
-            await message.answer(response_text)
+            await send(response_text)
     else:
         await message.answer("Извините, не удалось обработать документ.")
 
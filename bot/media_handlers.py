@@ -9,8 +9,9 @@ from aiogram.fsm.context import FSMContext
 from core.audio_handler import AudioHandler
 from core.context_matcher import ContextMatcher
 from core.image_analyzer import ImageAnalyzer
+from core.image_processor import SUPPORTED_IMAGE_MIME_TYPES
 from core.media_processor import MediaProcessor
-from core.session_state import SessionManager
+from core.session_state import get_session_manager
 from settings.config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -22,11 +23,17 @@ class MediaHandlers:
     def __init__(self, bot: Optional[Bot] = None):
         """Initialize media handlers."""
         self.settings = get_settings()
-        self.media_processor = MediaProcessor(bot)
         self.audio_handler = AudioHandler()
         self.image_analyzer = ImageAnalyzer()
+        # Share API clients with the processor instead of creating a second set
+        self.media_processor = MediaProcessor(
+            bot,
+            audio_handler=self.audio_handler,
+            image_analyzer=self.image_analyzer,
+        )
         self.context_matcher = ContextMatcher()
-        self.session_manager = SessionManager()
+        # Shared manager, so media handlers reuse sessions already in memory
+        self.session_manager = get_session_manager()
 
     async def handle_voice_message(
         self, message: types.Message, state: FSMContext
@@ -43,7 +50,7 @@ class MediaHandlers:
         """
         try:
             chat_id = str(message.chat.id)
-            logger.info(f"Processing voice message from chat {chat_id}")
+            logger.info("Processing voice message from chat %s", chat_id)
 
             # Get current session context
             session = await self.session_manager.get_session(chat_id)
@@ -55,10 +62,12 @@ class MediaHandlers:
                 file_type="voice",
                 chat_id=chat_id,
                 session_context=session_context,
+                # Intent is analyzed below
+                analyze_intent=False,
             )
 
             if "error" in result:
-                logger.error(f"Media processing error: {result['error']}")
+                logger.error("Media processing error: %s", result['error'])
                 return f"Извините, не удалось обработать голосовое сообщение: {result['error']}"
 
             # Analyze intent from transcript
@@ -87,7 +96,7 @@ class MediaHandlers:
             return response
 
         except Exception as e:
-            logger.error(f"Error handling voice message: {e}", exc_info=True)
+            logger.error("Error handling voice message: %s", e, exc_info=True)
             return "Извините, произошла ошибка при обработке голосового сообщения."
 
     async def handle_photo_message(
@@ -105,7 +114,7 @@ class MediaHandlers:
         """
         try:
             chat_id = str(message.chat.id)
-            logger.info(f"Processing photo message from chat {chat_id}")
+            logger.info("Processing photo message from chat %s", chat_id)
 
             # Get current session context
             session = await self.session_manager.get_session(chat_id)
@@ -125,7 +134,7 @@ class MediaHandlers:
             )
 
             if "error" in result:
-                logger.error(f"Media processing error: {result['error']}")
+                logger.error("Media processing error: %s", result['error'])
                 return f"Извините, не удалось обработать изображение: {result['error']}"
 
             # Match with context
@@ -150,7 +159,7 @@ class MediaHandlers:
             return response
 
         except Exception as e:
-            logger.error(f"Error handling photo message: {e}", exc_info=True)
+            logger.error("Error handling photo message: %s", e, exc_info=True)
             return "Извините, произошла ошибка при обработке изображения."
 
     async def handle_document_message(
@@ -171,8 +180,8 @@ class MediaHandlers:
             document = message.document
 
             # Check if it's an image document
-            if document.mime_type and document.mime_type.startswith("image/"):
-                logger.info(f"Processing image document from chat {chat_id}")
+            if document.mime_type in SUPPORTED_IMAGE_MIME_TYPES:
+                logger.info("Processing image document from chat %s", chat_id)
 
                 # Get current session context
                 session = await self.session_manager.get_session(chat_id)
@@ -187,7 +196,7 @@ class MediaHandlers:
                 )
 
                 if "error" in result:
-                    logger.error(f"Media processing error: {result['error']}")
+                    logger.error("Media processing error: %s", result['error'])
                     return f"Извините, не удалось обработать изображение: {result['error']}"
 
                 # Match with context
@@ -214,7 +223,7 @@ class MediaHandlers:
                 return "Извините, я пока поддерживаю только изображения. Текстовые документы не обрабатываются."
 
         except Exception as e:
-            logger.error(f"Error handling document message: {e}", exc_info=True)
+            logger.error("Error handling document message: %s", e, exc_info=True)
             return "Извините, произошла ошибка при обработке документа."
 
     async def _generate_media_response(
@@ -258,7 +267,7 @@ class MediaHandlers:
                 )
 
         except Exception as e:
-            logger.error(f"Error generating media response: {e}", exc_info=True)
+            logger.error("Error generating media response: %s", e, exc_info=True)
             return "Извините, произошла ошибка при генерации ответа."
 
     async def _generate_explanation_response(
@@ -0,0 +1,153 @@
+"""Rate limiting of outgoing Telegram API calls."""
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+logger = logging.getLogger(__name__)
+
+# Attempts of one API call when Telegram keeps answering with 429
+_MAX_ATTEMPTS = 3
+
+# Chat buckets kept before idle ones are dropped
+_MAX_TRACKED_CHATS = 10_000
+
+
+class _TokenBucket:
+    """Token bucket that hands out reservations instead of blocking."""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float) -> None:
+        """
+        Initialize a full bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of stored tokens
+            now: Current monotonic time
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def reserve(self, now: float) -> float:
+        """
+        Take one token, going into debt if the bucket is empty.
+
+        Args:
+            now: Current monotonic time
+
+        Returns:
+            Seconds to wait before the reserved token may be used
+        """
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def is_idle(self, now: float) -> bool:
+        """Whether the bucket has refilled completely."""
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+
+class OutboundRateLimiter(BaseRequestMiddleware):
+    """
+    Keeps outgoing chat messages under Telegram's flood limits.
+
+    Calls addressed to a chat wait for a token from a global bucket and from
+    the chat's own bucket, so bursts are spread out instead of failing with
+    429. Calls without a chat, such as polling and file downloads, pass
+    through. When Telegram still answers with retry_after, all chat calls are
+    paused for that long and the call is retried.
+    """
+
+    def __init__(
+        self, global_rate: float, chat_rate: float, chat_burst: int
+    ) -> None:
+        """
+        Initialize outbound rate limiter.
+
+        Args:
+            global_rate: Chat calls per second allowed across all chats
+            chat_rate: Calls per second allowed in a single chat
+            chat_burst: Calls a single chat may make at once before throttling
+        """
+        now = time.monotonic()
+        self._chat_rate = chat_rate
+        self._chat_burst = chat_burst
+        self._global = _TokenBucket(global_rate, global_rate, now)
+        self._chats: dict[Any, _TokenBucket] = {}
+        self._paused_until = 0.0
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        """Wait for a send slot before calls addressed to a chat."""
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            return await make_request(bot, method)
+
+        attempt = 1
+        while True:
+            delay = self._reserve(chat_id)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                if attempt >= _MAX_ATTEMPTS:
+                    raise
+                attempt += 1
+                logger.warning(
+                    "Telegram flood limit hit in chat %s, pausing sends for %ds",
+                    chat_id,
+                    e.retry_after,
+                )
+                self._paused_until = max(
+                    self._paused_until, time.monotonic() + e.retry_after
+                )
+
+    def _reserve(self, chat_id: Any) -> float:
+        """
+        Reserve a global and a per-chat send slot.
+
+        Args:
+            chat_id: Target chat of the call
+
+        Returns:
+            Seconds to wait before sending
+        """
+        now = time.monotonic()
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= _MAX_TRACKED_CHATS:
+                self._chats = {
+                    key: value
+                    for key, value in self._chats.items()
+                    if not value.is_idle(now)
+                }
+            bucket = _TokenBucket(self._chat_rate, self._chat_burst, now)
+            self._chats[chat_id] = bucket
+
+        return max(
+            bucket.reserve(now),
+            self._global.reserve(now),
+            self._paused_until - now,
+        )
@@ -0,0 +1,68 @@
+"""Incremental delivery of streamed LLM replies via Telegram message edits."""
+
+import logging
+import time
+
+from aiogram.types import Message
+
+logger = logging.getLogger(__name__)
+
+# Telegram throttles frequent edits of one message; stay well under the limit
+_EDIT_INTERVAL_SECONDS = 1.0
+
+
+class StreamingReply:
+    """Shows a growing reply by editing a single Telegram message."""
+
+    def __init__(self, message: Message) -> None:
+        """
+        Initialize streaming reply.
+
+        Args:
+            message: Incoming user message to reply to
+        """
+        self._message = message
+        self._draft: Message | None = None
+        self._shown_text = ""
+        self._last_edit = float("-inf")
+
+    @property
+    def started(self) -> bool:
+        """Whether a draft reply has been sent."""
+        return self._draft is not None
+
+    async def update(self, text: str) -> None:
+        """
+        Show partial reply text, at most once per edit interval.
+
+        Args:
+            text: Reply text accumulated so far
+        """
+        now = time.monotonic()
+        if not text.strip() or now - self._last_edit < _EDIT_INTERVAL_SECONDS:
+            return
+        self._last_edit = now
+
+        # Partial text is raw model output and may hold unbalanced markup, so
+        # drafts are sent as plain text; only finish() applies a parse mode
+        try:
+            if self._draft is None:
+                self._draft = await self._message.answer(text, parse_mode=None)
+            elif text != self._shown_text:
+                await self._draft.edit_text(text, parse_mode=None)
+            self._shown_text = text
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Failed to update streamed reply: %s", e)
+
+    async def finish(self, text: str, parse_mode: str | None = None) -> None:
+        """
+        Replace draft with the final reply text.
+
+        Args:
+            text: Final reply text
+            parse_mode: Telegram parse mode for the final text, None for plain
+        """
+        # Telegram rejects edits that don't change the message
+        if parse_mode is None and text == self._shown_text:
+            return
+        await self._draft.edit_text(text, parse_mode=parse_mode)
@@ -6,6 +6,8 @@ from pathlib import Path
 from typing import Any, Dict, Optional
 
 import openai
+import orjson
+from core.http_client import get_http_client
 from settings.config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -24,14 +26,16 @@ class AudioHandler:
         if self.settings.openai_api_key:
             # Use direct OpenAI API for Whisper
             self.openai_client = openai.AsyncOpenAI(
-                api_key=self.settings.openai_api_key
+                api_key=self.settings.openai_api_key,
+                http_client=get_http_client(),
             )
             logger.info("Using direct OpenAI API for Whisper transcription")
         else:
             # Use OpenRouter for other services
             self.openai_client = openai.AsyncOpenAI(
                 api_key=self.settings.openrouter_api_key,
-                base_url="https://openrouter.ai/api/v1"
+                base_url="https://openrouter.ai/api/v1",
+                http_client=get_http_client(),
             )
             logger.info("Using OpenRouter API (Whisper may not be available)")
 
@@ -49,7 +53,7 @@ class AudioHandler:
             if not self.settings.audio_enabled:
                 return {"error": "Audio processing is disabled"}
 
-            logger.info(f"Transcribing audio file: {file_path}")
+            logger.info("Transcribing audio file: %s", file_path)
 
             # Validate file exists and is readable
             if not file_path.exists():
@@ -73,11 +77,11 @@ class AudioHandler:
                 "confidence": getattr(response, 'confidence', 0.8),  # Fallback if not available
             }
 
-            logger.info(f"Audio transcription completed: {len(result['transcript'])} chars")
+            logger.info("Audio transcription completed: %s chars", len(result['transcript']))
             return result
 
         except Exception as e:
-            logger.error(f"Error transcribing audio: {e}", exc_info=True)
+            logger.error("Error transcribing audio: %s", e, exc_info=True)
             
             # Fallback: return a generic response for voice messages
             if "405" in str(e) or "Method Not Allowed" in str(e):
@@ -106,7 +110,7 @@ class AudioHandler:
             Intent analysis results
         """
         try:
-            logger.info(f"Analyzing audio intent: {transcript[:100]}...")
+            logger.info("Analyzing audio intent: %s...", transcript[:100])
 
             # Create prompt for intent analysis
             prompt = f"""
@@ -139,8 +143,7 @@ class AudioHandler:
             )
 
             # Parse JSON response
-            import json
-            result = json.loads(response.choices[0].message.content)
+            result = orjson.loads(response.choices[0].message.content)
             
             # Validate and set defaults
             result.setdefault("intent", "question")
@@ -150,11 +153,11 @@ class AudioHandler:
             result.setdefault("context", "Audio intent analysis")
             result.setdefault("confidence", 0.7)
 
-            logger.info(f"Audio intent analysis completed: {result}")
+            logger.info("Audio intent analysis completed: %s", result)
             return result
 
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse LLM response as JSON: {e}")
+        except orjson.JSONDecodeError as e:
+            logger.error("Failed to parse LLM response as JSON: %s", e)
             # Fallback result
             return {
                 "intent": "question",
@@ -165,7 +168,7 @@ class AudioHandler:
                 "confidence": 0.5,
             }
         except Exception as e:
-            logger.error(f"Error analyzing audio intent: {e}", exc_info=True)
+            logger.error("Error analyzing audio intent: %s", e, exc_info=True)
             return {"error": f"Audio intent analysis failed: {str(e)}"}
 
     async def synthesize_speech(
@@ -186,7 +189,7 @@ class AudioHandler:
                 logger.info("TTS is disabled, skipping speech synthesis")
                 return None
 
-            logger.info(f"Synthesizing speech for text: {text[:100]}...")
+            logger.info("Synthesizing speech for text: %s...", text[:100])
 
             # Use OpenAI TTS API through OpenRouter
             response = await self.openai_client.audio.speech.create(
@@ -201,11 +204,11 @@ class AudioHandler:
             async for chunk in response.iter_bytes():
                 audio_data += chunk
 
-            logger.info(f"Speech synthesis completed: {len(audio_data)} bytes")
+            logger.info("Speech synthesis completed: %s bytes", len(audio_data))
             return audio_data
 
         except Exception as e:
-            logger.error(f"Error synthesizing speech: {e}", exc_info=True)
+            logger.error("Error synthesizing speech: %s", e, exc_info=True)
             return None
 
     async def validate_audio_file(self, file_path: Path) -> bool:
@@ -220,22 +223,22 @@ class AudioHandler:
         """
         try:
             if not file_path.exists():
-                logger.warning(f"Audio file does not exist: {file_path}")
+                logger.warning("Audio file does not exist: %s", file_path)
                 return False
 
             # Check file size
             file_size = file_path.stat().st_size
             max_size = self.settings.max_audio_duration * 16000  # Rough estimate
             if file_size > max_size:
-                logger.warning(f"Audio file too large: {file_size} bytes")
+                logger.warning("Audio file too large: %s bytes", file_size)
                 return False
 
             # TODO: Add format validation using python-magic
-            logger.info(f"Audio file validation passed: {file_path}")
+            logger.info("Audio file validation passed: %s", file_path)
             return True
 
         except Exception as e:
-            logger.error(f"Error validating audio file: {e}", exc_info=True)
+            logger.error("Error validating audio file: %s", e, exc_info=True)
             return False
 
     def get_supported_formats(self) -> list[str]:
@@ -262,7 +265,7 @@ class AudioHandler:
             True if conversion successful, False otherwise
         """
         try:
-            logger.info(f"Converting audio from {input_path} to {output_path}")
+            logger.info("Converting audio from %s to %s", input_path, output_path)
 
             # TODO: Implement actual audio format conversion
             # This is a placeholder for the actual implementation
@@ -272,5 +275,5 @@ class AudioHandler:
             return True
 
         except Exception as e:
-            logger.error(f"Error converting audio format: {e}", exc_info=True)
+            logger.error("Error converting audio format: %s", e, exc_info=True)
             return False
@@ -0,0 +1,191 @@
+"""Micro-batching of concurrent auxiliary model requests."""
+
+import asyncio
+import logging
+
+import orjson
+
+from core.llm_client import get_llm_client
+from settings.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Request parameters of a single auxiliary analysis
+_TEMPERATURE = 0.1
+_MAX_TOKENS_PER_ANALYSIS = 200
+
+_BATCH_INSTRUCTION = (
+    "You will receive {count} numbered conversations. Analyze each one "
+    'independently and return a JSON object {{"results": [...]}} with exactly '
+    "{count} objects in the same order as the conversations."
+)
+
+PendingRequest = tuple[list[dict[str, str]], asyncio.Future[str]]
+
+
+class AuxBatcher:
+    """Coalesces auxiliary analyses arriving within a short window into one request."""
+
+    def __init__(self, llm_client=None) -> None:
+        """
+        Initialize auxiliary request batcher.
+
+        Args:
+            llm_client: LLM client instance. If None, will be imported when needed.
+        """
+        self._llm_client = llm_client
+        self._pending: list[PendingRequest] = []
+        self._flush_task: asyncio.Task | None = None
+        # Keeps references to running batches so they are not garbage collected
+        self._batches: set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether auxiliary requests should be batched."""
+        return get_settings().aux_batching_enabled
+
+    def _get_llm_client(self):
+        """Get LLM client instance."""
+        if self._llm_client is None:
+            self._llm_client = get_llm_client()
+        return self._llm_client
+
+    async def submit(self, messages: list[dict[str, str]]) -> str:
+        """
+        Queue an auxiliary analysis request and wait for its response.
+
+        All requests must share the system prompt in messages[0].
+
+        Args:
+            messages: System prompt, recent history and the user message
+
+        Returns:
+            Raw model response for this request
+        """
+        future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        self._pending.append((messages, future))
+        settings = get_settings()
+        if len(self._pending) >= settings.aux_batch_max_size:
+            if self._flush_task is not None:
+                self._flush_task.cancel()
+                self._flush_task = None
+            self._start_batch(self._take_pending())
+        elif self._flush_task is None:
+            self._flush_task = asyncio.create_task(
+                self._flush_after_wait(settings.aux_batch_max_wait_ms / 1000)
+            )
+        return await future
+
+    def _take_pending(self) -> list[PendingRequest]:
+        """Take all queued requests."""
+        batch, self._pending = self._pending, []
+        return batch
+
+    def _start_batch(self, batch: list[PendingRequest]) -> None:
+        """Run a batch in the background."""
+        task = asyncio.create_task(self._run_batch(batch))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _flush_after_wait(self, delay: float) -> None:
+        """Send queued requests once the batching window closes."""
+        await asyncio.sleep(delay)
+        self._flush_task = None
+        await self._run_batch(self._take_pending())
+
+    async def _run_batch(self, batch: list[PendingRequest]) -> None:
+        """Resolve a batch with one request, or per request if batching fails."""
+        # Callers that were cancelled meanwhile no longer need a response
+        batch = [(messages, future) for messages, future in batch if not future.done()]
+        if not batch:
+            return
+        if len(batch) == 1:
+            await self._run_single(*batch[0])
+            return
+
+        try:
+            responses = await self._analyze_batch([messages for messages, _ in batch])
+        except Exception as e:  # noqa: BLE001
+            logger.warning(
+                "Batched auxiliary analysis of %d requests failed, "
+                "sending them separately: %s",
+                len(batch),
+                e,
+            )
+            await asyncio.gather(
+                *(self._run_single(messages, future) for messages, future in batch)
+            )
+            return
+
+        logger.debug("Analyzed %d auxiliary requests in one batch", len(batch))
+        for (_, future), response in zip(batch, responses, strict=True):
+            if not future.done():
+                future.set_result(response)
+
+    async def _run_single(
+        self, messages: list[dict[str, str]], future: asyncio.Future[str]
+    ) -> None:
+        """Send a single auxiliary request and resolve its future."""
+        try:
+            response = await self._get_llm_client().generate_response(
+                messages=messages,
+                temperature=_TEMPERATURE,
+                max_tokens=_MAX_TOKENS_PER_ANALYSIS,
+                cacheable=True,
+            )
+        except Exception as e:  # noqa: BLE001
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(response)
+
+    async def _analyze_batch(
+        self, conversations: list[list[dict[str, str]]]
+    ) -> list[str]:
+        """
+        Analyze several conversations with one auxiliary model request.
+
+        Args:
+            conversations: Requests sharing the system prompt
+
+        Returns:
+            Response for each conversation, serialized as a JSON object
+        """
+        count = len(conversations)
+        system_prompt = conversations[0][0]["content"]
+        instruction = _BATCH_INSTRUCTION.format(count=count)
+
+        lines: list[str] = []
+        for number, messages in enumerate(conversations, 1):
+            lines.append(f"Conversation {number}:")
+            lines.extend(f"{msg['role']}: {msg['content']}" for msg in messages[1:])
+            lines.append("")
+
+        response = await self._get_llm_client().generate_response(
+            messages=[
+                {"role": "system", "content": f"{system_prompt} {instruction}"},
+                {"role": "user", "content": "\n".join(lines)},
+            ],
+            temperature=_TEMPERATURE,
+            max_tokens=_MAX_TOKENS_PER_ANALYSIS * count,
+        )
+
+        data = orjson.loads(response)
+        results = data.get("results") if isinstance(data, dict) else None
+        if not isinstance(results, list) or len(results) != count:
+            msg = f"expected {count} results in batched response"
+            raise ValueError(msg)
+        return [orjson.dumps(result).decode() for result in results]
+
+
+# Global auxiliary batcher instance
+_aux_batcher: AuxBatcher | None = None
+
+
+def get_aux_batcher() -> AuxBatcher:
+    """Get global auxiliary batcher instance."""
+    global _aux_batcher  # noqa: PLW0603
+    if _aux_batcher is None:
+        _aux_batcher = AuxBatcher()
+    return _aux_batcher
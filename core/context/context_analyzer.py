@@ -1,25 +1,43 @@
 """Context analyzer for analyzing conversation context using auxiliary model."""
 
-import json
+import hashlib
 import logging
+import time
+from collections import OrderedDict
 from typing import Any
 
+import orjson
+
+from core.graceful_degradation import get_graceful_degradation_manager
 from core.session_state import SessionState
 
 logger = logging.getLogger(__name__)
 
+# Bounds of the auxiliary analysis cache
+_AUX_CACHE_SIZE = 10_000
+_AUX_CACHE_TTL = 3600.0
+
+AuxCacheKey = tuple[str | int, str, str | None, int, bytes]
+
 
 class ContextAnalyzer:
     """Analyzes conversation context using auxiliary model."""
 
-    def __init__(self, llm_client=None) -> None:
+    def __init__(self, llm_client=None, batcher=None) -> None:
         """
         Initialize context analyzer.
 
         Args:
             llm_client: LLM client instance. If None, will be imported when needed.
+            batcher: AuxBatcher for coalescing concurrent requests. If None,
+                each analysis is sent as a separate request.
         """
         self._llm_client = llm_client
+        self._batcher = batcher
+        # LRU cache of auxiliary analyses: key -> (stored at, analysis)
+        self._aux_cache: OrderedDict[AuxCacheKey, tuple[float, dict[str, Any]]] = (
+            OrderedDict()
+        )
 
     def _get_llm_client(self):
         """Get LLM client instance."""
@@ -38,7 +56,24 @@ class ContextAnalyzer:
 
         Returns a dict with keys: scenario, topic, question, is_new_question, is_new_topic,
         understanding_level, previous_understanding_level, previous_topic, user_preferences.
+
+        Analyses are cached per chat for the same message after the same
+        recent history and session context (scenario, topic and understanding
+        level), so a repeated short reply does not cost another auxiliary
+        model request.
         """
+        history: list[dict[str, str]] = []
+        # Add last 5 messages from history
+        for msg in session.get_recent_messages(limit=5):
+            role = "assistant" if msg.role == "bot" else msg.role
+            history.append({"role": role, "content": msg.content})
+
+        cache_key = self._aux_cache_key(session, history, user_message)
+        cached = self._aux_cache_get(cache_key)
+        if cached is not None:
+            logger.debug("Auxiliary analysis cache hit for session %s", session.chat_id)
+            return cached
+
         llm_client = self._get_llm_client()
 
         system_prompt = (
@@ -50,27 +85,29 @@ class ContextAnalyzer:
             "If unsure, prefer unknown/null and false flags. Do not add extra keys or text."
         )
 
-        messages: list[dict[str, str]] = [{"role": "system", "content": system_prompt}]
-
-        # Add last 5 messages from history
-        for msg in session.get_recent_messages(limit=5):
-            role = "assistant" if msg.role == "bot" else msg.role
-            messages.append({"role": role, "content": msg.content})
-
-        # Add current user message last
-        messages.append({"role": "user", "content": user_message})
+        messages: list[dict[str, str]] = [
+            {"role": "system", "content": system_prompt},
+            *history,
+            # Add current user message last
+            {"role": "user", "content": user_message},
+        ]
 
         try:
-            response = await llm_client.generate_response(
-                messages=messages,
-                temperature=0.1,
-                max_tokens=200,
-            )
+            if self._batcher is not None and self._batcher.enabled:
+                response = await self._batcher.submit(messages)
+            else:
+                response = await llm_client.generate_response(
+                    messages=messages,
+                    temperature=0.1,
+                    max_tokens=200,
+                    cacheable=True,
+                )
 
             try:
-                data = json.loads(response)
+                data = orjson.loads(response)
                 if not isinstance(data, dict):
                     raise ValueError("Auxiliary model did not return a JSON object")
+                self._aux_cache_store(cache_key, data)
             except Exception as e:
                 logger.warning("Failed to parse auxiliary model response: %s", e)
                 # Fallback minimal context
@@ -83,6 +120,55 @@ class ContextAnalyzer:
 
         return data
 
+    def _aux_cache_key(
+        self,
+        session: SessionState,
+        history: list[dict[str, str]],
+        user_message: str,
+    ) -> AuxCacheKey:
+        """
+        Build auxiliary analysis cache key.
+
+        Args:
+            session: Session the analysis is for
+            history: Recent messages sent to the model with the user message
+            user_message: Latest user message
+
+        Returns:
+            Key scoped to the chat, its session context and the model input
+        """
+        # The analysis is written back into this chat's session, so entries
+        # are never shared between chats
+        digest = hashlib.blake2b(
+            orjson.dumps([history, user_message.strip().lower()]), digest_size=16
+        ).digest()
+        return (
+            session.chat_id,
+            session.scenario,
+            session.topic,
+            session.understanding_level,
+            digest,
+        )
+
+    def _aux_cache_get(self, key: AuxCacheKey) -> dict[str, Any] | None:
+        """Get a fresh cached analysis, dropping it if expired."""
+        entry = self._aux_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, data = entry
+        if time.monotonic() - stored_at > _AUX_CACHE_TTL:
+            del self._aux_cache[key]
+            return None
+        self._aux_cache.move_to_end(key)
+        return dict(data)
+
+    def _aux_cache_store(self, key: AuxCacheKey, data: dict[str, Any]) -> None:
+        """Store analysis in cache, evicting the least recently used entry."""
+        self._aux_cache[key] = (time.monotonic(), dict(data))
+        self._aux_cache.move_to_end(key)
+        if len(self._aux_cache) > _AUX_CACHE_SIZE:
+            self._aux_cache.popitem(last=False)
+
     def _get_fallback_context(self, session: SessionState) -> dict[str, Any]:
         """Get fallback context when auxiliary model fails."""
         return {
@@ -101,8 +187,6 @@ class ContextAnalyzer:
         self, session: SessionState, user_message: str
     ) -> dict[str, Any]:
         """Handle auxiliary model failure using graceful degradation."""
-        from core.graceful_degradation import get_graceful_degradation_manager
-
         degradation_manager = get_graceful_degradation_manager()
         return degradation_manager.handle_auxiliary_model_failure(session, user_message)
 
@@ -147,6 +231,7 @@ class ContextAnalyzer:
                 messages=messages,
                 temperature=0.1,
                 max_tokens=50,
+                cacheable=True,
             )
 
             topic = response.strip().lower()
@@ -74,11 +74,11 @@ class ContextMatcher:
                 ),
             }
 
-            logger.info(f"Context matching result: {result}")
+            logger.info("Context matching result: %s", result)
             return result
 
         except Exception as e:
-            logger.error(f"Error in context matching: {e}", exc_info=True)
+            logger.error("Error in context matching: %s", e, exc_info=True)
             return {
                 "scenario": "unknown",
                 "context_relation": "unrelated",
@@ -6,6 +6,10 @@ from typing import Any
 
 from core.session_state import SessionState
 
+_WRAP_UP_RECOMMENDATION = (
+    "Consider wrapping up the current topic/question and move to a new one."
+)
+
 
 def _normalize_scenario(s: str | None) -> str:
     """Normalize scenario identifier to one of: discussion|explanation|unknown."""
@@ -86,9 +90,7 @@ def process_aux_result(session: SessionState, aux: dict[str, Any]) -> dict[str,
     # Recommendation if level >= 9
     recommendation: str | None = None
     if understanding_level_int >= 9:
-        recommendation = (
-            "Consider wrapping up the current topic/question and move to a new one."
-        )
+        recommendation = _WRAP_UP_RECOMMENDATION
 
     # Update session with merged context
     session.scenario = scenario
@@ -118,3 +120,29 @@ def process_aux_result(session: SessionState, aux: dict[str, Any]) -> dict[str,
         dynamic_context["recommendation"] = recommendation
 
     return dynamic_context
+
+
+def preview_dynamic_context(session: SessionState) -> dict[str, Any]:
+    """
+    Build dynamic context from session state alone, without auxiliary output.
+
+    Used to start the dialog model before the auxiliary analysis finishes,
+    assuming the turn continues the current topic and question. The session
+    is not modified.
+    """
+    dynamic_context: dict[str, Any] = {
+        "scenario": session.scenario,
+        "question": session.question,
+        "topic": session.topic,
+        "is_new_question": False,
+        "is_new_topic": False,
+        "understanding_level": session.understanding_level,
+        "previous_understanding_level": session.previous_understanding_level,
+        "previous_topic": session.previous_topic,
+        "user_preferences": list(session.user_preferences),
+    }
+
+    if session.understanding_level >= 9:
+        dynamic_context["recommendation"] = _WRAP_UP_RECOMMENDATION
+
+    return dynamic_context
@@ -3,7 +3,8 @@
 import logging
 from typing import Any
 
-from core.session_state import SessionState
+from core.graceful_degradation import get_graceful_degradation_manager
+from core.session_state import Message, SessionState
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +20,8 @@ class DialogBuilder:
             prompt_loader: PromptLoader instance. If None, will be imported when needed.
         """
         self._prompt_loader = prompt_loader
+        # Combined base + scenario system prompt per scenario id
+        self._system_prompt_cache: dict[str, str] = {}
 
     def _get_prompt_loader(self):
         """Get prompt loader instance."""
@@ -84,41 +87,75 @@ class DialogBuilder:
         session: SessionState,
         dynamic_ctx: dict[str, Any],
         user_message: str,
+        history: list[Message] | None = None,
     ) -> list[dict[str, str]]:
         """
-        Build messages for dialog model: system (base + dynamic + scenario), history, user.
+        Build messages for dialog model: system (base + scenario), history, dynamic context, user.
         System prompt must be the first and never truncated.
-        """
-        messages: list[dict[str, str]] = []
 
-        # Base system prompt with fallback
-        prompt_loader = self._get_prompt_loader()
-        base_prompt = prompt_loader.get_system_prompt("system_base")
-        if not base_prompt:
-            base_prompt = self._handle_prompt_loading_failure("system_base")
+        Static content goes first and per-turn content last, so consecutive
+        requests share the longest possible prefix for provider prompt caching.
 
-        # Dynamic context block
-        dynamic_block = self._build_dynamic_context_block(dynamic_ctx)
+        If history is given it replaces the latest session messages, e.g. with
+        messages selected by relevance.
+        """
+        messages: list[dict[str, str]] = []
 
-        # Scenario prompt with fallback
         scenario_id = dynamic_ctx.get("scenario", "unknown")
-        scenario_prompt = prompt_loader.get_scenario_prompt(scenario_id)
-        if not scenario_prompt:
-            scenario_prompt = self._handle_prompt_loading_failure(f"system_{scenario_id}")
-
-        system_full = f"{base_prompt}\n\n{dynamic_block}\n\n{scenario_prompt}".strip()
+        system_full = self._system_prompt_cache.get(scenario_id)
+        if system_full is None:
+            system_full = self._build_system_prompt(scenario_id)
         messages.append({"role": "system", "content": system_full})
 
         # History
-        for msg in session.get_recent_messages(limit=30):
+        if history is None:
+            history = session.get_recent_messages(limit=30)
+        for msg in history:
             role = "assistant" if msg.role == "bot" else msg.role
             messages.append({"role": role, "content": msg.content})
 
+        # Dynamic context block changes every turn, so it goes after history
+        dynamic_block = self._build_dynamic_context_block(dynamic_ctx)
+        messages.append({"role": "system", "content": dynamic_block})
+
         # Current user message
         messages.append({"role": "user", "content": user_message})
 
         return messages
 
+    def _build_system_prompt(self, scenario_id: str) -> str:
+        """
+        Build combined base and scenario system prompt.
+
+        The result is memoized per scenario unless a fallback prompt was used,
+        so a prompt that failed to load is retried on the next request.
+
+        Args:
+            scenario_id: Scenario identifier
+
+        Returns:
+            System prompt text
+        """
+        cacheable = True
+
+        # Base system prompt with fallback
+        prompt_loader = self._get_prompt_loader()
+        base_prompt = prompt_loader.get_system_prompt("system_base")
+        if not base_prompt:
+            base_prompt = self._handle_prompt_loading_failure("system_base")
+            cacheable = False
+
+        # Scenario prompt with fallback
+        scenario_prompt = prompt_loader.get_scenario_prompt(scenario_id)
+        if not scenario_prompt:
+            scenario_prompt = self._handle_prompt_loading_failure(f"system_{scenario_id}")
+            cacheable = False
+
+        system_full = f"{base_prompt}\n\n{scenario_prompt}".strip()
+        if cacheable:
+            self._system_prompt_cache[scenario_id] = system_full
+        return system_full
+
     def _build_dynamic_context_block(self, dynamic_ctx: dict[str, Any]) -> str:
         """Serialize dynamic context into a compact, readable block."""
         lines: list[str] = ["Context:"]
@@ -237,7 +274,5 @@ Always respond in a warm, encouraging tone that makes learning fun."""
 
     def _handle_prompt_loading_failure(self, prompt_name: str) -> str:
         """Handle prompt loading failure using graceful degradation."""
-        from core.graceful_degradation import get_graceful_degradation_manager
-
         degradation_manager = get_graceful_degradation_manager()
         return degradation_manager.handle_prompt_loading_failure(prompt_name)
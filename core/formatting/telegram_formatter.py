@@ -36,13 +36,13 @@ class TelegramFormatter:
         if not self.settings.enable_html_formatting:
             return text
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         try:
             # Apply comprehensive formatting
             formatted_text = self._apply_basic_formatting(text, content_type)
             
-            duration_ms = (time.time() - start_time) * 1000
+            duration_ms = (time.perf_counter() - start_time) * 1000
             
             # Check formatting time limit
             if duration_ms > self.settings.max_formatting_time_ms:
@@ -0,0 +1,95 @@
+"""Relevance-based selection of dialog history for the dialog model."""
+
+import logging
+
+import numpy as np
+from openai import AsyncOpenAI
+
+from core.http_client import get_http_client
+from core.session_state import Message, SessionState
+from settings.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryRetriever:
+    """Selects latest messages plus the earlier ones most relevant to a query."""
+
+    def __init__(self) -> None:
+        """Initialize history retriever with settings."""
+        self.settings = get_settings()
+        self.enabled = self.settings.history_retrieval_enabled
+        self.top_k = self.settings.history_retrieval_top_k
+        self.recent_count = self.settings.history_retrieval_recent
+        self.embedding_model = self.settings.embedding_model
+        self.client = AsyncOpenAI(
+            api_key=self.settings.openrouter_api_key,
+            base_url="https://openrouter.ai/api/v1",
+            http_client=get_http_client(),
+        )
+
+    async def select_history(
+        self, session: SessionState, content: str
+    ) -> list[Message] | None:
+        """
+        Select dialog history relevant to the current user message.
+
+        Message embeddings are computed once and kept on the messages, so each
+        turn only embeds the query and messages added since the last turn.
+
+        Args:
+            session: User session state
+            content: Current user message text
+
+        Returns:
+            Selected messages in chronological order, or None to use the
+            default recent history (short dialog or embedding failure)
+        """
+        messages = session.recent_messages
+        if len(messages) <= self.recent_count + self.top_k:
+            return None
+
+        earlier = messages[: -self.recent_count]
+        recent = messages[-self.recent_count :]
+        missing = [msg for msg in earlier if msg.embedding is None]
+
+        try:
+            # Embed the query and new messages in a single request
+            response = await self.client.embeddings.create(
+                model=self.embedding_model,
+                input=[content, *(msg.content for msg in missing)],
+            )
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Embedding request failed, using recent history: %s", e)
+            return None
+
+        vectors = np.asarray(
+            [item.embedding for item in response.data], dtype=np.float32
+        )
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0.0, 1.0, norms)
+        for msg, vector in zip(missing, vectors[1:], strict=True):
+            msg.embedding = vector
+
+        scores = np.stack([msg.embedding for msg in earlier]) @ vectors[0]
+        selected = np.sort(np.argpartition(-scores, self.top_k - 1)[: self.top_k])
+
+        logger.debug(
+            "Selected %d of %d earlier messages for session %s",
+            len(selected),
+            len(earlier),
+            session.chat_id,
+        )
+        return [earlier[i] for i in selected] + recent
+
+
+# Global history retriever instance
+_history_retriever: HistoryRetriever | None = None
+
+
+def get_history_retriever() -> HistoryRetriever:
+    """Get global history retriever instance."""
+    global _history_retriever  # noqa: PLW0603
+    if _history_retriever is None:
+        _history_retriever = HistoryRetriever()
+    return _history_retriever
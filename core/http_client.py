@@ -0,0 +1,44 @@
+"""Shared HTTP connection pool for OpenRouter/OpenAI API clients."""
+
+import importlib.util
+import logging
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Sized for bursts of dialog, auxiliary, vision and audio calls at once
+_POOL_LIMITS = httpx.Limits(
+    max_keepalive_connections=64,
+    max_connections=128,
+    keepalive_expiry=60.0,
+)
+_POOL_TIMEOUT = httpx.Timeout(connect=5.0, read=30.0, write=10.0, pool=5.0)
+
+# HTTP/2 multiplexes concurrent API requests over one connection per host
+# instead of a connection each; needs the optional h2 package (httpx[http2])
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+# Global HTTP client instance
+_http_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get global HTTP client, creating it on first use."""
+    global _http_client  # noqa: PLW0603
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            limits=_POOL_LIMITS, timeout=_POOL_TIMEOUT, http2=_HTTP2_AVAILABLE
+        )
+        logger.info("HTTP connection pool created (http2=%s)", _HTTP2_AVAILABLE)
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close global HTTP client and its pooled connections."""
+    global _http_client  # noqa: PLW0603
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+        logger.info("HTTP connection pool closed")
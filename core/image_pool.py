@@ -0,0 +1,105 @@
+"""Process pool for CPU-bound image preparation (decode, resize, encode)."""
+
+import asyncio
+import base64
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+
+def is_sendable_jpeg(img: Image.Image, max_size: int) -> bool:
+    """Check whether an image can be sent to the Vision API as-is."""
+    return (
+        img.format == "JPEG"
+        and img.mode == "RGB"
+        and img.width <= max_size
+        and img.height <= max_size
+    )
+
+
+def process_image_for_vision(source: bytes | Path, max_size: int) -> str:
+    """
+    Resize and encode an image as base64 JPEG for the Vision API.
+
+    Runs inside pool workers, so it must stay a picklable top-level function.
+
+    Args:
+        source: Raw image content or path to image file
+        max_size: Maximum width/height in pixels
+
+    Returns:
+        Base64 encoded JPEG data
+    """
+    fp = io.BytesIO(source) if isinstance(source, bytes) else source
+    with Image.open(fp) as opened:
+        # RGB JPEG within the size limit: reuse the original bytes
+        # instead of decoding and re-encoding them
+        if is_sendable_jpeg(opened, max_size):
+            raw = source if isinstance(source, bytes) else source.read_bytes()
+            return base64.b64encode(raw).decode("ascii")
+
+        # Let JPEG decode at a reduced scale when downsizing anyway
+        if opened.width > max_size or opened.height > max_size:
+            opened.draft("RGB", (max_size, max_size))
+
+        # Convert to RGB if necessary
+        img = opened.convert("RGB") if opened.mode != "RGB" else opened
+
+        # Resize if too large
+        if img.width > max_size or img.height > max_size:
+            img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+
+        buffer = io.BytesIO()
+        img.save(buffer, format="JPEG", quality=85)
+        return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+async def run_image_job(source: bytes | Path, max_size: int) -> str:
+    """
+    Run process_image_for_vision in the image process pool.
+
+    Args:
+        source: Raw image content or path to image file
+        max_size: Maximum width/height in pixels
+
+    Returns:
+        Base64 encoded JPEG data
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_image_executor(), process_image_for_vision, source, max_size
+    )
+
+
+# Global image process pool
+_image_executor: ProcessPoolExecutor | None = None
+
+
+def get_image_executor() -> ProcessPoolExecutor:
+    """Get global image process pool, creating it on first use."""
+    global _image_executor  # noqa: PLW0603
+    if _image_executor is None:
+        max_workers = max(2, (os.cpu_count() or 2) // 2)
+        # Spawn workers: forking a process with a running event loop is unsafe
+        _image_executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        logger.info("Image process pool started with %d workers", max_workers)
+    return _image_executor
+
+
+def shutdown_image_executor() -> None:
+    """Shut down global image process pool if it was started."""
+    global _image_executor  # noqa: PLW0603
+    if _image_executor is not None:
+        _image_executor.shutdown(wait=True, cancel_futures=True)
+        _image_executor = None
+        logger.info("Image process pool stopped")
@@ -1,19 +1,33 @@
 """Image processor for downloading and preparing images for analysis."""
 
-import asyncio
-import base64
 import logging
+import os
+import re
 import tempfile
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import openai
+import orjson
 from PIL import Image
 from aiogram import Bot
+from aiogram.types import File
+from core.http_client import get_http_client
+from core.image_pool import run_image_job
 from settings.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Max 1024x1024 as per plan
+_MAX_IMAGE_DIMENSION = 1024
+# Max 20MB as per plan
+_MAX_IMAGE_FILE_SIZE = 20 * 1024 * 1024
+
+# MIME types of image documents accepted for analysis
+SUPPORTED_IMAGE_MIME_TYPES = frozenset(
+    {"image/jpeg", "image/png", "image/gif", "image/webp"}
+)
+
 
 class ImageProcessor:
     """Handles image downloading, processing, and preparation for analysis."""
@@ -22,13 +36,17 @@ class ImageProcessor:
         """Initialize image processor with configuration."""
         self.settings = get_settings()
         self.bot = bot
+        self.vision_model = self.settings.vision_model
+        self.vision_detail = self.settings.vision_detail
+        self.max_in_memory_image_size = self.settings.max_in_memory_image_size
         self.temp_dir = Path(self.settings.temp_dir)
         self.temp_dir.mkdir(parents=True, exist_ok=True)
         
         # Initialize OpenAI client for Vision API
         self.openai_client = openai.AsyncOpenAI(
             api_key=self.settings.openrouter_api_key,
-            base_url="https://openrouter.ai/api/v1"
+            base_url="https://openrouter.ai/api/v1",
+            http_client=get_http_client(),
         )
 
     async def download_image(self, file_id: str) -> Optional[Path]:
@@ -42,42 +60,84 @@ class ImageProcessor:
             Path to downloaded file or None if failed
         """
         try:
-            if not self.bot:
-                logger.error("Bot instance not available for file download")
+            file = await self._get_file(file_id)
+            if not file:
                 return None
+            return await self._download_to_disk(file, file_id)
 
-            # Create temporary file
-            temp_file = tempfile.NamedTemporaryFile(
-                dir=self.temp_dir, suffix=".jpg", delete=False
-            )
-            temp_path = Path(temp_file.name)
-            temp_file.close()
+        except Exception as e:
+            logger.error("Error downloading image: %s", e, exc_info=True)
+            return None
 
-            logger.info(f"Downloading image file {file_id} to {temp_path}")
-            
-            # Download file from Telegram
-            file = await self.bot.get_file(file_id)
-            if not file:
-                logger.error(f"Failed to get file info for {file_id}")
-                return None
+    async def _get_file(self, file_id: str) -> Optional[File]:
+        """
+        Get Telegram file info for a file ID.
 
-            # Download file content
-            file_content = await self.bot.download_file(file.file_path)
-            if not file_content:
-                logger.error(f"Failed to download file content for {file_id}")
-                return None
+        Args:
+            file_id: Telegram file ID
 
-            # Write content to temporary file
-            with open(temp_path, 'wb') as f:
-                f.write(file_content.read())
+        Returns:
+            File info or None if unavailable
+        """
+        if not self.bot:
+            logger.error("Bot instance not available for file download")
+            return None
 
-            logger.info(f"Successfully downloaded image file to {temp_path}")
-            return temp_path
+        file = await self.bot.get_file(file_id)
+        if not file:
+            logger.error("Failed to get file info for %s", file_id)
+            return None
+        return file
 
-        except Exception as e:
-            logger.error(f"Error downloading image: {e}", exc_info=True)
+    async def _download_to_disk(self, file: File, file_id: str) -> Optional[Path]:
+        """
+        Download Telegram file content to a temporary file.
+
+        Args:
+            file: Telegram file info
+            file_id: Telegram file ID
+
+        Returns:
+            Path to downloaded file or None if failed
+        """
+        # Create temporary file
+        fd, name = tempfile.mkstemp(dir=self.temp_dir, suffix=".jpg")
+        # The download reopens the file by path, so only the name is needed
+        os.close(fd)
+        temp_path = Path(name)
+
+        logger.info("Downloading image file %s to %s", file_id, temp_path)
+
+        # Stream file content to disk in chunks instead of buffering it in memory
+        try:
+            await self.bot.download_file(file.file_path, destination=temp_path)
+        except Exception:
+            await self.cleanup_file(temp_path)
+            raise
+
+        logger.info("Successfully downloaded image file to %s", temp_path)
+        return temp_path
+
+    async def _download_to_memory(self, file: File, file_id: str) -> Optional[bytes]:
+        """
+        Download Telegram file content into memory.
+
+        Args:
+            file: Telegram file info
+            file_id: Telegram file ID
+
+        Returns:
+            File content or None if failed
+        """
+        logger.info("Downloading image file %s into memory", file_id)
+
+        file_content = await self.bot.download_file(file.file_path)
+        if not file_content:
+            logger.error("Failed to download file content for %s", file_id)
             return None
 
+        return file_content.read()
+
     async def prepare_image(self, file_path: Path) -> Optional[str]:
         """
         Prepare image for analysis by resizing and converting to base64.
@@ -89,34 +149,41 @@ class ImageProcessor:
             Base64 encoded image data or None if failed
         """
         try:
-            logger.info(f"Preparing image for analysis: {file_path}")
+            logger.info("Preparing image for analysis: %s", file_path)
 
             # Validate image file
             if not await self.validate_image_file(file_path):
                 return None
 
-            # Open and process image
-            with Image.open(file_path) as img:
-                # Convert to RGB if necessary
-                if img.mode != "RGB":
-                    img = img.convert("RGB")
+            image_data = await run_image_job(file_path, _MAX_IMAGE_DIMENSION)
+            logger.info("Image preparation completed")
+            return image_data
+
+        except Exception as e:
+            logger.error("Error preparing image: %s", e, exc_info=True)
+            return None
+
+    async def prepare_image_bytes(self, image_bytes: bytes) -> Optional[str]:
+        """
+        Prepare in-memory image for analysis by resizing and converting to base64.
 
-                # Resize if too large (max 1024x1024 as per plan)
-                max_size = 1024
-                if img.width > max_size or img.height > max_size:
-                    img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+        Args:
+            image_bytes: Raw image file content
 
-                # Convert to base64
-                import io
-                buffer = io.BytesIO()
-                img.save(buffer, format="JPEG", quality=85)
-                image_data = base64.b64encode(buffer.getvalue()).decode("utf-8")
+        Returns:
+            Base64 encoded image data or None if failed
+        """
+        try:
+            if len(image_bytes) > _MAX_IMAGE_FILE_SIZE:
+                logger.warning("Image too large: %s bytes", len(image_bytes))
+                return None
 
-                logger.info("Image preparation completed")
-                return image_data
+            image_data = await run_image_job(image_bytes, _MAX_IMAGE_DIMENSION)
+            logger.info("Image preparation completed")
+            return image_data
 
         except Exception as e:
-            logger.error(f"Error preparing image: {e}", exc_info=True)
+            logger.error("Error preparing image: %s", e, exc_info=True)
             return None
 
     async def validate_image_file(self, file_path: Path) -> bool:
@@ -131,28 +198,27 @@ class ImageProcessor:
         """
         try:
             if not file_path.exists():
-                logger.warning(f"Image file does not exist: {file_path}")
+                logger.warning("Image file does not exist: %s", file_path)
                 return False
 
-            # Check file size (max 20MB as per plan)
+            # Check file size
             file_size = file_path.stat().st_size
-            max_size_mb = 20 * 1024 * 1024  # 20MB
-            if file_size > max_size_mb:
-                logger.warning(f"Image file too large: {file_size} bytes")
+            if file_size > _MAX_IMAGE_FILE_SIZE:
+                logger.warning("Image file too large: %s bytes", file_size)
                 return False
 
             # Validate image format
             try:
                 with Image.open(file_path) as img:
                     img.verify()
-                logger.info(f"Image file validation passed: {file_path}")
+                logger.info("Image file validation passed: %s", file_path)
                 return True
             except Exception as e:
-                logger.warning(f"Invalid image format: {e}")
+                logger.warning("Invalid image format: %s", e)
                 return False
 
         except Exception as e:
-            logger.error(f"Error validating image file: {e}", exc_info=True)
+            logger.error("Error validating image file: %s", e, exc_info=True)
             return False
 
     def get_supported_formats(self) -> List[str]:
@@ -174,9 +240,9 @@ class ImageProcessor:
         try:
             if file_path.exists():
                 file_path.unlink()
-                logger.debug(f"Cleaned up temporary file: {file_path}")
+                logger.debug("Cleaned up temporary file: %s", file_path)
         except Exception as e:
-            logger.warning(f"Failed to cleanup file {file_path}: {e}")
+            logger.warning("Failed to cleanup file %s: %s", file_path, e)
 
     async def process_image_for_analysis(
         self, file_id: str, session_context: Optional[Dict[str, Any]] = None
@@ -192,17 +258,29 @@ class ImageProcessor:
             Analysis results
         """
         try:
-            logger.info(f"Processing image for analysis: {file_id}")
+            logger.info("Processing image for analysis: %s", file_id)
 
-            # Download image
-            file_path = await self.download_image(file_id)
-            if not file_path:
+            file = await self._get_file(file_id)
+            if not file:
                 return {"error": "Failed to download image"}
 
-            # Prepare image
-            image_data = await self.prepare_image(file_path)
-            if not image_data:
+            # Process images in memory unless they exceed the in-memory cap
+            if (
+                file.file_size is not None
+                and file.file_size <= self.max_in_memory_image_size
+            ):
+                image_bytes = await self._download_to_memory(file, file_id)
+                if image_bytes is None:
+                    return {"error": "Failed to download image"}
+                image_data = await self.prepare_image_bytes(image_bytes)
+            else:
+                file_path = await self._download_to_disk(file, file_id)
+                if not file_path:
+                    return {"error": "Failed to download image"}
+                image_data = await self.prepare_image(file_path)
                 await self.cleanup_file(file_path)
+
+            if not image_data:
                 return {"error": "Failed to prepare image"}
 
             # Analyze with Vision API
@@ -210,14 +288,11 @@ class ImageProcessor:
                 image_data, session_context
             )
 
-            # Clean up temporary file
-            await self.cleanup_file(file_path)
-
-            logger.info(f"Image processing completed: {analysis_result}")
+            logger.info("Image processing completed: %s", analysis_result)
             return analysis_result
 
         except Exception as e:
-            logger.error(f"Error processing image: {e}", exc_info=True)
+            logger.error("Error processing image: %s", e, exc_info=True)
             return {"error": f"Image processing failed: {str(e)}"}
 
     async def _analyze_with_vision_api(
@@ -261,7 +336,7 @@ class ImageProcessor:
 
             # Call Vision API
             response = await self.openai_client.chat.completions.create(
-                model=self.settings.vision_model,
+                model=self.vision_model,
                 messages=[
                     {
                         "role": "user",
@@ -271,7 +346,7 @@ class ImageProcessor:
                                 "type": "image_url",
                                 "image_url": {
                                     "url": f"data:image/jpeg;base64,{image_data}",
-                                    "detail": "high"
+                                    "detail": self.vision_detail
                                 }
                             }
                         ]
@@ -282,24 +357,22 @@ class ImageProcessor:
             )
 
             # Parse JSON response
-            import json
-            import re
             response_content = response.choices[0].message.content
-            logger.info(f"Vision API raw response: {repr(response_content)}")
+            logger.info("Vision API raw response: %r", response_content)
             
             if not response_content:
                 logger.error("Vision API returned empty response")
-                raise json.JSONDecodeError("Empty response", "", 0)
+                raise orjson.JSONDecodeError("Empty response", "", 0)
             
             # Extract JSON from markdown code block if present
             json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', response_content, re.DOTALL)
             if json_match:
                 json_content = json_match.group(1)
-                logger.info(f"Extracted JSON from markdown: {json_content}")
+                logger.info("Extracted JSON from markdown: %s", json_content)
             else:
                 json_content = response_content.strip()
             
-            result = json.loads(json_content)
+            result = orjson.loads(json_content)
             
             # Validate and set defaults
             result.setdefault("content_type", "unknown")
@@ -312,11 +385,11 @@ class ImageProcessor:
             result.setdefault("educational_value", "medium")
             result.setdefault("confidence", 0.7)
 
-            logger.info(f"Vision API analysis completed: {result}")
+            logger.info("Vision API analysis completed: %s", result)
             return result
 
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse Vision API response as JSON: {e}")
+        except orjson.JSONDecodeError as e:
+            logger.error("Failed to parse Vision API response as JSON: %s", e)
             # Fallback result
             return {
                 "content_type": "unknown",
@@ -330,5 +403,5 @@ class ImageProcessor:
                 "confidence": 0.5,
             }
         except Exception as e:
-            logger.error(f"Error in Vision API analysis: {e}", exc_info=True)
+            logger.error("Error in Vision API analysis: %s", e, exc_info=True)
             return {"error": f"Vision API analysis failed: {str(e)}"}
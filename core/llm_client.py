@@ -1,8 +1,17 @@
 """LLM client for OpenRouter integration using OpenAI client."""
 
 import asyncio
+import hashlib
 import logging
-
+import random
+import re
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from typing import Any
+
+import httpx
+import orjson
 from openai import (
     APIConnectionError,
     APIError,
@@ -11,10 +20,72 @@ from openai import (
     RateLimitError,
 )
 
+from core.http_client import get_http_client
 from settings.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Retry policy: total attempts, exponential backoff and per-attempt deadline
+_MAX_ATTEMPTS = 3
+_BACKOFF_BASE_SECONDS = 0.5
+_BACKOFF_JITTER_SECONDS = 0.25
+_REQUEST_TIMEOUT_SECONDS = 30.0
+
+# Keywords in unexpected error messages that indicate a transient failure
+_RETRYABLE_ERROR_RE = re.compile(
+    r"network|connection|timeout|5xx|50[0234]", re.IGNORECASE
+)
+
+# Maximum number of cached responses kept for deterministic requests
+_RESPONSE_CACHE_SIZE = 256
+
+# Models that only reuse a cached prompt prefix when it is explicitly marked
+_PREFIX_CACHE_MARKER_MODELS = ("anthropic/",)
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Return exponential backoff delay with jitter for a zero-based attempt."""
+    return _BACKOFF_BASE_SECONDS * (2**attempt) + random.uniform(
+        0, _BACKOFF_JITTER_SECONDS
+    )
+
+
+def _with_cache_breakpoint(message: dict[str, str]) -> dict:
+    """Return a copy of a message with an ephemeral cache_control breakpoint."""
+    return {
+        "role": message["role"],
+        "content": [
+            {
+                "type": "text",
+                "text": message["content"],
+                "cache_control": {"type": "ephemeral"},
+            }
+        ],
+    }
+
+
+def _mark_prompt_prefix_cacheable(
+    messages: list[dict[str, str]],
+) -> list[dict]:
+    """
+    Add cache_control breakpoints to the stable prefix of a conversation.
+
+    The leading system prompt is always marked. Dialog requests also carry a
+    per-turn system block after the history, so the last history message
+    before it is marked too: the next turn extends that prefix and reuses it.
+    """
+    if not messages or messages[0]["role"] != "system":
+        return messages
+    marked = [_with_cache_breakpoint(messages[0]), *messages[1:]]
+
+    for index in range(len(messages) - 1, 1, -1):
+        if messages[index]["role"] == "system":
+            last_history = index - 1
+            if messages[last_history]["role"] != "system":
+                marked[last_history] = _with_cache_breakpoint(messages[last_history])
+            break
+    return marked
+
 
 class LLMError(Exception):
     """Base exception for LLM-related errors."""
@@ -42,110 +113,335 @@ class LLMClient:
     def __init__(self) -> None:
         """Initialize LLM client with settings."""
         self.settings = get_settings()
+        # Snapshot per-request settings to keep attribute lookups off the hot path
+        self._model = self.settings.openrouter_model
+        self._default_temperature = self.settings.llm_temperature
+        self._default_max_tokens = self.settings.llm_max_tokens
         self.client = AsyncOpenAI(
             api_key=self.settings.openrouter_api_key,
             base_url="https://openrouter.ai/api/v1",
+            # Shared keep-alive pool avoids a TCP+TLS handshake per burst
+            http_client=get_http_client(),
+        )
+        # Limit in-flight requests so message bursts don't trip provider limits
+        self._semaphore = asyncio.Semaphore(self.settings.llm_max_concurrent)
+        # Exact-match LRU cache of responses to deterministic requests
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        # Requests currently awaiting a response, by request key
+        self._inflight: dict[str, asyncio.Future[str]] = {}
+        self._inflight_waiters: dict[str, int] = {}
+
+    def cache_stats(self) -> dict[str, int]:
+        """
+        Get response cache statistics.
+
+        Returns:
+            Dictionary with cache hits, misses and current size
+        """
+        return {
+            "hits": self._cache_hits,
+            "misses": self._cache_misses,
+            "size": len(self._cache),
+        }
+
+    def _cache_key(
+        self, messages: list[dict[str, str]], temperature: float, max_tokens: int
+    ) -> str:
+        """Build cache key from the canonicalized request payload."""
+        payload = orjson.dumps(
+            {
+                "model": self._model,
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+            },
+            option=orjson.OPT_SORT_KEYS,
         )
+        return hashlib.sha256(payload).hexdigest()
+
+    def _cache_store(self, key: str, response_text: str) -> None:
+        """Store response in cache, evicting the least recently used entry."""
+        self._cache[key] = response_text
+        self._cache.move_to_end(key)
+        if len(self._cache) > _RESPONSE_CACHE_SIZE:
+            self._cache.popitem(last=False)
 
     async def generate_response(
         self,
         messages: list[dict[str, str]],
         temperature: float | None = None,
         max_tokens: int | None = None,
+        *,
+        cacheable: bool = False,
     ) -> str:
         """
         Generate response from LLM.
 
+        Deterministic requests (temperature 0.0) and requests marked
+        cacheable are served from an in-process cache on exact match.
+        Identical requests made concurrently share a single API call.
+
         Args:
             messages: List of message dictionaries with 'role' and 'content'
             temperature: LLM temperature (0.0-2.0)
             max_tokens: Maximum tokens in response
+            cacheable: Cache the response even if temperature is above 0.0
 
         Returns:
             Generated response text
 
         Raises:
             LLMTimeoutError: If request times out after retries
-            LLMRateLimitError: If rate limit is exceeded
+            LLMRateLimitError: If rate limit is still exceeded after retries
             LLMConnectionError: If connection fails
             LLMAPIError: If API returns an error
         """
         # Use settings defaults if not provided
-        temperature = temperature or self.settings.llm_temperature
-        max_tokens = max_tokens or self.settings.llm_max_tokens
-
+        if temperature is None:
+            temperature = self._default_temperature
+        max_tokens = max_tokens or self._default_max_tokens
+
+        request_key = self._cache_key(messages, temperature, max_tokens)
+        cache_key = None
+        if cacheable or temperature <= 0.0:
+            cache_key = request_key
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                self._cache_hits += 1
+                logger.info("LLM cache hit: length=%d", len(cached))
+                return cached
+            self._cache_misses += 1
+
+        # Identical concurrent requests share one API call (single-flight)
+        inflight = self._inflight.get(request_key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(
+                self._fetch_response(messages, temperature, max_tokens, cache_key)
+            )
+            self._inflight[request_key] = inflight
+            inflight.add_done_callback(
+                lambda done: self._forget_inflight(request_key, done)
+            )
+        else:
+            logger.info("Joining in-flight LLM request")
+
+        self._inflight_waiters[request_key] = (
+            self._inflight_waiters.get(request_key, 0) + 1
+        )
+        try:
+            # Cancelling one caller must not cancel the request for the others
+            return await asyncio.shield(inflight)
+        finally:
+            self._inflight_waiters[request_key] -= 1
+            if not self._inflight_waiters[request_key]:
+                del self._inflight_waiters[request_key]
+                if not inflight.done():
+                    # Nobody is waiting for the response anymore
+                    inflight.cancel()
+                    self._forget_inflight(request_key, inflight)
+
+    def _forget_inflight(self, key: str, request: asyncio.Future[str]) -> None:
+        """Remove finished or abandoned request from the in-flight map."""
+        if self._inflight.get(key) is request:
+            del self._inflight[key]
+
+    async def _fetch_response(
+        self,
+        messages: list[dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        cache_key: str | None,
+    ) -> str:
+        """Send request to LLM and cache the response if a key is given."""
         logger.info(
             "Sending LLM request: model=%s, temperature=%.2f, "
             "max_tokens=%d, messages=%d",
-            self.settings.openrouter_model,
+            self._model,
             temperature,
             max_tokens,
             len(messages),
         )
 
-        # Retry logic: 1 retry for network/5xx errors
-        for attempt in range(2):
-            try:
-                start_time = asyncio.get_event_loop().time()
+        async with self._semaphore:
+            start_time = time.perf_counter()
+            response = await self._create_completion(messages, temperature, max_tokens)
+            duration_ms = int((time.perf_counter() - start_time) * 1000)
 
-                response = await asyncio.wait_for(
-                    self.client.chat.completions.create(
-                        model=self.settings.openrouter_model,
-                        messages=messages,
-                        temperature=temperature,
-                        max_tokens=max_tokens,
-                    ),
-                    timeout=30.0,  # 30 second timeout
-                )
+        # Extract response text
+        response_text = response.choices[0].message.content or ""
 
-                duration_ms = int((asyncio.get_event_loop().time() - start_time) * 1000)
+        # Log successful response
+        logger.info(
+            "LLM response received: duration=%dms, tokens=%d, length=%d",
+            duration_ms,
+            response.usage.total_tokens if response.usage else 0,
+            len(response_text),
+        )
 
-                # Extract response text
-                response_text = response.choices[0].message.content or ""
+        if cache_key is not None and response_text:
+            self._cache_store(cache_key, response_text)
 
-                # Log successful response
-                logger.info(
-                    "LLM response received: duration=%dms, tokens=%d, length=%d",
-                    duration_ms,
-                    response.usage.total_tokens if response.usage else 0,
-                    len(response_text),
-                )
+        return response_text
+
+    async def generate_response_stream(
+        self,
+        messages: list[dict[str, str]],
+        temperature: float | None = None,
+        max_tokens: int | None = None,
+    ) -> AsyncIterator[str]:
+        """
+        Generate response from LLM, yielding text chunks as they arrive.
+
+        Only opening the stream is retried; a stream that breaks midway
+        can't be resumed and raises LLMError.
+
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            temperature: LLM temperature (0.0-2.0)
+            max_tokens: Maximum tokens in response
+
+        Yields:
+            Response text chunks
+
+        Raises:
+            LLMError: If the request fails or the stream is interrupted
+        """
+        if temperature is None:
+            temperature = self._default_temperature
+        max_tokens = max_tokens or self._default_max_tokens
 
-                return response_text
+        logger.info(
+            "Sending streaming LLM request: model=%s, temperature=%.2f, "
+            "max_tokens=%d, messages=%d",
+            self._model,
+            temperature,
+            max_tokens,
+            len(messages),
+        )
+
+        async with self._semaphore:
+            start_time = time.perf_counter()
+            stream = await self._create_completion(
+                messages, temperature, max_tokens, stream=True
+            )
+            length = 0
+            try:
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    text = chunk.choices[0].delta.content
+                    if text:
+                        length += len(text)
+                        yield text
+            except (APIError, httpx.HTTPError) as e:
+                logger.error("LLM stream interrupted: %s", e)
+                raise LLMError(f"Stream interrupted: {e}") from e
+            duration_ms = int((time.perf_counter() - start_time) * 1000)
+
+        logger.info(
+            "LLM stream completed: duration=%dms, length=%d", duration_ms, length
+        )
+
+    async def _create_completion(
+        self,
+        messages: list[dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        *,
+        stream: bool = False,
+    ) -> Any:
+        """
+        Call chat completions API with retries for transient errors.
+
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            temperature: LLM temperature (0.0-2.0)
+            max_tokens: Maximum tokens in response
+            stream: Return an async stream of chunks instead of a completion
+
+        Returns:
+            Chat completion, or chunk stream if stream is set
+        """
+        request_messages = messages
+        if self._model.startswith(_PREFIX_CACHE_MARKER_MODELS):
+            request_messages = _mark_prompt_prefix_cacheable(messages)
+        stream_kwargs = {"stream": True} if stream else {}
+
+        # Retry logic: exponential backoff with jitter for transient errors
+        for attempt in range(_MAX_ATTEMPTS):
+            is_last_attempt = attempt == _MAX_ATTEMPTS - 1
+            try:
+                async with asyncio.timeout(_REQUEST_TIMEOUT_SECONDS):
+                    return await self.client.chat.completions.create(
+                        model=self._model,
+                        messages=request_messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        **stream_kwargs,
+                    )
 
             except TimeoutError:
-                logger.warning("LLM request timeout (attempt %d/2)", attempt + 1)
-                if attempt == 1:  # Last attempt
+                logger.warning(
+                    "LLM request timeout (attempt %d/%d)",
+                    attempt + 1,
+                    _MAX_ATTEMPTS,
+                )
+                if is_last_attempt:
                     raise LLMTimeoutError(
-                        "LLM request timeout after 2 attempts"
+                        f"LLM request timeout after {_MAX_ATTEMPTS} attempts"
                     ) from None
 
             except RateLimitError as e:
+                if not is_last_attempt:
+                    logger.warning(
+                        "LLM rate limit exceeded (attempt %d/%d): %s",
+                        attempt + 1,
+                        _MAX_ATTEMPTS,
+                        e,
+                    )
+                    await asyncio.sleep(_backoff_delay(attempt))
+                    continue
                 logger.error("LLM rate limit exceeded: %s", e)
                 raise LLMRateLimitError(f"Rate limit exceeded: {e}") from e
 
             except APIConnectionError as e:
                 logger.warning(
-                    "LLM connection error (attempt %d/2): %s", attempt + 1, e
+                    "LLM connection error (attempt %d/%d): %s",
+                    attempt + 1,
+                    _MAX_ATTEMPTS,
+                    e,
                 )
-                if attempt == 0:
-                    await asyncio.sleep(0.5)  # Wait 0.5s before retry
+                if not is_last_attempt:
+                    await asyncio.sleep(_backoff_delay(attempt))
                     continue
                 raise LLMConnectionError(f"Connection failed: {e}") from e
 
             except APITimeoutError as e:
-                logger.warning("LLM API timeout (attempt %d/2): %s", attempt + 1, e)
-                if attempt == 0:
-                    await asyncio.sleep(0.5)  # Wait 0.5s before retry
+                logger.warning(
+                    "LLM API timeout (attempt %d/%d): %s",
+                    attempt + 1,
+                    _MAX_ATTEMPTS,
+                    e,
+                )
+                if not is_last_attempt:
+                    await asyncio.sleep(_backoff_delay(attempt))
                     continue
                 raise LLMTimeoutError(f"API timeout: {e}") from e
 
             except APIError as e:
                 # Check if it's a retryable 5xx error
                 status_code = getattr(e, "status_code", None)
-                if status_code and 500 <= status_code < 600 and attempt == 0:
-                    logger.warning("LLM 5xx error (attempt %d/2): %s", attempt + 1, e)
-                    await asyncio.sleep(0.5)  # Wait 0.5s before retry
+                if status_code and 500 <= status_code < 600 and not is_last_attempt:
+                    logger.warning(
+                        "LLM 5xx error (attempt %d/%d): %s",
+                        attempt + 1,
+                        _MAX_ATTEMPTS,
+                        e,
+                    )
+                    await asyncio.sleep(_backoff_delay(attempt))
                     continue
 
                 logger.error("LLM API error: %s", e)
@@ -153,28 +449,16 @@ class LLMClient:
 
             except Exception as e:
                 # Generic error handling for unexpected exceptions
-                error_msg = str(e).lower()
-                retryable_keywords = [
-                    "network",
-                    "connection",
-                    "timeout",
-                    "5xx",
-                    "500",
-                    "502",
-                    "503",
-                    "504",
-                ]
-                is_retryable = any(
-                    keyword in error_msg for keyword in retryable_keywords
-                )
+                is_retryable = bool(_RETRYABLE_ERROR_RE.search(str(e)))
 
-                if is_retryable and attempt == 0:
+                if is_retryable and not is_last_attempt:
                     logger.warning(
-                        "Retryable LLM error (attempt %d/2): %s",
+                        "Retryable LLM error (attempt %d/%d): %s",
                         attempt + 1,
+                        _MAX_ATTEMPTS,
                         e,
                     )
-                    await asyncio.sleep(0.5)  # Wait 0.5s before retry
+                    await asyncio.sleep(_backoff_delay(attempt))
                     continue
 
                 logger.exception("Unexpected LLM error")
@@ -1,11 +1,25 @@
 """Logging configuration for the application."""
 
+import atexit
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s - %(message)s"
+
+_listener: QueueListener | None = None
+
 
 def setup_logging() -> None:
-    """Set up logging configuration for the application."""
+    """Set up logging configuration for the application.
+
+    Records are pushed onto an in-memory queue and written to the file and
+    console handlers by a background listener thread, so logging calls never
+    block the event loop on disk I/O.
+    """
+    global _listener  # noqa: PLW0603
+
     # Create log directory if it doesn't exist
     # Use local log directory for development, /log for production
     log_dir = Path("log")
@@ -18,16 +32,40 @@ def setup_logging() -> None:
 
     log_dir.mkdir(exist_ok=True)
 
-    # Configure logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s %(levelname)s %(name)s - %(message)s",
-        handlers=[
-            logging.FileHandler(log_dir / "app.log"),
-            logging.StreamHandler(),  # Also log to console
-        ],
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = logging.FileHandler(log_dir / "app.log")
+    file_handler.setFormatter(formatter)
+    stream_handler = logging.StreamHandler()  # Also log to console
+    stream_handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    # Only merge args into the message here; the listener's handlers apply
+    # the full format so records aren't prefixed twice
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+
+    if _listener is None:
+        # First setup in this process; later calls reuse the exit hook
+        atexit.register(stop_logging)
+    else:
+        _listener.stop()
+    _listener = QueueListener(
+        log_queue, file_handler, stream_handler, respect_handler_level=True
     )
+    _listener.start()
+
+    # Configure logging
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler], force=True)
 
     # Set specific loggers
     logging.getLogger("aiogram").setLevel(logging.INFO)
     logging.getLogger("openai").setLevel(logging.WARNING)  # Reduce OpenAI noise
+
+
+def stop_logging() -> None:
+    """Flush queued log records and stop the background listener."""
+    global _listener  # noqa: PLW0603
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
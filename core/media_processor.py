@@ -2,33 +2,67 @@
 
 import asyncio
 import logging
+import os
 import tempfile
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any
 
 from aiogram import Bot
+from core.audio_handler import AudioHandler
+from core.image_analyzer import ImageAnalyzer
 from settings.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+_AUDIO_TYPES = frozenset({"audio", "voice"})
+_IMAGE_TYPES = frozenset({"image", "photo"})
+_FILE_SUFFIXES = {
+    "audio": ".ogg",
+    "voice": ".ogg",
+    "image": ".jpg",
+    "photo": ".jpg",
+    "document": ".pdf",
+}
+
 
 class MediaProcessor:
     """Main coordinator for processing multimedia content."""
 
-    def __init__(self, bot: Optional[Bot] = None):
-        """Initialize media processor with configuration."""
+    def __init__(
+        self,
+        bot: Bot | None = None,
+        audio_handler: AudioHandler | None = None,
+        image_analyzer: ImageAnalyzer | None = None,
+    ):
+        """
+        Initialize media processor with configuration.
+
+        Args:
+            bot: Bot used to download files
+            audio_handler: Shared audio handler. If None, created on first use.
+            image_analyzer: Shared image analyzer. If None, created on first use.
+        """
         self.settings = get_settings()
         self.temp_dir = Path(self.settings.temp_dir)
         self.temp_dir.mkdir(parents=True, exist_ok=True)
         self.bot = bot
+        self._audio_enabled = self.settings.audio_enabled
+        self._image_enabled = self.settings.image_analysis_enabled
+        # Handlers are created on first use and reused across requests
+        self._audio_handler = audio_handler
+        self._image_analyzer = image_analyzer
+        # Background file cleanups, kept referenced until they finish
+        self._pending_cleanups: set[asyncio.Task] = set()
 
     async def process_media(
         self,
         file_id: str,
         file_type: str,
         chat_id: str,
-        session_context: Optional[Dict[str, Any]] = None,
-    ) -> Dict[str, Any]:
+        session_context: dict[str, Any] | None = None,
+        *,
+        analyze_intent: bool = True,
+    ) -> dict[str, Any]:
         """
         Process media file and return analysis results.
 
@@ -37,15 +71,17 @@ class MediaProcessor:
             file_type: Type of media (audio, image, document)
             chat_id: Chat ID for context
             session_context: Current session context
+            analyze_intent: Whether to run intent analysis on audio transcripts;
+                callers that analyze the transcript themselves can skip it
 
         Returns:
             Dictionary with analysis results
         """
         try:
-            logger.info(f"Processing {file_type} media for chat {chat_id}")
+            logger.info("Processing %s media for chat %s", file_type, chat_id)
 
             # Check if media type is supported
-            if not await self.is_media_supported(file_type):
+            if not self.is_media_supported(file_type):
                 return {"error": f"Unsupported file type: {file_type}"}
 
             # Download file to temporary location
@@ -54,23 +90,25 @@ class MediaProcessor:
                 return {"error": "Failed to download file"}
 
             # Process based on type
-            if file_type in ["audio", "voice"]:
-                result = await self._process_audio(file_path, session_context)
-            elif file_type in ["image", "photo"]:
+            if file_type in _AUDIO_TYPES:
+                result = await self._process_audio(
+                    file_path, session_context, analyze_intent=analyze_intent
+                )
+            elif file_type in _IMAGE_TYPES:
                 result = await self._process_image(file_path, session_context)
             else:
                 result = {"error": f"Unsupported file type: {file_type}"}
 
-            # Clean up temporary file
-            await self._cleanup_file(file_path)
+            # Clean up temporary file without delaying the result
+            self._schedule_cleanup(file_path)
 
             return result
 
         except Exception as e:
-            logger.error(f"Error processing media: {e}", exc_info=True)
+            logger.exception("Error processing media")
             return {"error": f"Media processing failed: {str(e)}"}
 
-    async def _download_file(self, file_id: str, file_type: str) -> Optional[Path]:
+    async def _download_file(self, file_id: str, file_type: str) -> Path | None:
         """
         Download file from Telegram to temporary location.
 
@@ -86,73 +124,67 @@ class MediaProcessor:
                 logger.error("Bot instance not available for file download")
                 return None
 
-            # Create temporary file
-            suffix = self._get_file_suffix(file_type)
-            temp_file = tempfile.NamedTemporaryFile(
-                dir=self.temp_dir, suffix=suffix, delete=False
-            )
-            temp_path = Path(temp_file.name)
-            temp_file.close()
-
-            logger.info(f"Downloading {file_type} file {file_id} to {temp_path}")
-            
-            # Download file from Telegram
             file = await self.bot.get_file(file_id)
             if not file:
-                logger.error(f"Failed to get file info for {file_id}")
+                logger.error("Failed to get file info for %s", file_id)
                 return None
 
-            # Download file content
-            file_content = await self.bot.download_file(file.file_path)
-            if not file_content:
-                logger.error(f"Failed to download file content for {file_id}")
-                return None
+            # Create temporary file
+            suffix = self._get_file_suffix(file_type)
+            fd, name = tempfile.mkstemp(dir=self.temp_dir, suffix=suffix)
+            # The download reopens the file by path, so only the name is needed
+            os.close(fd)
+            temp_path = Path(name)
 
-            # Write content to temporary file
-            with open(temp_path, 'wb') as f:
-                f.write(file_content.read())
+            logger.info("Downloading %s file %s to %s", file_type, file_id, temp_path)
 
-            logger.info(f"Successfully downloaded {file_type} file to {temp_path}")
+            # Stream file content to disk in chunks instead of buffering it in memory
+            try:
+                await self.bot.download_file(file.file_path, destination=temp_path)
+            except Exception:
+                await self._cleanup_file(temp_path)
+                raise
+
+            logger.info("Successfully downloaded %s file to %s", file_type, temp_path)
             return temp_path
 
         except Exception as e:
-            logger.error(f"Error downloading file: {e}", exc_info=True)
+            logger.warning("Error downloading file: %s", e)
             return None
 
     async def _process_audio(
-        self, file_path: Path, session_context: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, Any]:
+        self,
+        file_path: Path,
+        session_context: dict[str, Any] | None = None,
+        *,
+        analyze_intent: bool = True,
+    ) -> dict[str, Any]:
         """
         Process audio file for speech recognition and analysis.
 
         Args:
             file_path: Path to audio file
             session_context: Current session context
+            analyze_intent: Whether to run intent analysis on the transcript
 
         Returns:
             Analysis results
         """
         try:
-            if not self.settings.audio_enabled:
+            if not self._audio_enabled:
                 return {"error": "Audio processing is disabled"}
 
-            logger.info(f"Processing audio file: {file_path}")
+            logger.info("Processing audio file: %s", file_path)
             
-            # Import AudioHandler here to avoid circular imports
-            from core.audio_handler import AudioHandler
-            
-            # Initialize audio handler and transcribe
-            audio_handler = AudioHandler()
+            if self._audio_handler is None:
+                self._audio_handler = AudioHandler()
+            audio_handler = self._audio_handler
+
             transcription_result = await audio_handler.transcribe_audio(file_path)
             
             if "error" in transcription_result:
                 return transcription_result
             
-            # Analyze intent from transcript
-            intent_result = await audio_handler.analyze_audio_intent(
-                transcription_result["transcript"], session_context
-            )
-            
             # Combine results
             result = {
                 "type": "audio",
@@ -161,18 +193,26 @@ class MediaProcessor:
                 "duration": transcription_result.get("duration", 0),
                 "confidence": transcription_result.get("confidence", 0.8),
             }
-            result.update(intent_result)
+            if analyze_intent:
+                # Analyze intent from transcript
+                result.update(
+                    await audio_handler.analyze_audio_intent(
+                        transcription_result["transcript"], session_context
+                    )
+                )
             
-            logger.info(f"Audio processing completed: {len(result['transcript'])} chars")
+            logger.info(
+                "Audio processing completed: %s chars", len(result["transcript"])
+            )
             return result
 
         except Exception as e:
-            logger.error(f"Error processing audio: {e}", exc_info=True)
+            logger.warning("Error processing audio: %s", e)
             return {"error": f"Audio processing failed: {str(e)}"}
 
     async def _process_image(
-        self, file_path: Path, session_context: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, Any]:
+        self, file_path: Path, session_context: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
         """
         Process image file for visual analysis.
 
@@ -184,17 +224,18 @@ class MediaProcessor:
             Analysis results
         """
         try:
-            if not self.settings.image_analysis_enabled:
+            if not self._image_enabled:
                 return {"error": "Image analysis is disabled"}
 
-            logger.info(f"Processing image file: {file_path}")
-            
-            # Import ImageAnalyzer here to avoid circular imports
-            from core.image_analyzer import ImageAnalyzer
+            logger.info("Processing image file: %s", file_path)
             
-            # Initialize image analyzer and analyze
-            image_analyzer = ImageAnalyzer()
-            analysis_result = await image_analyzer.analyze_image(file_path, session_context)
+            if self._image_analyzer is None:
+                self._image_analyzer = ImageAnalyzer()
+            image_analyzer = self._image_analyzer
+
+            analysis_result = await image_analyzer.analyze_image(
+                file_path, session_context
+            )
             
             if "error" in analysis_result:
                 return analysis_result
@@ -205,13 +246,27 @@ class MediaProcessor:
             }
             result.update(analysis_result)
             
-            logger.info(f"Image processing completed: {result.get('content_type', 'unknown')}")
+            logger.info(
+                "Image processing completed: %s",
+                result.get("content_type", "unknown"),
+            )
             return result
 
         except Exception as e:
-            logger.error(f"Error processing image: {e}", exc_info=True)
+            logger.warning("Error processing image: %s", e)
             return {"error": f"Image processing failed: {str(e)}"}
 
+    def _schedule_cleanup(self, file_path: Path) -> None:
+        """
+        Clean up temporary file in the background.
+
+        Args:
+            file_path: Path to file to clean up
+        """
+        task = asyncio.create_task(self._cleanup_file(file_path))
+        self._pending_cleanups.add(task)
+        task.add_done_callback(self._pending_cleanups.discard)
+
     async def _cleanup_file(self, file_path: Path) -> None:
         """
         Clean up temporary file.
@@ -222,9 +277,9 @@ class MediaProcessor:
         try:
             if file_path.exists():
                 file_path.unlink()
-                logger.debug(f"Cleaned up temporary file: {file_path}")
+                logger.debug("Cleaned up temporary file: %s", file_path)
         except Exception as e:
-            logger.warning(f"Failed to cleanup file {file_path}: {e}")
+            logger.warning("Failed to cleanup file %s: %s", file_path, e)
 
     def _get_file_suffix(self, file_type: str) -> str:
         """
@@ -236,16 +291,9 @@ class MediaProcessor:
         Returns:
             File suffix
         """
-        suffix_map = {
-            "audio": ".ogg",
-            "voice": ".ogg",
-            "image": ".jpg",
-            "photo": ".jpg",
-            "document": ".pdf",
-        }
-        return suffix_map.get(file_type, ".tmp")
-
-    async def is_media_supported(self, file_type: str) -> bool:
+        return _FILE_SUFFIXES.get(file_type, ".tmp")
+
+    def is_media_supported(self, file_type: str) -> bool:
         """
         Check if media type is supported.
 
@@ -255,8 +303,8 @@ class MediaProcessor:
         Returns:
             True if supported, False otherwise
         """
-        if file_type in ["audio", "voice"]:
-            return self.settings.audio_enabled
-        elif file_type in ["image", "photo"]:
-            return self.settings.image_analysis_enabled
+        if file_type in _AUDIO_TYPES:
+            return self._audio_enabled
+        if file_type in _IMAGE_TYPES:
+            return self._image_enabled
         return False
@@ -1,18 +1,295 @@
 """Unified message processor for handling all types of messages."""
 
+import asyncio
 import logging
-from typing import Any, Dict, Optional
+import random
+from collections.abc import Awaitable, Callable
+from types import ModuleType
+from typing import Any
 
+import orjson
 from aiogram.types import Message
 
-from core.context_processor import process_aux_result
+from core.bot_instance import get_bot_instance
+from core.context_processor import preview_dynamic_context, process_aux_result
 from core.error_messages import get_user_friendly_error_message
+from core.graceful_degradation import get_graceful_degradation_manager
+from core.history_retriever import get_history_retriever
+from core.image_processor import SUPPORTED_IMAGE_MIME_TYPES, ImageProcessor
 from core.llm_client import LLMError, get_llm_client
 from core.prompt_store import get_prompt_store
+from core.semantic_cache import get_semantic_cache
 from core.session_state import get_session_manager
+from settings.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Extracted user message: (content for the dialog model, content kept in history)
+ExtractedContent = tuple[str, str]
+
+# Delay before writing queued sessions, so saves of one chat in a burst coalesce
+_SAVE_DELAY = 0.05
+
+# Context fields that must match for a speculative dialog response to be used
+_SPECULATION_KEYS = ("scenario", "topic", "question", "understanding_level")
+
+# Response templates for image analysis replies
+_MATH_OPENINGS_HIGH_COMPLEX = (
+    "Ого, это выглядит как серьезная математическая задача! 🔢",
+    "Интересно! Сложная задача, но мы справимся! 💪",
+    "Отличная задача! Давайте разберем её по частям! 🧮",
+)
+_MATH_OPENINGS_HIGH_MEDIUM = (
+    "Отличная математическая задача! 🎯",
+    "Я вижу интересную задачу по математике! ✨",
+    "Давайте решим эту задачу вместе! 🤓",
+)
+_MATH_OPENINGS_HIGH_SIMPLE = (
+    "Простая и понятная задача! 👍",
+    "Отличный пример для изучения! 📚",
+    "Давайте разберем эту задачу пошагово! 🎓",
+)
+_MATH_OPENINGS = (
+    "Математическая задача! 🧮",
+    "Давайте разберем эту задачу! 📊",
+    "Интересная задача по математике! ✨",
+)
+_MATH_FOLLOW_UPS = (
+    "Что ты думаешь, с чего нам стоит начать?",
+    "Какая часть задачи кажется тебе самой интересной?",
+    "Есть ли что-то, что тебя смущает в условии?",
+    "Какой подход к решению ты бы выбрал?",
+)
+_DIAGRAM_OPENINGS = (
+    "Отличная схема! 📊",
+    "Интересная диаграмма! 🎨",
+    "Понятная визуализация! 👀",
+    "Хорошо структурированная схема! 📋",
+)
+_DIAGRAM_FOLLOW_UPS = (
+    "Что тебе кажется самым важным в этой схеме?",
+    "Есть ли связи, которые ты не понимаешь?",
+    "Как бы ты объяснил эту схему другу?",
+    "Что нового ты узнал из этой диаграммы?",
+)
+_HUMANITIES_SUBJECTS = frozenset({"history", "literature", "language"})
+_TEXT_OPENINGS_HUMANITIES = (
+    "Интересный исторический текст! 📜",
+    "Отличный литературный отрывок! 📖",
+    "Познавательный текст! 🎓",
+)
+_TEXT_OPENINGS = (
+    "Полезный текст! 📝",
+    "Информативный материал! 📚",
+    "Интересное содержание! ✨",
+)
+_TEXT_FOLLOW_UPS = (
+    "Что тебя больше всего заинтересовало в этом тексте?",
+    "Есть ли что-то, что требует дополнительного объяснения?",
+    "Как ты понимаешь основную идею этого текста?",
+    "Какие вопросы у тебя возникли после прочтения?",
+)
+_PHOTO_OPENINGS_EDUCATIONAL = (
+    "Отличное образовательное изображение! 🎓",
+    "Очень познавательная фотография! 📸",
+    "Интересный материал для изучения! 🔍",
+)
+_PHOTO_OPENINGS = (
+    "Интересное изображение! 📷",
+    "Красивая фотография! ✨",
+    "Любопытный снимок! 👀",
+)
+_PHOTO_FOLLOW_UPS = (
+    "Что ты видишь на этом изображении?",
+    "Какие детали тебя больше всего заинтересовали?",
+    "Что ты думаешь об этом изображении?",
+    "Есть ли что-то, что тебя удивило?",
+)
+_CHART_OPENINGS = (
+    "Отличная диаграмма с данными! 📊",
+    "Интересная визуализация! 📈",
+    "Понятный график! 📉",
+)
+_CHART_FOLLOW_UPS = (
+    "Что показывают эти данные?",
+    "Какие выводы ты можешь сделать?",
+    "Что тебя больше всего удивило в этой диаграмме?",
+    "Как бы ты объяснил эти данные?",
+)
+_GENERAL_OPENINGS = (
+    "Интересное изображение! 🤔",
+    "Любопытный материал! 👀",
+    "Отличный контент для изучения! 📚",
+)
+_GENERAL_FOLLOW_UPS = (
+    "Что ты видишь на этом изображении?",
+    "Какие вопросы у тебя возникли?",
+    "Что тебя больше всего заинтересовало?",
+    "Как ты думаешь, что это может означать?",
+)
+
+
+def _math_openings(ctx: dict[str, Any]) -> tuple[str, ...]:
+    """Vary the opening based on complexity and interest level."""
+    if ctx["interest_level"] != "high":
+        return _MATH_OPENINGS
+    if ctx["complexity_level"] >= 7:
+        return _MATH_OPENINGS_HIGH_COMPLEX
+    if ctx["complexity_level"] >= 4:
+        return _MATH_OPENINGS_HIGH_MEDIUM
+    return _MATH_OPENINGS_HIGH_SIMPLE
+
+
+def _text_openings(ctx: dict[str, Any]) -> tuple[str, ...]:
+    """Pick openings for historical or literary texts separately."""
+    if ctx["subject"] in _HUMANITIES_SUBJECTS:
+        return _TEXT_OPENINGS_HUMANITIES
+    return _TEXT_OPENINGS
+
+
+def _photo_openings(ctx: dict[str, Any]) -> tuple[str, ...]:
+    """Pick openings for photos by their educational value."""
+    if ctx["educational_value"] == "high":
+        return _PHOTO_OPENINGS_EDUCATIONAL
+    return _PHOTO_OPENINGS
+
+
+# Image reply templates by content type. Keys:
+# - openings: phrase tuple, or selector taking the response context
+# - follow_ups: phrase tuple
+# - no_text: reply used when nothing was extracted; if set, the extracted
+#   text is quoted between opening and follow-up
+# - visual_elements: when to point at visual elements ("always" or "high_interest")
+# - discussion_points: whether to list discussion points
+_RESPONSE_TEMPLATES: dict[str, dict[str, Any]] = {
+    "math_problem": {
+        "openings": _math_openings,
+        "follow_ups": _MATH_FOLLOW_UPS,
+        "no_text": (
+            "Я вижу математическую задачу по теме '{topic}'! 🧮 "
+            "Что именно ты хочешь разобрать в этой задаче?"
+        ),
+    },
+    "diagram": {
+        "openings": _DIAGRAM_OPENINGS,
+        "follow_ups": _DIAGRAM_FOLLOW_UPS,
+        "no_text": (
+            "Интересная схема по теме '{topic}'! 📊 "
+            "Расскажи, что ты видишь на этой диаграмме?"
+        ),
+        "visual_elements": "always",
+    },
+    "text": {
+        "openings": _text_openings,
+        "follow_ups": _TEXT_FOLLOW_UPS,
+        "no_text": "Я вижу текст по теме '{topic}'! 📝 Что именно ты хочешь обсудить?",
+        "discussion_points": True,
+    },
+    "photo": {
+        "openings": _photo_openings,
+        "follow_ups": _PHOTO_FOLLOW_UPS,
+        "visual_elements": "high_interest",
+    },
+    "chart": {
+        "openings": _CHART_OPENINGS,
+        "follow_ups": _CHART_FOLLOW_UPS,
+        "no_text": (
+            "Интересная диаграмма по теме '{topic}'! 📊 "
+            "Что ты видишь в этих данных?"
+        ),
+        "visual_elements": "always",
+    },
+    "general": {
+        "openings": _GENERAL_OPENINGS,
+        "follow_ups": _GENERAL_FOLLOW_UPS,
+        "visual_elements": "high_interest",
+    },
+}
+
+
+# Shuffled phrases not yet used in the current pass, per phrase tuple
+_phrase_bags: dict[tuple[str, ...], list[str]] = {}
+
+
+def _pick_phrase(phrases: tuple[str, ...]) -> str:
+    """
+    Pick a phrase, going through each tuple in a shuffled order.
+
+    A new shuffle is made after every full pass, so a phrase is not
+    repeated until all the others have been used.
+
+    Args:
+        phrases: Phrase tuple from the response templates
+
+    Returns:
+        Selected phrase
+    """
+    bag = _phrase_bags.get(phrases)
+    if not bag:
+        bag = random.sample(phrases, len(phrases))
+        _phrase_bags[phrases] = bag
+    return bag.pop()
+
+
+# Shape shared by all image replies; optional parts are empty strings
+_RESPONSE_FORMAT = "{opening}{body}\n\n{follow_up}{visual}{discussion}"
+
+
+def _render_response(template: dict[str, Any], ctx: dict[str, Any]) -> str:
+    """
+    Render image reply from template and response context.
+
+    Args:
+        template: Entry of _RESPONSE_TEMPLATES
+        ctx: Fields of the image analysis used by the templates
+
+    Returns:
+        Response text
+    """
+    extracted_text = ctx["extracted_text"]
+    no_text = template.get("no_text")
+    if no_text is not None and not extracted_text:
+        return no_text.format(topic=ctx["topic"])
+
+    openings = template["openings"]
+    if callable(openings):
+        openings = openings(ctx)
+
+    body = f"\n\n{extracted_text}" if no_text is not None else ""
+
+    visual = ""
+    visual_elements = ctx["visual_elements"]
+    show_visual = template.get("visual_elements")
+    if visual_elements and (
+        show_visual == "always"
+        or (show_visual == "high_interest" and ctx["interest_level"] == "high")
+    ):
+        visual = f"\n\nОбрати внимание на: {visual_elements}"
+
+    discussion = ""
+    discussion_points = ctx["discussion_points"]
+    if template.get("discussion_points") and discussion_points:
+        discussion = f"\n\nМожем обсудить: {', '.join(discussion_points[:3])}"
+
+    return _RESPONSE_FORMAT.format_map(
+        {
+            "opening": _pick_phrase(openings),
+            "body": body,
+            "follow_up": _pick_phrase(template["follow_ups"]),
+            "visual": visual,
+            "discussion": discussion,
+        }
+    )
+
+
+def _speculation_holds(
+    provisional_ctx: dict[str, Any], dynamic_ctx: dict[str, Any]
+) -> bool:
+    """Check that auxiliary analysis confirmed the provisional dialog context."""
+    return all(
+        provisional_ctx.get(key) == dynamic_ctx.get(key) for key in _SPECULATION_KEYS
+    )
+
 
 class UnifiedMessageProcessor:
     """Unified processor for all message types (text, voice, photo, document)."""
@@ -22,16 +299,42 @@ class UnifiedMessageProcessor:
         self.session_manager = get_session_manager()
         self.prompt_store = get_prompt_store()
         self.llm_client = get_llm_client()
+        self.semantic_cache = get_semantic_cache()
+        self.history_retriever = get_history_retriever()
+        self.degradation_manager = get_graceful_degradation_manager()
+        settings = get_settings()
+        self.speculative_dialog = settings.llm_speculative_dialog
+        # Exact-match reuse of dialog responses via the LLM client cache
+        self.dialog_cache_enabled = settings.llm_dialog_cache_enabled
+        # Sessions waiting for the background writer, by chat id
+        self._dirty_sessions: dict[Any, Any] = {}
+        self._save_loop: asyncio.Task | None = None
+        self._image_processor: ImageProcessor | None = None
+        self._handlers_module: ModuleType | None = None
+        # Content extractors by message type, sharing one signature
+        self._extractors: dict[
+            str, Callable[[Message, str, Any], Awaitable[ExtractedContent | None]]
+        ] = {
+            "text": self._extract_text,
+            "voice": self._transcribe_voice_message,
+            "photo": self._extract_media_content,
+            "document": self._extract_media_content,
+        }
 
     async def process_message(
-        self, message: Message, message_type: str = "text"
-    ) -> Optional[str]:
+        self,
+        message: Message,
+        message_type: str = "text",
+        on_partial: Callable[[str], Awaitable[None]] | None = None,
+    ) -> str | None:
         """
         Process any type of message through unified pipeline.
 
         Args:
             message: Telegram message object
             message_type: Type of message ('text', 'voice', 'photo', 'document')
+            on_partial: If set, the dialog response is streamed and this is
+                awaited with the accumulated text after each chunk
 
         Returns:
             Response text or None if error
@@ -46,45 +349,130 @@ class UnifiedMessageProcessor:
             session = await self.session_manager.get_session(chat_id)
 
             # Extract content based on message type
-            content = await self._extract_message_content(message, message_type)
-            if not content:
+            extracted = await self._extract_message_content(
+                message, message_type, session
+            )
+            if not extracted or not extracted[0]:
                 return "Извините, не удалось обработать ваше сообщение."
+            content, history_content = extracted
 
             # Add user message to session history
-            session.add_message("user", content)
-
-            # Two-model flow: auxiliary analysis → context processing → dialog model
-            aux = await self.prompt_store.analyze_context_with_auxiliary_model(
-                session, content
-            )
-            dynamic_ctx = process_aux_result(session, aux)
+            session.add_message("user", history_content)
 
-            # Build messages for dialog model
-            messages = self.prompt_store.build_dialog_context(
-                session, dynamic_ctx, content
+            # Start the auxiliary analysis and history selection right away so
+            # they overlap the semantic cache embedding request
+            aux_task = asyncio.create_task(
+                self.prompt_store.analyze_context_with_auxiliary_model(
+                    session, content
+                )
             )
+            history_task = None
+            if self.history_retriever.enabled:
+                history_task = asyncio.create_task(
+                    self.history_retriever.select_history(session, content)
+                )
 
-            # Generate response with graceful degradation
+            # Semantically equivalent questions skip both model calls
+            cache_scope = (session.understanding_level, session.topic)
+            cache_vector = None
+            response_text = None
+            history = None
             try:
-                response_text = await self.llm_client.generate_response(
-                    messages=messages,
-                    temperature=0.3,
-                    max_tokens=512,
+                if (
+                    self.semantic_cache.enabled
+                    and self.semantic_cache.is_cacheable_query(content)
+                ):
+                    cache_vector = await self.semantic_cache.embed(content)
+                    if cache_vector is not None:
+                        response_text = self.semantic_cache.lookup(
+                            cache_vector, cache_scope
+                        )
+                # History selection is a single embedding request, which
+                # finishes well before the auxiliary model
+                if response_text is None and history_task is not None:
+                    history = await history_task
+            except BaseException:
+                self._discard_task(aux_task)
+                if history_task is not None:
+                    self._discard_task(history_task)
+                raise
+
+            if response_text is not None:
+                self._discard_task(aux_task)
+                if history_task is not None:
+                    self._discard_task(history_task)
+            else:
+                # Optionally start the dialog model on the current session context
+                # so its latency overlaps the auxiliary analysis
+                speculative = None
+                if self.speculative_dialog and on_partial is None:
+                    provisional_ctx = preview_dynamic_context(session)
+                    speculative = asyncio.create_task(
+                        self.llm_client.generate_response(
+                            messages=self.prompt_store.build_dialog_context(
+                                session, provisional_ctx, content, history
+                            ),
+                            temperature=0.3,
+                            max_tokens=512,
+                            cacheable=self.dialog_cache_enabled,
+                        )
+                    )
+
+                # Two-model flow: auxiliary analysis → context processing → dialog model
+                try:
+                    aux = await aux_task
+                except BaseException:
+                    if speculative is not None:
+                        self._discard_task(speculative)
+                    raise
+                dynamic_ctx = process_aux_result(session, aux)
+
+                # Build messages for dialog model
+                messages = self.prompt_store.build_dialog_context(
+                    session, dynamic_ctx, content, history
                 )
-            except LLMError as e:
-                logger.warning("Dialog model failed, using graceful degradation: %s", e)
-                from core.graceful_degradation import get_graceful_degradation_manager
 
-                degradation_manager = get_graceful_degradation_manager()
-                response_text = degradation_manager.handle_dialog_model_failure(
-                    session, content
-                )
+                if speculative is not None and not _speculation_holds(
+                    provisional_ctx, dynamic_ctx
+                ):
+                    logger.info("Context changed, discarding speculative response")
+                    self._discard_task(speculative)
+                    speculative = None
+
+                # Generate response with graceful degradation
+                try:
+                    if speculative is not None:
+                        response_text = await speculative
+                    elif on_partial is None:
+                        response_text = await self.llm_client.generate_response(
+                            messages=messages,
+                            temperature=0.3,
+                            max_tokens=512,
+                            cacheable=self.dialog_cache_enabled,
+                        )
+                    else:
+                        response_text = await self._stream_dialog_response(
+                            messages, on_partial
+                        )
+                except LLMError as e:
+                    logger.warning(
+                        "Dialog model failed, using graceful degradation: %s", e
+                    )
+                    degradation_manager = self.degradation_manager
+                    response_text = degradation_manager.handle_dialog_model_failure(
+                        session, content
+                    )
+                else:
+                    if cache_vector is not None and response_text:
+                        self.semantic_cache.store(
+                            cache_vector, cache_scope, response_text
+                        )
 
             # Add bot response to session history
             session.add_message("assistant", response_text)
 
-            # Save session to persistence
-            await self.session_manager.save_session(session)
+            # Save session in the background so the reply isn't held up by the write
+            self._schedule_save(session)
 
             logger.info("Successfully processed %s message from user %s", message_type, chat_id)
             return response_text
@@ -97,52 +485,146 @@ class UnifiedMessageProcessor:
             logger.exception("Unexpected error processing %s message from user %s", message_type, chat_id)
             return get_user_friendly_error_message(e)
 
+    async def _stream_dialog_response(
+        self,
+        messages: list[dict[str, str]],
+        on_partial: Callable[[str], Awaitable[None]],
+    ) -> str:
+        """
+        Stream dialog model response, reporting progress to on_partial.
+
+        Args:
+            messages: Messages for dialog model
+            on_partial: Callback receiving the text accumulated so far
+
+        Returns:
+            Complete response text
+        """
+        parts: list[str] = []
+        async for chunk in self.llm_client.generate_response_stream(
+            messages=messages,
+            temperature=0.3,
+            max_tokens=512,
+        ):
+            parts.append(chunk)
+            await on_partial("".join(parts))
+        return "".join(parts)
+
+    @staticmethod
+    def _discard_task(task: asyncio.Task) -> None:
+        """Cancel background model request whose result won't be used."""
+        task.cancel()
+        # Swallow a failure that happened before the cancellation landed
+        task.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+    def _get_image_processor(self) -> ImageProcessor:
+        """Get image processor bound to the current bot, reusing it across requests."""
+        bot = get_bot_instance()
+        if self._image_processor is None or self._image_processor.bot is not bot:
+            self._image_processor = ImageProcessor(bot)
+        return self._image_processor
+
+    def _get_media_handlers(self) -> Any:
+        """Get media handlers initialized by the bot, importing their module once."""
+        if self._handlers_module is None:
+            # Import here to avoid circular imports
+            from bot import handlers
+
+            self._handlers_module = handlers
+        # Read on every call since handlers are initialized after startup
+        return self._handlers_module.media_handlers
+
+    def _schedule_save(self, session: Any) -> None:
+        """
+        Queue session for saving without waiting for the write.
+
+        Sessions are written by a single background loop, so several turns
+        of one chat within the save delay are written once, and a session
+        is never saved concurrently with itself.
+
+        Args:
+            session: Session state to save
+        """
+        self._dirty_sessions[session.chat_id] = session
+        if self._save_loop is None or self._save_loop.done():
+            self._save_loop = asyncio.create_task(self._write_dirty_sessions())
+
+    async def _write_dirty_sessions(self) -> None:
+        """Write queued sessions until the queue stays empty."""
+        while self._dirty_sessions:
+            await asyncio.sleep(_SAVE_DELAY)
+            sessions = list(self._dirty_sessions.values())
+            self._dirty_sessions.clear()
+            await asyncio.gather(
+                *(self.session_manager.save_session(session) for session in sessions),
+                return_exceptions=True,
+            )
+
+    async def flush_pending_saves(self) -> None:
+        """Wait for queued session saves to finish."""
+        if self._save_loop is not None:
+            await self._save_loop
+
     async def _extract_message_content(
-        self, message: Message, message_type: str
-    ) -> Optional[str]:
+        self, message: Message, message_type: str, session: Any
+    ) -> ExtractedContent | None:
         """
         Extract content from message based on type.
 
+        Extractors don't modify session history; process_message adds the
+        user message once.
+
         Args:
             message: Telegram message object
             message_type: Type of message
+            session: Session state already loaded for this chat
 
         Returns:
-            Extracted content or None if failed
+            Content for the dialog model and for history, or None if failed
         """
-        if message_type == "text":
-            return message.text or ""
+        extractor = self._extractors.get(message_type)
+        if extractor is None:
+            logger.warning("Unknown message type: %s", message_type)
+            return None
+        return await extractor(message, message_type, session)
 
-        elif message_type == "voice":
-            return await self._transcribe_voice_message(message)
+    async def _extract_text(
+        self, message: Message, _message_type: str, _session: Any
+    ) -> ExtractedContent | None:
+        """
+        Extract content from text message.
 
-        elif message_type in ("photo", "document"):
-            return await self._extract_media_content(message, message_type)
+        Args:
+            message: Telegram message object
+            _message_type: Type of message ('text'), unused
+            _session: Session state already loaded for this chat, unused
 
-        else:
-            logger.warning("Unknown message type: %s", message_type)
-            return None
+        Returns:
+            Message text for both dialog and history
+        """
+        text = message.text or ""
+        return text, text
 
-    async def _transcribe_voice_message(self, message: Message) -> Optional[str]:
+    async def _transcribe_voice_message(
+        self, message: Message, _message_type: str, session: Any
+    ) -> ExtractedContent | None:
         """
         Transcribe voice message to text.
 
         Args:
             message: Telegram message object with voice
+            _message_type: Type of message ('voice'), unused
+            session: Session state already loaded for this chat
 
         Returns:
-            Transcribed text or None if failed
+            Transcript for both dialog and history, or None if failed
         """
         try:
-            # Import here to avoid circular imports
-            from bot.handlers import media_handlers
-
+            media_handlers = self._get_media_handlers()
             if not media_handlers:
                 logger.error("Media handlers not initialized for transcription")
                 return None
 
-            # Get current session context
-            session = await self.session_manager.get_session(message.chat.id)
             session_context = session.to_dict() if session else {}
 
             # Process audio to get transcript
@@ -151,6 +633,8 @@ class UnifiedMessageProcessor:
                 file_type="voice",
                 chat_id=str(message.chat.id),
                 session_context=session_context,
+                # The auxiliary model analyzes the transcript in process_message
+                analyze_intent=False,
             )
 
             if "error" in result:
@@ -163,51 +647,48 @@ class UnifiedMessageProcessor:
                 return None
 
             logger.info("Audio transcribed successfully: %s", transcript[:100])
-            return transcript
+            return transcript, transcript
 
         except Exception as e:
-            logger.error("Error transcribing voice message: %s", e, exc_info=True)
+            logger.warning("Error transcribing voice message: %s", e)
             return None
 
     async def _extract_media_content(
-        self, message: Message, message_type: str
-    ) -> Optional[str]:
+        self, message: Message, message_type: str, session: Any
+    ) -> ExtractedContent | None:
         """
         Extract content from media message (photo/document).
 
         Args:
             message: Telegram message object
             message_type: Type of media ('photo' or 'document')
+            session: Session state already loaded for this chat
 
         Returns:
-            Extracted content or None if failed
+            Generated image response for the dialog and the image content
+            tagged with its type for history, or None if failed
         """
         try:
-            # Import here to avoid circular imports
-            from core.image_processor import ImageProcessor
-
-            # Get current session context
-            session = await self.session_manager.get_session(message.chat.id)
             session_context = session.to_dict() if session else {}
 
             # Determine file_id based on message type
             if message_type == "photo":
-                photo = message.photo[-1] if message.photo else None
-                if not photo:
+                photos = message.photo
+                if not photos:
                     return None
-                file_id = photo.file_id
+                # Sizes are ordered ascending; analyze the largest one
+                file_id = photos[-1].file_id
             elif message_type == "document":
                 document = message.document
-                if not document or not document.mime_type or not document.mime_type.startswith("image/"):
-                    return "Извините, я пока поддерживаю только изображения."
+                if not document or document.mime_type not in SUPPORTED_IMAGE_MIME_TYPES:
+                    unsupported = "Извините, я пока поддерживаю только изображения."
+                    return unsupported, unsupported
                 file_id = document.file_id
             else:
                 return None
 
-            # Process image with new ImageProcessor
-            from core.bot_instance import get_bot_instance
-            bot = get_bot_instance()
-            image_processor = ImageProcessor(bot)
+            # Process image with ImageProcessor
+            image_processor = self._get_image_processor()
             result = await image_processor.process_image_for_analysis(
                 file_id=file_id,
                 session_context=session_context,
@@ -223,67 +704,31 @@ class UnifiedMessageProcessor:
                 session.scenario = "image_analysis"
                 
                 # Update image analysis fields
-                import json
-                session.last_image_analysis = json.dumps(result)
+                session.last_image_analysis = orjson.dumps(result).decode()
                 session.image_analysis_count += 1
-                
-                # Add message with image flag
-                extracted_text = result.get("extracted_text", "")
-                content_type = result.get("content_type", message_type)
-                content = f"[{content_type}] {extracted_text}" if extracted_text else f"[{content_type}] Изображение получено"
-                
-                session.add_message("user", content)
-                await self.session_manager.save_session(session)
-
-            # Add new fields to session context for response generation
-            enhanced_context = session_context.copy()
-            enhanced_context.update({
-                "visual_elements": result.get("visual_elements", ""),
-                "discussion_points": result.get("discussion_points", []),
-                "interest_level": result.get("interest_level", "medium")
-            })
-            
+
+            # History keeps the image content with its type flag
+            extracted_text = result.get("extracted_text", "")
+            content_type = result.get("content_type", message_type)
+            if extracted_text:
+                history_content = f"[{content_type}] {extracted_text}"
+            else:
+                history_content = f"[{content_type}] Изображение получено"
+
             # Generate educational response based on image analysis
-            return await self._generate_image_analysis_response(result, enhanced_context)
+            response = self._generate_image_analysis_response(result)
+            return response, history_content
 
         except Exception as e:
-            logger.error("Error extracting media content: %s", e, exc_info=True)
+            logger.warning("Error extracting media content: %s", e)
             return None
 
-    def _create_synthetic_message(
-        self, transcript: str, original_message: Message
-    ) -> Message:
-        """
-        Create synthetic message object from transcript.
-
-        Args:
-            transcript: Transcribed text
-            original_message: Original message object
-
-        Returns:
-            Synthetic message object with transcript as text
-        """
-        # Create a copy of the original message with transcript as text
-        synthetic_message = original_message.model_copy(
-            update={
-                'text': transcript,
-                'voice': None,
-                'photo': None,
-                'document': None,
-                'content_type': 'text'
-            }
-        )
-        return synthetic_message
-
-    async def _generate_image_analysis_response(
-        self, analysis_result: dict, session_context: dict
-    ) -> str:
+    def _generate_image_analysis_response(self, analysis_result: dict) -> str:
         """
         Generate educational response based on image analysis.
 
         Args:
             analysis_result: Image analysis results
-            session_context: Current session context
 
         Returns:
             Generated response text
@@ -298,260 +743,44 @@ class UnifiedMessageProcessor:
             educational_value = analysis_result.get("educational_value", "medium")
 
             # Generate more engaging and varied responses
-            return await self._generate_engaging_response(
-                content_type, extracted_text, subject, topic, 
-                complexity_level, questions, educational_value, session_context
+            return self._generate_engaging_response(
+                content_type, extracted_text, subject, topic,
+                complexity_level, questions, educational_value,
+                analysis_result.get("visual_elements", ""),
+                analysis_result.get("discussion_points", []),
+                analysis_result.get("interest_level", "medium"),
             )
 
-        except Exception as e:
-            logger.error("Error generating image analysis response: %s", e, exc_info=True)
+        except Exception:
+            logger.exception("Error generating image analysis response")
             return "Я получил ваше изображение. Расскажите, что вы хотели бы узнать об этом?"
 
-    async def _generate_engaging_response(
+    def _generate_engaging_response(
         self, content_type: str, extracted_text: str, subject: str, 
-        topic: str, complexity_level: int, questions: list, 
-        educational_value: str, session_context: dict
+        topic: str, complexity_level: int, questions: list,
+        educational_value: str, visual_elements: str, discussion_points: list,
+        interest_level: str,
     ) -> str:
         """Generate engaging and varied responses based on image analysis."""
-        import random
-        
-        # Get additional fields from analysis result
-        visual_elements = session_context.get("visual_elements", "")
-        discussion_points = session_context.get("discussion_points", [])
-        interest_level = session_context.get("interest_level", "medium")
-        
-        # Get user's learning preferences from session context
-        user_level = session_context.get("user_level", "intermediate")
-        interests = session_context.get("interests", [])
-        
         # Different response styles based on content type and complexity
-        if content_type == "math_problem":
-            return self._generate_math_response(extracted_text, topic, complexity_level, questions, interest_level)
-        
-        elif content_type == "diagram":
-            return self._generate_diagram_response(extracted_text, topic, subject, complexity_level, visual_elements)
-        
-        elif content_type == "text":
-            return self._generate_text_response(extracted_text, topic, subject, questions, discussion_points)
-        
-        elif content_type == "photo":
-            return self._generate_photo_response(extracted_text, topic, subject, educational_value, visual_elements, interest_level)
-        
-        elif content_type == "chart":
-            return self._generate_chart_response(extracted_text, topic, subject, complexity_level, visual_elements)
-        
-        else:
-            return self._generate_general_response(extracted_text, topic, subject, educational_value, visual_elements, interest_level)
-
-    def _generate_math_response(self, extracted_text: str, topic: str, complexity_level: int, questions: list, interest_level: str) -> str:
-        """Generate engaging response for mathematical content."""
-        import random
-        
-        if extracted_text:
-            # Vary the opening based on complexity and interest level
-            if interest_level == "high":
-                if complexity_level >= 7:
-                    openings = [
-                        "Ого, это выглядит как серьезная математическая задача! 🔢",
-                        "Интересно! Сложная задача, но мы справимся! 💪",
-                        "Отличная задача! Давайте разберем её по частям! 🧮"
-                    ]
-                elif complexity_level >= 4:
-                    openings = [
-                        "Отличная математическая задача! 🎯",
-                        "Я вижу интересную задачу по математике! ✨",
-                        "Давайте решим эту задачу вместе! 🤓"
-                    ]
-                else:
-                    openings = [
-                        "Простая и понятная задача! 👍",
-                        "Отличный пример для изучения! 📚",
-                        "Давайте разберем эту задачу пошагово! 🎓"
-                    ]
-            else:
-                openings = [
-                    "Математическая задача! 🧮",
-                    "Давайте разберем эту задачу! 📊",
-                    "Интересная задача по математике! ✨"
-                ]
-            
-            opening = random.choice(openings)
-            
-            # Add engaging follow-up
-            follow_ups = [
-                "Что ты думаешь, с чего нам стоит начать?",
-                "Какая часть задачи кажется тебе самой интересной?",
-                "Есть ли что-то, что тебя смущает в условии?",
-                "Какой подход к решению ты бы выбрал?"
-            ]
-            
-            return f"{opening}\n\n{extracted_text}\n\n{random.choice(follow_ups)}"
-        else:
-            return f"Я вижу математическую задачу по теме '{topic}'! 🧮 Что именно ты хочешь разобрать в этой задаче?"
-
-    def _generate_diagram_response(self, extracted_text: str, topic: str, subject: str, complexity_level: int, visual_elements: str) -> str:
-        """Generate engaging response for diagrams and schemas."""
-        import random
-        
-        if extracted_text:
-            openings = [
-                "Отличная схема! 📊",
-                "Интересная диаграмма! 🎨",
-                "Понятная визуализация! 👀",
-                "Хорошо структурированная схема! 📋"
-            ]
-            
-            opening = random.choice(openings)
-            
-            follow_ups = [
-                "Что тебе кажется самым важным в этой схеме?",
-                "Есть ли связи, которые ты не понимаешь?",
-                "Как бы ты объяснил эту схему другу?",
-                "Что нового ты узнал из этой диаграммы?"
-            ]
-            
-            response = f"{opening}\n\n{extracted_text}\n\n{random.choice(follow_ups)}"
-            
-            # Add visual elements if available
-            if visual_elements:
-                response += f"\n\nОбрати внимание на: {visual_elements}"
-            
-            return response
-        else:
-            return f"Интересная схема по теме '{topic}'! 📊 Расскажи, что ты видишь на этой диаграмме?"
-
-    def _generate_text_response(self, extracted_text: str, topic: str, subject: str, questions: list, discussion_points: list) -> str:
-        """Generate engaging response for text content."""
-        import random
-        
-        if extracted_text:
-            # Check if it's a historical or literary text
-            if subject in ["history", "literature", "language"]:
-                openings = [
-                    "Интересный исторический текст! 📜",
-                    "Отличный литературный отрывок! 📖",
-                    "Познавательный текст! 🎓"
-                ]
-            else:
-                openings = [
-                    "Полезный текст! 📝",
-                    "Информативный материал! 📚",
-                    "Интересное содержание! ✨"
-                ]
-            
-            opening = random.choice(openings)
-            
-            follow_ups = [
-                "Что тебя больше всего заинтересовало в этом тексте?",
-                "Есть ли что-то, что требует дополнительного объяснения?",
-                "Как ты понимаешь основную идею этого текста?",
-                "Какие вопросы у тебя возникли после прочтения?"
-            ]
-            
-            response = f"{opening}\n\n{extracted_text}\n\n{random.choice(follow_ups)}"
-            
-            # Add discussion points if available
-            if discussion_points:
-                response += f"\n\nМожем обсудить: {', '.join(discussion_points[:3])}"
-            
-            return response
-        else:
-            return f"Я вижу текст по теме '{topic}'! 📝 Что именно ты хочешь обсудить?"
-
-    def _generate_photo_response(self, extracted_text: str, topic: str, subject: str, educational_value: str, visual_elements: str, interest_level: str) -> str:
-        """Generate engaging response for photos."""
-        import random
-        
-        if educational_value == "high":
-            openings = [
-                "Отличное образовательное изображение! 🎓",
-                "Очень познавательная фотография! 📸",
-                "Интересный материал для изучения! 🔍"
-            ]
-        else:
-            openings = [
-                "Интересное изображение! 📷",
-                "Красивая фотография! ✨",
-                "Любопытный снимок! 👀"
-            ]
-        
-        opening = random.choice(openings)
-        
-        follow_ups = [
-            "Что ты видишь на этом изображении?",
-            "Какие детали тебя больше всего заинтересовали?",
-            "Что ты думаешь об этом изображении?",
-            "Есть ли что-то, что тебя удивило?"
-        ]
-        
-        response = f"{opening}\n\n{random.choice(follow_ups)}"
-        
-        # Add visual elements if available and interesting
-        if visual_elements and interest_level == "high":
-            response += f"\n\nОбрати внимание на: {visual_elements}"
-        
-        return response
-
-    def _generate_chart_response(self, extracted_text: str, topic: str, subject: str, complexity_level: int, visual_elements: str) -> str:
-        """Generate engaging response for charts and graphs."""
-        import random
-        
-        if extracted_text:
-            openings = [
-                "Отличная диаграмма с данными! 📊",
-                "Интересная визуализация! 📈",
-                "Понятный график! 📉"
-            ]
-            
-            opening = random.choice(openings)
-            
-            follow_ups = [
-                "Что показывают эти данные?",
-                "Какие выводы ты можешь сделать?",
-                "Что тебя больше всего удивило в этой диаграмме?",
-                "Как бы ты объяснил эти данные?"
-            ]
-            
-            response = f"{opening}\n\n{extracted_text}\n\n{random.choice(follow_ups)}"
-            
-            # Add visual elements if available
-            if visual_elements:
-                response += f"\n\nОбрати внимание на: {visual_elements}"
-            
-            return response
-        else:
-            return f"Интересная диаграмма по теме '{topic}'! 📊 Что ты видишь в этих данных?"
-
-    def _generate_general_response(self, extracted_text: str, topic: str, subject: str, educational_value: str, visual_elements: str, interest_level: str) -> str:
-        """Generate engaging response for general content."""
-        import random
-        
-        openings = [
-            "Интересное изображение! 🤔",
-            "Любопытный материал! 👀",
-            "Отличный контент для изучения! 📚"
-        ]
-        
-        opening = random.choice(openings)
-        
-        follow_ups = [
-            "Что ты видишь на этом изображении?",
-            "Какие вопросы у тебя возникли?",
-            "Что тебя больше всего заинтересовало?",
-            "Как ты думаешь, что это может означать?"
-        ]
-        
-        response = f"{opening}\n\n{random.choice(follow_ups)}"
-        
-        # Add visual elements if available and interesting
-        if visual_elements and interest_level == "high":
-            response += f"\n\nОбрати внимание на: {visual_elements}"
-        
-        return response
+        template = _RESPONSE_TEMPLATES.get(content_type, _RESPONSE_TEMPLATES["general"])
+        return _render_response(
+            template,
+            {
+                "extracted_text": extracted_text,
+                "subject": subject,
+                "topic": topic,
+                "complexity_level": complexity_level,
+                "educational_value": educational_value,
+                "visual_elements": visual_elements,
+                "discussion_points": discussion_points,
+                "interest_level": interest_level,
+            },
+        )
 
 
 # Global unified message processor instance
-_unified_processor: Optional[UnifiedMessageProcessor] = None
+_unified_processor: UnifiedMessageProcessor | None = None
 
 
 def get_unified_processor() -> UnifiedMessageProcessor:
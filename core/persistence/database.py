@@ -1,9 +1,11 @@
 """Database manager for SQLite with async/await support."""
 
 import logging
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
 
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
@@ -11,6 +13,31 @@ from settings.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Applied to every new connection. WAL lets readers run alongside a writer
+# and, with synchronous=NORMAL, commits don't wait for an fsync each time.
+_SQLITE_PRAGMAS = (
+    "journal_mode=WAL",
+    "synchronous=NORMAL",
+    "temp_store=MEMORY",
+    "mmap_size=268435456",
+    "cache_size=-64000",
+)
+# Seconds a connection waits for a lock held by another writer
+_SQLITE_BUSY_TIMEOUT = 30
+# Connections kept for concurrent session reads and writes
+_POOL_SIZE = 20
+_POOL_MAX_OVERFLOW = 40
+
+
+def _set_sqlite_pragmas(dbapi_connection, _connection_record) -> None:
+    """Configure a new SQLite connection for concurrent access."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in _SQLITE_PRAGMAS:
+            cursor.execute(f"PRAGMA {pragma}")
+    finally:
+        cursor.close()
+
 
 class DatabaseManager:
     """Manages SQLite database connection and sessions."""
@@ -38,7 +65,11 @@ class DatabaseManager:
                 database_url,
                 echo=False,  # Set to True for SQL debugging
                 future=True,
+                pool_size=_POOL_SIZE,
+                max_overflow=_POOL_MAX_OVERFLOW,
+                connect_args={"timeout": _SQLITE_BUSY_TIMEOUT},
             )
+            event.listen(self.engine.sync_engine, "connect", _set_sqlite_pragmas)
 
             # Create session factory
             self.session_factory = sessionmaker(
@@ -59,8 +90,14 @@ class DatabaseManager:
             await self.engine.dispose()
             logger.info("Database connection closed")
 
-    async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
-        """Get database session."""
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        """
+        Open a database session for one unit of work.
+
+        The session is rolled back on error and closed, returning its
+        connection to the pool, as soon as the block exits.
+        """
         if not self.session_factory:
             msg = "Database not initialized"
             raise RuntimeError(msg)
@@ -71,8 +108,6 @@ class DatabaseManager:
             except Exception:
                 await session.rollback()
                 raise
-            finally:
-                await session.close()
 
     @property
     def is_available(self) -> bool:
@@ -0,0 +1,26 @@
+"""Helpers shared by migration scripts."""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def add_column_if_missing(
+    session: AsyncSession, table: str, column: str, definition: str
+) -> None:
+    """
+    Add a column unless the table already has it.
+
+    Tables created from the current models already contain every column, so
+    the ALTER is skipped there instead of failing.
+
+    Args:
+        session: Session of the running migration
+        table: Table to alter
+        column: Name of the new column
+        definition: Column type and constraints, e.g. "TEXT DEFAULT '{}'"
+    """
+    result = await session.execute(text(f"PRAGMA table_info({table})"))
+    if column not in {row[1] for row in result.all()}:
+        await session.execute(
+            text(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        )
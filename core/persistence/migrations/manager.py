@@ -1,17 +1,39 @@
 """Migration manager for database schema updates."""
 
+import importlib
 import logging
-from pathlib import Path
+import pkgutil
+from functools import cache
+from types import ModuleType
 from typing import Any
 
-from sqlalchemy import text
+from sqlalchemy import inspect, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.persistence.database import get_database_manager
+from core.persistence.migrations import versions
 from core.persistence.models import Base, Migration
 
 logger = logging.getLogger(__name__)
 
+MigrationEntry = tuple[int, str, ModuleType]
+
+
+@cache
+def _migration_registry() -> tuple[MigrationEntry, ...]:
+    """
+    Discover and import migration modules once per process.
+
+    Returns:
+        (version, name, module) for each migration, ordered by version
+    """
+    entries = []
+    for module_info in pkgutil.iter_modules(versions.__path__):
+        name = module_info.name
+        module = importlib.import_module(f"{versions.__name__}.{name}")
+        entries.append((int(name.split("_")[0]), name, module))
+    return tuple(sorted(entries, key=lambda entry: entry[0]))
+
 
 class MigrationManager:
     """Manages database migrations."""
@@ -19,7 +41,6 @@ class MigrationManager:
     def __init__(self) -> None:
         """Initialize migration manager."""
         self.db_manager = get_database_manager()
-        self.migrations_dir = Path(__file__).parent / "versions"
 
     async def initialize(self) -> None:
         """Initialize migration system and apply pending migrations."""
@@ -46,28 +67,35 @@ class MigrationManager:
             return
 
         try:
-            # Get list of available migration files
-            migration_files = sorted(
-                [f for f in self.migrations_dir.glob("*.py") if f.name != "__init__.py"]
-            )
-
-            if not migration_files:
+            migrations = _migration_registry()
+            if not migrations:
                 logger.info("No migration files found")
                 return
 
-            session_gen = self.db_manager.get_session()
-            session = await session_gen.__anext__()
-            try:
-                # Get applied migrations
+            async with self.db_manager.session() as session:
                 applied_migrations = await self._get_applied_migrations(session)
+                pending = [
+                    entry for entry in migrations if entry[0] not in applied_migrations
+                ]
+                if not pending:
+                    return
+
+                # All pending migrations and their records share one transaction
+                for _, name, module in pending:
+                    logger.info("Applying migration: %s", name)
+                    await module.upgrade(session)
+                session.add_all(
+                    [
+                        Migration(version=version, name=name)
+                        for version, name, _ in pending
+                    ]
+                )
+                await session.commit()
 
-                # Apply pending migrations
-                for migration_file in migration_files:
-                    version = int(migration_file.stem.split("_")[0])
-                    if version not in applied_migrations:
-                        await self._apply_migration(session, migration_file, version)
-            finally:
-                await session_gen.aclose()
+                logger.info(
+                    "Applied migrations: %s",
+                    ", ".join(str(version) for version, _, _ in pending),
+                )
 
         except Exception:
             logger.exception("Failed to apply migrations")
@@ -75,56 +103,17 @@ class MigrationManager:
 
     async def _get_applied_migrations(self, session: AsyncSession) -> set[int]:
         """Get set of applied migration versions."""
-        try:
-            result = await session.execute(text("SELECT version FROM migrations"))
-            return {row[0] for row in result.fetchall()}
-        except Exception:  # noqa: BLE001
-            # Table doesn't exist yet, return empty set
-            return set()
-
-    async def _apply_migration(
-        self, session: AsyncSession, migration_file: Path, version: int
-    ) -> None:
-        """Apply a single migration."""
-        try:
-            logger.info("Applying migration: %s", migration_file.name)
-
-            # Import and execute migration
-            migration_module = self._import_migration(migration_file)
-            await migration_module.upgrade(session)
-
-            # Record migration as applied
-            migration_record = Migration(
-                version=version,
-                name=migration_file.stem,
+        connection = await session.connection()
+        has_table = await connection.run_sync(
+            lambda sync_connection: inspect(sync_connection).has_table(
+                Migration.__tablename__
             )
-            session.add(migration_record)
-            await session.commit()
-
-            logger.info("Migration %d applied successfully", version)
-
-        except Exception:
-            logger.exception("Failed to apply migration %d", version)
-            await session.rollback()
-            raise
-
-    def _import_migration(self, migration_file: Path) -> Any:
-        """Import migration module dynamically."""
-        import importlib.util
-        import sys
-
-        spec = importlib.util.spec_from_file_location(
-            migration_file.stem, migration_file
         )
-        if spec is None or spec.loader is None:
-            msg = f"Could not load migration {migration_file}"
-            raise ImportError(msg)
-
-        module = importlib.util.module_from_spec(spec)
-        sys.modules[migration_file.stem] = module
-        spec.loader.exec_module(module)
+        if not has_table:
+            return set()
 
-        return module
+        result = await session.execute(select(Migration.version))
+        return set(result.scalars().all())
 
     async def get_migration_status(self) -> dict[str, Any]:
         """Get current migration status."""
@@ -132,30 +121,20 @@ class MigrationManager:
             return {"status": "database_disabled"}
 
         try:
-            session_gen = self.db_manager.get_session()
-            session = await session_gen.__anext__()
-            try:
+            async with self.db_manager.session() as session:
                 applied_migrations = await self._get_applied_migrations(session)
-                migration_files = sorted(
-                    [
-                        f
-                        for f in self.migrations_dir.glob("*.py")
-                        if f.name != "__init__.py"
-                    ]
-                )
-
-                return {
-                    "status": "available",
-                    "applied_migrations": list(applied_migrations),
-                    "total_migrations": len(migration_files),
-                    "pending_migrations": [
-                        int(f.stem.split("_")[0])
-                        for f in migration_files
-                        if int(f.stem.split("_")[0]) not in applied_migrations
-                    ],
-                }
-            finally:
-                await session_gen.aclose()
+            migrations = _migration_registry()
+
+            return {
+                "status": "available",
+                "applied_migrations": list(applied_migrations),
+                "total_migrations": len(migrations),
+                "pending_migrations": [
+                    version
+                    for version, _, _ in migrations
+                    if version not in applied_migrations
+                ],
+            }
 
         except Exception as e:
             logger.exception("Failed to get migration status")
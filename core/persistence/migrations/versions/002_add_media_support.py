@@ -3,25 +3,27 @@
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.persistence.migrations.helpers import add_column_if_missing
+
 
 async def upgrade(session: AsyncSession) -> None:
     """Apply migration 002: Add media support."""
     # Add new columns to sessions table
-    await session.execute(text("""
-        ALTER TABLE sessions ADD COLUMN media_context TEXT DEFAULT '{}';
-    """))
+    await add_column_if_missing(
+        session, "sessions", "media_context", "TEXT DEFAULT '{}'"
+    )
     
-    await session.execute(text("""
-        ALTER TABLE sessions ADD COLUMN audio_enabled BOOLEAN DEFAULT 1;
-    """))
+    await add_column_if_missing(
+        session, "sessions", "audio_enabled", "BOOLEAN DEFAULT 1"
+    )
     
-    await session.execute(text("""
-        ALTER TABLE sessions ADD COLUMN image_analysis_history TEXT DEFAULT '[]';
-    """))
+    await add_column_if_missing(
+        session, "sessions", "image_analysis_history", "TEXT DEFAULT '[]'"
+    )
 
     # Create media_files table
     await session.execute(text("""
-        CREATE TABLE media_files (
+        CREATE TABLE IF NOT EXISTS media_files (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             chat_id TEXT NOT NULL,
             file_id TEXT NOT NULL,
@@ -37,15 +39,15 @@ async def upgrade(session: AsyncSession) -> None:
 
     # Create indexes for better performance
     await session.execute(text("""
-        CREATE INDEX idx_media_files_chat_id ON media_files (chat_id);
+        CREATE INDEX IF NOT EXISTS idx_media_files_chat_id ON media_files (chat_id);
     """))
     
     await session.execute(text("""
-        CREATE INDEX idx_media_files_file_type ON media_files (file_type);
+        CREATE INDEX IF NOT EXISTS idx_media_files_file_type ON media_files (file_type);
     """))
     
     await session.execute(text("""
-        CREATE INDEX idx_media_files_processed_at ON media_files (processed_at);
+        CREATE INDEX IF NOT EXISTS idx_media_files_processed_at ON media_files (processed_at);
     """))
 
 
@@ -3,26 +3,28 @@
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.persistence.migrations.helpers import add_column_if_missing
+
 
 async def upgrade(session: AsyncSession) -> None:
     """Apply migration 003: Add image analysis fields."""
     # Add new columns to sessions table
-    await session.execute(text("""
-        ALTER TABLE sessions ADD COLUMN last_image_analysis TEXT DEFAULT NULL;
-    """))
+    await add_column_if_missing(
+        session, "sessions", "last_image_analysis", "TEXT DEFAULT NULL"
+    )
     
-    await session.execute(text("""
-        ALTER TABLE sessions ADD COLUMN image_analysis_count INTEGER DEFAULT 0;
-    """))
+    await add_column_if_missing(
+        session, "sessions", "image_analysis_count", "INTEGER DEFAULT 0"
+    )
 
     # Add new columns to messages table
-    await session.execute(text("""
-        ALTER TABLE messages ADD COLUMN has_image BOOLEAN DEFAULT 0;
-    """))
+    await add_column_if_missing(
+        session, "messages", "has_image", "BOOLEAN DEFAULT 0"
+    )
     
-    await session.execute(text("""
-        ALTER TABLE messages ADD COLUMN image_file_id TEXT DEFAULT NULL;
-    """))
+    await add_column_if_missing(
+        session, "messages", "image_file_id", "TEXT DEFAULT NULL"
+    )
 
 
 async def downgrade(session: AsyncSession) -> None:
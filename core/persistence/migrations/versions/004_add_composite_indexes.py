@@ -0,0 +1,47 @@
+"""Migration 004: Add composite indexes for per-chat recent-first queries."""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def upgrade(session: AsyncSession) -> None:
+    """Apply migration 004: Add composite indexes."""
+    # Recent messages of a chat are read straight from the index; the rowid
+    # (id) is implicitly the last index column and breaks timestamp ties
+    await session.execute(text("""
+        CREATE INDEX IF NOT EXISTS idx_messages_chat_id_timestamp
+        ON messages (chat_id, timestamp);
+    """))
+
+    await session.execute(text("""
+        CREATE INDEX IF NOT EXISTS idx_media_files_chat_id_processed_at
+        ON media_files (chat_id, processed_at);
+    """))
+
+    await session.execute(text("""
+        CREATE INDEX IF NOT EXISTS idx_media_files_chat_id_file_type_processed_at
+        ON media_files (chat_id, file_type, processed_at);
+    """))
+
+    # Chat lookups are served by the composite indexes above
+    await session.execute(text("DROP INDEX IF EXISTS idx_messages_chat_id;"))
+    await session.execute(text("DROP INDEX IF EXISTS idx_media_files_chat_id;"))
+
+
+async def downgrade(session: AsyncSession) -> None:
+    """Rollback migration 004: Restore single-column chat indexes."""
+    await session.execute(text("""
+        CREATE INDEX IF NOT EXISTS idx_messages_chat_id ON messages (chat_id);
+    """))
+
+    await session.execute(text("""
+        CREATE INDEX IF NOT EXISTS idx_media_files_chat_id ON media_files (chat_id);
+    """))
+
+    await session.execute(text(
+        "DROP INDEX IF EXISTS idx_media_files_chat_id_file_type_processed_at;"
+    ))
+    await session.execute(text(
+        "DROP INDEX IF EXISTS idx_media_files_chat_id_processed_at;"
+    ))
+    await session.execute(text("DROP INDEX IF EXISTS idx_messages_chat_id_timestamp;"))
@@ -7,6 +7,7 @@ from sqlalchemy import (
     Boolean,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -105,6 +106,9 @@ class Message(Base):
     """Message model for storing chat messages."""
 
     __tablename__ = "messages"
+    __table_args__ = (
+        Index("idx_messages_chat_id_timestamp", "chat_id", "timestamp"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     chat_id: Mapped[str] = mapped_column(
@@ -169,6 +173,15 @@ class MediaFile(Base):
     """Media file model for storing processed media files."""
 
     __tablename__ = "media_files"
+    __table_args__ = (
+        Index("idx_media_files_chat_id_processed_at", "chat_id", "processed_at"),
+        Index(
+            "idx_media_files_chat_id_file_type_processed_at",
+            "chat_id",
+            "file_type",
+            "processed_at",
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     chat_id: Mapped[str] = mapped_column(
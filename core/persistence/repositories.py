@@ -4,13 +4,63 @@ import logging
 from datetime import UTC, datetime, timedelta
 from typing import Any
 
-from sqlalchemy import desc, select
+from sqlalchemy import bindparam, delete, desc, func, insert, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.persistence.database import get_database_manager
 from core.persistence.models import MediaFile, Message, Session
 
 logger = logging.getLogger(__name__)
 
+# Session fields that can be written by save_session
+_SESSION_COLUMNS = frozenset(Session.__table__.columns.keys())
+
+# Message fields returned by reads, same keys as Message.to_dict
+_MESSAGE_COLUMNS = (
+    Message.id,
+    Message.chat_id,
+    Message.role,
+    Message.content,
+    Message.has_image,
+    Message.image_file_id,
+    Message.timestamp,
+)
+
+# Latest messages of a chat, built once and run with chat_id and limit values.
+# Plain column rows skip ORM object hydration for a read-only result
+_RECENT_MESSAGES_QUERY = (
+    select(*_MESSAGE_COLUMNS)
+    .where(Message.chat_id == bindparam("chat_id"))
+    # Messages saved together share a timestamp; id keeps their order
+    .order_by(desc(Message.timestamp), desc(Message.id))
+    .limit(bindparam("limit"))
+)
+
+
+def _new_message_rows(
+    chat_id: str, messages: list[dict[str, Any]]
+) -> list[Message]:
+    """Build Message rows for messages saved together."""
+    # Timestamps come from the column default on the database clock
+    return [
+        Message(chat_id=chat_id, role=message["role"], content=message["content"])
+        for message in messages
+    ]
+
+
+async def _fetch_recent_messages(
+    session: AsyncSession, chat_id: str, limit: int
+) -> list[dict[str, Any]]:
+    """Fetch the latest messages of a chat, oldest first."""
+    result = await session.execute(
+        _RECENT_MESSAGES_QUERY, {"chat_id": chat_id, "limit": limit}
+    )
+    rows = result.all()
+
+    # Reverse order (oldest first)
+    return [row._asdict() for row in reversed(rows)]
+
 
 class SessionRepository:
     """Repository for session operations."""
@@ -25,40 +75,73 @@ class SessionRepository:
             return None
 
         try:
-            async for session in self.db_manager.get_session():
-                result = await session.execute(
-                    select(Session).where(Session.chat_id == chat_id)
-                )
-                return result.scalar_one_or_none()
+            async with self.db_manager.session() as session:
+                return await session.get(Session, chat_id)
 
         except Exception:
             logger.exception("Failed to get session %s", chat_id)
             return None
 
-    async def save_session(self, session_data: dict[str, Any]) -> bool:
-        """Save or update session."""
+    async def get_session_with_messages(
+        self, chat_id: str, limit: int = 30
+    ) -> tuple[Session | None, list[dict[str, Any]]]:
+        """Get session and its recent messages in one database session."""
         if not self.db_manager.is_available:
-            return False
+            return None, []
 
         try:
-            async for session in self.db_manager.get_session():
-                # Check if session exists
-                existing = await session.execute(
-                    select(Session).where(Session.chat_id == session_data["chat_id"])
-                )
-                existing_session = existing.scalar_one_or_none()
-
-                if existing_session:
-                    # Update existing session
-                    for key, value in session_data.items():
-                        if key != "chat_id" and hasattr(existing_session, key):
-                            setattr(existing_session, key, value)
-                    existing_session.updated_at = datetime.now(UTC)
-                else:
-                    # Create new session
-                    new_session = Session.from_dict(session_data)
-                    session.add(new_session)
+            async with self.db_manager.session() as session:
+                session_obj = await session.get(Session, chat_id)
+                if session_obj is None:
+                    return None, []
+                messages = await _fetch_recent_messages(session, chat_id, limit)
+                return session_obj, messages
+
+        except Exception:
+            logger.exception("Failed to get session %s", chat_id)
+            return None, []
+
+    async def save_session(
+        self,
+        session_data: dict[str, Any],
+        new_messages: list[dict[str, Any]] | None = None,
+    ) -> bool:
+        """
+        Save or update session.
+
+        Args:
+            session_data: Session fields keyed by column name
+            new_messages: Messages to add in the same transaction
 
+        Returns:
+            True if saved successfully
+        """
+        if not self.db_manager.is_available:
+            return False
+
+        try:
+            values = {
+                key: value
+                for key, value in session_data.items()
+                if key in _SESSION_COLUMNS
+            }
+            # Insert or update in one statement instead of SELECT then UPDATE
+            stmt = sqlite_insert(Session).values(**values)
+            update_values = {
+                key: stmt.excluded[key] for key in values if key != "chat_id"
+            }
+            # onupdate defaults are not applied to ON CONFLICT updates
+            update_values["updated_at"] = func.now()
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Session.chat_id], set_=update_values
+            )
+
+            async with self.db_manager.session() as session:
+                await session.execute(stmt)
+                if new_messages:
+                    session.add_all(
+                        _new_message_rows(session_data["chat_id"], new_messages)
+                    )
                 await session.commit()
                 return True
 
@@ -72,11 +155,8 @@ class SessionRepository:
             return False
 
         try:
-            async for session in self.db_manager.get_session():
-                result = await session.execute(
-                    select(Session).where(Session.chat_id == chat_id)
-                )
-                session_obj = result.scalar_one_or_none()
+            async with self.db_manager.session() as session:
+                session_obj = await session.get(Session, chat_id)
 
                 if session_obj:
                     await session.delete(session_obj)
@@ -96,19 +176,29 @@ class SessionRepository:
 
         try:
             cutoff_time = datetime.now(UTC) - timedelta(hours=hours)
-            deleted_count = 0
 
-            async for session in self.db_manager.get_session():
-                # Get old sessions
+            async with self.db_manager.session() as session:
+                old_chat_ids = select(Session.chat_id).where(
+                    Session.updated_at < cutoff_time
+                )
+                # Bulk deletes bypass the ORM cascade, so remove children first.
+                # Nothing is loaded in this session, so skip synchronizing it
+                await session.execute(
+                    delete(Message)
+                    .where(Message.chat_id.in_(old_chat_ids))
+                    .execution_options(synchronize_session=False)
+                )
+                await session.execute(
+                    delete(MediaFile)
+                    .where(MediaFile.chat_id.in_(old_chat_ids))
+                    .execution_options(synchronize_session=False)
+                )
                 result = await session.execute(
-                    select(Session).where(Session.updated_at < cutoff_time)
+                    delete(Session)
+                    .where(Session.updated_at < cutoff_time)
+                    .execution_options(synchronize_session=False)
                 )
-                old_sessions = result.scalars().all()
-
-                # Delete old sessions (cascade will delete messages)
-                for session_obj in old_sessions:
-                    await session.delete(session_obj)
-                    deleted_count += 1
+                deleted_count = result.rowcount
 
                 await session.commit()
                 logger.info("Cleaned up %d old sessions", deleted_count)
@@ -132,13 +222,8 @@ class MessageRepository:
             return False
 
         try:
-            async for session in self.db_manager.get_session():
-                message = Message(
-                    chat_id=chat_id,
-                    role=role,
-                    content=content,
-                    timestamp=datetime.now(UTC),
-                )
+            async with self.db_manager.session() as session:
+                message = Message(chat_id=chat_id, role=role, content=content)
                 session.add(message)
                 await session.commit()
                 return True
@@ -147,23 +232,29 @@ class MessageRepository:
             logger.exception("Failed to add message for %s", chat_id)
             return False
 
+    async def add_messages(self, chat_id: str, messages: list[dict[str, Any]]) -> bool:
+        """Add several messages to session in one transaction."""
+        if not self.db_manager.is_available:
+            return False
+
+        try:
+            async with self.db_manager.session() as session:
+                session.add_all(_new_message_rows(chat_id, messages))
+                await session.commit()
+                return True
+
+        except Exception:
+            logger.exception("Failed to add messages for %s", chat_id)
+            return False
+
     async def get_messages(self, chat_id: str, limit: int = 30) -> list[dict[str, Any]]:
         """Get recent messages for session."""
         if not self.db_manager.is_available:
             return []
 
         try:
-            async for session in self.db_manager.get_session():
-                result = await session.execute(
-                    select(Message)
-                    .where(Message.chat_id == chat_id)
-                    .order_by(desc(Message.timestamp))
-                    .limit(limit)
-                )
-                messages = result.scalars().all()
-
-                # Convert to list of dicts and reverse order (oldest first)
-                return [msg.to_dict() for msg in reversed(messages)]
+            async with self.db_manager.session() as session:
+                return await _fetch_recent_messages(session, chat_id, limit)
 
         except Exception:
             logger.exception("Failed to get messages for %s", chat_id)
@@ -175,11 +266,13 @@ class MessageRepository:
             return 0
 
         try:
-            async for session in self.db_manager.get_session():
+            async with self.db_manager.session() as session:
                 result = await session.execute(
-                    select(Message).where(Message.chat_id == chat_id)
+                    select(func.count())
+                    .select_from(Message)
+                    .where(Message.chat_id == chat_id)
                 )
-                return len(result.scalars().all())
+                return result.scalar_one()
 
         except Exception:
             logger.exception("Failed to get message count for %s", chat_id)
@@ -191,16 +284,8 @@ class MessageRepository:
             return False
 
         try:
-            async for session in self.db_manager.get_session():
-                await session.execute(select(Message).where(Message.chat_id == chat_id))
-                result = await session.execute(
-                    select(Message).where(Message.chat_id == chat_id)
-                )
-                messages = result.scalars().all()
-
-                for message in messages:
-                    await session.delete(message)
-
+            async with self.db_manager.session() as session:
+                await session.execute(delete(Message).where(Message.chat_id == chat_id))
                 await session.commit()
                 return True
 
@@ -230,7 +315,7 @@ class MediaFileRepository:
             return False
 
         try:
-            async for session in self.db_manager.get_session():
+            async with self.db_manager.session() as session:
                 media_file = MediaFile(
                     chat_id=chat_id,
                     file_id=file_id,
@@ -238,8 +323,6 @@ class MediaFileRepository:
                     content_type=content_type,
                     analysis_result=analysis_result,
                     context_match=context_match,
-                    processed_at=datetime.now(UTC),
-                    created_at=datetime.now(UTC),
                 )
                 session.add(media_file)
                 await session.commit()
@@ -249,6 +332,32 @@ class MediaFileRepository:
             logger.exception("Failed to add media file for %s", chat_id)
             return False
 
+    async def add_media_files(self, rows: list[dict[str, Any]]) -> bool:
+        """
+        Add several media file records in one transaction.
+
+        Args:
+            rows: Media file fields keyed by column name, e.g. an album's photos
+
+        Returns:
+            True if all records were stored
+        """
+        if not self.db_manager.is_available:
+            return False
+        if not rows:
+            return True
+
+        try:
+            async with self.db_manager.session() as session:
+                # One executemany INSERT and one commit for the whole batch
+                await session.execute(insert(MediaFile), rows)
+                await session.commit()
+                return True
+
+        except Exception:
+            logger.exception("Failed to add %d media files", len(rows))
+            return False
+
     async def get_media_files(
         self, chat_id: str, file_type: str | None = None, limit: int = 10
     ) -> list[dict[str, Any]]:
@@ -257,7 +366,7 @@ class MediaFileRepository:
             return []
 
         try:
-            async for session in self.db_manager.get_session():
+            async with self.db_manager.session() as session:
                 query = select(MediaFile).where(MediaFile.chat_id == chat_id)
                 
                 if file_type:
@@ -280,12 +389,8 @@ class MediaFileRepository:
             return None
 
         try:
-            async for session in self.db_manager.get_session():
-                result = await session.execute(
-                    select(MediaFile).where(MediaFile.id == media_id)
-                )
-                media_file = result.scalar_one_or_none()
-                
+            async with self.db_manager.session() as session:
+                media_file = await session.get(MediaFile, media_id)
                 return media_file.to_dict() if media_file else None
 
         except Exception:
@@ -300,20 +405,18 @@ class MediaFileRepository:
             return False
 
         try:
-            async for session in self.db_manager.get_session():
+            async with self.db_manager.session() as session:
                 result = await session.execute(
-                    select(MediaFile).where(MediaFile.id == media_id)
+                    update(MediaFile)
+                    .where(MediaFile.id == media_id)
+                    .values(
+                        analysis_result=analysis_result,
+                        context_match=context_match,
+                        processed_at=func.now(),
+                    )
                 )
-                media_file = result.scalar_one_or_none()
-
-                if media_file:
-                    media_file.analysis_result = analysis_result
-                    media_file.context_match = context_match
-                    media_file.processed_at = datetime.now(UTC)
-                    await session.commit()
-                    return True
-
-                return False
+                await session.commit()
+                return result.rowcount > 0
 
         except Exception:
             logger.exception("Failed to update media file %d", media_id)
@@ -325,15 +428,10 @@ class MediaFileRepository:
             return False
 
         try:
-            async for session in self.db_manager.get_session():
-                result = await session.execute(
-                    select(MediaFile).where(MediaFile.chat_id == chat_id)
+            async with self.db_manager.session() as session:
+                await session.execute(
+                    delete(MediaFile).where(MediaFile.chat_id == chat_id)
                 )
-                media_files = result.scalars().all()
-
-                for media_file in media_files:
-                    await session.delete(media_file)
-
                 await session.commit()
                 return True
 
@@ -348,17 +446,15 @@ class MediaFileRepository:
 
         try:
             cutoff_time = datetime.now(UTC) - timedelta(hours=hours)
-            deleted_count = 0
 
-            async for session in self.db_manager.get_session():
+            async with self.db_manager.session() as session:
+                # Nothing is loaded in this session, so skip synchronizing it
                 result = await session.execute(
-                    select(MediaFile).where(MediaFile.processed_at < cutoff_time)
+                    delete(MediaFile)
+                    .where(MediaFile.processed_at < cutoff_time)
+                    .execution_options(synchronize_session=False)
                 )
-                old_media_files = result.scalars().all()
-
-                for media_file in old_media_files:
-                    await session.delete(media_file)
-                    deleted_count += 1
+                deleted_count = result.rowcount
 
                 await session.commit()
                 logger.info("Cleaned up %d old media files", deleted_count)
@@ -1,9 +1,10 @@
 """Adapter for integrating persistence layer with existing session management."""
 
-import json
 import logging
 from typing import Any
 
+import orjson
+
 from core.persistence.database import get_database_manager
 from core.persistence.repositories import get_message_repository, get_session_repository
 
@@ -26,14 +27,14 @@ class PersistenceAdapter:
             return None
 
         try:
-            session = await self.session_repo.get_session(chat_id)
+            # Session row and recent messages share one database session
+            session, messages = await self.session_repo.get_session_with_messages(
+                chat_id, limit=30
+            )
             if not session:
                 logger.debug("No session found for %s", chat_id)
                 return None
 
-            # Load recent messages
-            messages = await self.message_repo.get_messages(chat_id, limit=30)
-
             # Convert to session state format
             session_state = {
                 "chat_id": session.chat_id,
@@ -45,7 +46,7 @@ class PersistenceAdapter:
                 "understanding_level": session.understanding_level,
                 "previous_understanding_level": session.previous_understanding_level,
                 "previous_topic": session.previous_topic,
-                "user_preferences": json.loads(session.user_preferences),
+                "user_preferences": orjson.loads(session.user_preferences),
                 "messages": messages,
                 "created_at": session.created_at.isoformat()
                 if session.created_at
@@ -84,32 +85,21 @@ class PersistenceAdapter:
                     "previous_understanding_level"
                 ),
                 "previous_topic": session_state.get("previous_topic"),
-                "user_preferences": json.dumps(
+                "user_preferences": orjson.dumps(
                     session_state.get("user_preferences", [])
-                ),
+                ).decode(),
             }
 
-            # Save session
-            success = await self.session_repo.save_session(session_data)
+            # Only messages after the already stored ones are new
+            messages = session_state.get("messages", [])
+            new_messages = messages[session_state.get("persisted_message_count", 0) :]
+
+            # Session and its new messages are written in one transaction
+            success = await self.session_repo.save_session(session_data, new_messages)
             if not success:
                 logger.error("Failed to save session for %s", chat_id)
                 return False
 
-            # Save new messages (only the latest ones that aren't already saved)
-            messages = session_state.get("messages", [])
-            if messages:
-                # Get existing message count to determine which messages are new
-                existing_count = await self.message_repo.get_message_count(chat_id)
-
-                # Save only new messages (assuming messages are ordered chronologically)
-                new_messages = messages[existing_count:]
-                for message in new_messages:
-                    await self.message_repo.add_message(
-                        chat_id=chat_id,
-                        role=message["role"],
-                        content=message["content"],
-                    )
-
             logger.debug("Saved session state for %s", chat_id)
             return True
 
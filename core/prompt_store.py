@@ -6,7 +6,7 @@ from typing import Any
 from core.context.context_analyzer import ContextAnalyzer
 from core.dialog.dialog_builder import DialogBuilder
 from core.prompts.prompt_loader import PromptLoader
-from core.session_state import SessionState
+from core.session_state import Message, SessionState
 
 logger = logging.getLogger(__name__)
 
@@ -91,12 +91,16 @@ class PromptStore:
         session: SessionState,
         dynamic_ctx: dict[str, Any],
         user_message: str,
+        history: list[Message] | None = None,
     ) -> list[dict[str, str]]:
         """
-        Build messages for dialog model: system (base + dynamic + scenario), history, user.
+        Build messages for dialog model: system (base + scenario), history, dynamic context, user.
         System prompt must be the first and never truncated.
+        If history is None, the latest session messages are used.
         """
-        return self._dialog_builder.build_dialog_context(session, dynamic_ctx, user_message)
+        return self._dialog_builder.build_dialog_context(
+            session, dynamic_ctx, user_message, history
+        )
 
 
     def get_available_topics(self) -> list[str]:
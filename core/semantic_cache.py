@@ -0,0 +1,167 @@
+"""Semantic response cache keyed by embeddings of user questions."""
+
+import heapq
+import itertools
+import logging
+import time
+
+import numpy as np
+from openai import AsyncOpenAI
+
+from core.http_client import get_http_client
+from settings.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Short replies ("да", "ещё") depend on dialog history and must not be cached
+_MIN_QUERY_WORDS = 3
+
+CacheScope = tuple[int, str | None]
+
+
+class _ScopeEntries:
+    """Normalized embeddings and responses cached for one scope."""
+
+    def __init__(self, dimension: int) -> None:
+        self.ids: list[int] = []
+        self.responses: list[str] = []
+        self.matrix = np.empty((0, dimension), dtype=np.float32)
+
+    def add(self, entry_id: int, vector: np.ndarray, response: str) -> None:
+        self.ids.append(entry_id)
+        self.responses.append(response)
+        self.matrix = np.vstack([self.matrix, vector[np.newaxis, :]])
+
+    def remove(self, entry_id: int) -> None:
+        index = self.ids.index(entry_id)
+        del self.ids[index]
+        del self.responses[index]
+        self.matrix = np.delete(self.matrix, index, axis=0)
+
+
+class SemanticCache:
+    """Returns cached responses for questions similar to earlier ones."""
+
+    def __init__(self) -> None:
+        """Initialize semantic cache with settings."""
+        self.settings = get_settings()
+        self.enabled = self.settings.semantic_cache_enabled
+        self.embedding_model = self.settings.embedding_model
+        self.threshold = self.settings.semantic_cache_threshold
+        self.ttl_seconds = self.settings.semantic_cache_ttl
+        self.max_entries = self.settings.semantic_cache_max_entries
+        self.client = AsyncOpenAI(
+            api_key=self.settings.openrouter_api_key,
+            base_url="https://openrouter.ai/api/v1",
+            http_client=get_http_client(),
+        )
+        self._scopes: dict[CacheScope, _ScopeEntries] = {}
+        # Min-heap of (expiry, entry_id, scope) used for TTL and size eviction
+        self._expiry_heap: list[tuple[float, int, CacheScope]] = []
+        self._entry_ids = itertools.count()
+
+    @staticmethod
+    def is_cacheable_query(content: str) -> bool:
+        """Check whether a user message is self-contained enough to cache."""
+        return len(content.split()) >= _MIN_QUERY_WORDS
+
+    async def embed(self, content: str) -> np.ndarray | None:
+        """
+        Compute normalized embedding for user message content.
+
+        Args:
+            content: User message text
+
+        Returns:
+            Unit-length float32 vector or None if embedding failed
+        """
+        try:
+            response = await self.client.embeddings.create(
+                model=self.embedding_model, input=content
+            )
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Embedding request failed, skipping semantic cache: %s", e)
+            return None
+
+        vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            return None
+        return vector / norm
+
+    def lookup(self, vector: np.ndarray, scope: CacheScope) -> str | None:
+        """
+        Find cached response for the most similar earlier question.
+
+        Args:
+            vector: Normalized query embedding
+            scope: (understanding level, topic) the answer must match
+
+        Returns:
+            Cached response text or None on miss
+        """
+        self._evict_expired()
+        entries = self._scopes.get(scope)
+        if entries is None or not entries.ids:
+            return None
+
+        scores = entries.matrix @ vector
+        best = int(np.argmax(scores))
+        if scores[best] <= self.threshold:
+            return None
+
+        logger.info(
+            "Semantic cache hit: scope=%s, similarity=%.3f", scope, scores[best]
+        )
+        return entries.responses[best]
+
+    def store(self, vector: np.ndarray, scope: CacheScope, response: str) -> None:
+        """
+        Cache response for a question embedding.
+
+        Args:
+            vector: Normalized query embedding
+            scope: (understanding level, topic) the answer was generated for
+            response: Response text to cache
+        """
+        entries = self._scopes.get(scope)
+        if entries is None:
+            entries = self._scopes[scope] = _ScopeEntries(vector.shape[0])
+
+        entry_id = next(self._entry_ids)
+        entries.add(entry_id, vector, response)
+        heapq.heappush(
+            self._expiry_heap, (time.monotonic() + self.ttl_seconds, entry_id, scope)
+        )
+
+        # Entries share one TTL, so the heap top is also the oldest entry
+        while len(self._expiry_heap) > self.max_entries:
+            self._pop_oldest()
+
+    def _evict_expired(self) -> None:
+        """Drop entries whose TTL has passed."""
+        now = time.monotonic()
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            self._pop_oldest()
+
+    def _pop_oldest(self) -> None:
+        """Remove the entry at the top of the expiry heap."""
+        _, entry_id, scope = heapq.heappop(self._expiry_heap)
+        entries = self._scopes.get(scope)
+        if entries is None or entry_id not in entries.ids:
+            return
+        entries.remove(entry_id)
+        if not entries.ids:
+            del self._scopes[scope]
+
+
+# Global semantic cache instance
+_semantic_cache: SemanticCache | None = None
+
+
+def get_semantic_cache() -> SemanticCache:
+    """Get global semantic cache instance."""
+    global _semantic_cache  # noqa: PLW0603
+    if _semantic_cache is None:
+        _semantic_cache = SemanticCache()
+    return _semantic_cache
@@ -10,6 +10,7 @@ from core.persistence.database import DatabaseManager
 from core.graceful_degradation import GracefulDegradationManager
 from core.error_messages import ErrorMessageStore
 from core.prompts.prompt_loader import PromptLoader
+from core.context.aux_batcher import get_aux_batcher
 from core.context.context_analyzer import ContextAnalyzer
 from core.dialog.dialog_builder import DialogBuilder
 
@@ -30,7 +31,11 @@ def initialize_services() -> None:
     
     # Register new refactored services
     register_service("prompt_loader", PromptLoader, singleton=True)
-    register_service("context_analyzer", ContextAnalyzer, singleton=True)
+    register_service(
+        "context_analyzer",
+        lambda: ContextAnalyzer(batcher=get_aux_batcher()),
+        singleton=True,
+    )
     register_service("dialog_builder", DialogBuilder, singleton=True)
     
     logger.info("All services registered in DI container")
@@ -22,6 +22,8 @@ class Message:
         self.role = role
         self.content = content
         self.timestamp = datetime.now()
+        # Normalized content embedding, computed on demand by history retrieval
+        self.embedding = None
 
 
 class SessionState:
@@ -53,8 +55,15 @@ class SessionState:
 
         # Conversation history
         self.recent_messages: list[Message] = []
+        # Leading messages of recent_messages already stored in the database
+        self.persisted_message_count: int = 0
         self.updated_at = datetime.now()
 
+    def __setattr__(self, name: str, value: object) -> None:
+        """Set attribute and invalidate the cached dictionary view."""
+        object.__setattr__(self, "_dict_cache", None)
+        object.__setattr__(self, name, value)
+
     def add_message(self, role: str, content: str) -> None:
         """
         Add message to conversation history.
@@ -75,8 +84,17 @@ class SessionState:
         )
 
     def to_dict(self) -> dict:
-        """Convert session state to dictionary for persistence."""
-        return {
+        """
+        Convert session state to dictionary for persistence.
+
+        The dictionary is cached until any attribute is reassigned, so it is
+        shared between callers and must not be modified.
+        """
+        cached = self._dict_cache
+        if cached is not None:
+            return cached
+
+        self._dict_cache = cached = {
             "chat_id": str(self.chat_id),
             "scenario": self.scenario,
             "question": self.question,
@@ -97,9 +115,11 @@ class SessionState:
                 }
                 for msg in self.recent_messages
             ],
+            "persisted_message_count": self.persisted_message_count,
             "created_at": self.updated_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
         }
+        return cached
 
     @classmethod
     def from_dict(cls, data: dict) -> "SessionState":
@@ -211,6 +231,7 @@ class SessionState:
         self.topic = None
         self.understanding_level = 5  # Reset to default medium level
         self.recent_messages.clear()
+        self.persisted_message_count = 0
         self.updated_at = datetime.now()
 
         logger.info("Reset session state for chat %s", self.chat_id)
@@ -243,7 +264,10 @@ class SessionManager:
                     chat_id_str
                 )
                 if session_data:
-                    self._sessions[chat_id_str] = SessionState.from_dict(session_data)
+                    session = SessionState.from_dict(session_data)
+                    # Messages loaded from the database are already stored
+                    session.persisted_message_count = len(session.recent_messages)
+                    self._sessions[chat_id_str] = session
                     logger.info("Loaded session from persistence for chat %s", chat_id)
                     return self._sessions[chat_id_str]
             except Exception as e:  # noqa: BLE001
@@ -268,7 +292,10 @@ class SessionManager:
         if self._persistence_adapter.is_available:
             try:
                 session_data = session.to_dict()
-                await self._persistence_adapter.save_session_state(session_data)
+                saved = await self._persistence_adapter.save_session_state(session_data)
+                if saved:
+                    # Messages added while saving are picked up by the next save
+                    session.persisted_message_count = len(session_data["messages"])
                 logger.debug(
                     "Saved session to persistence for chat %s", session.chat_id
                 )
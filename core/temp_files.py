@@ -0,0 +1,57 @@
+"""Background cleanup of stale temporary media files."""
+
+import asyncio
+import logging
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_SWEEP_INTERVAL_SECONDS = 300
+# Far longer than any download + analysis, so files in use are never removed
+_MAX_FILE_AGE_SECONDS = 600
+
+
+def sweep_temp_dir(
+    temp_dir: Path, max_age_seconds: float = _MAX_FILE_AGE_SECONDS
+) -> int:
+    """
+    Delete files in temporary directory older than the given age.
+
+    Args:
+        temp_dir: Directory with temporary media files
+        max_age_seconds: Minimum age of files to delete
+
+    Returns:
+        Number of files deleted
+    """
+    if not temp_dir.is_dir():
+        return 0
+
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    for path in temp_dir.iterdir():
+        try:
+            if path.is_file() and path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            # Already cleaned up by the request that created it
+            continue
+        except OSError as e:
+            logger.warning("Failed to remove stale temporary file %s: %s", path, e)
+    return removed
+
+
+async def run_temp_sweeper(temp_dir: Path) -> None:
+    """
+    Periodically delete stale files from temporary directory until cancelled.
+
+    Args:
+        temp_dir: Directory with temporary media files
+    """
+    while True:
+        await asyncio.sleep(_SWEEP_INTERVAL_SECONDS)
+        removed = await asyncio.to_thread(sweep_temp_dir, temp_dir)
+        if removed:
+            logger.info("Removed %d stale temporary files from %s", removed, temp_dir)
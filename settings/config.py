@@ -21,6 +21,25 @@ class Settings(BaseSettings):
         min_length=1,
     )
 
+    telegram_global_rate_limit: float = Field(
+        default=30.0,
+        description="Maximum outgoing Telegram messages per second across all chats",
+        ge=1.0,
+        le=1000.0,
+    )
+    telegram_chat_rate_limit: float = Field(
+        default=1.0,
+        description="Maximum outgoing Telegram messages per second in one chat",
+        ge=0.05,
+        le=30.0,
+    )
+    telegram_chat_burst: int = Field(
+        default=3,
+        description="Messages one chat may receive at once before rate limiting",
+        ge=1,
+        le=30,
+    )
+
     # OpenRouter API Configuration
     openrouter_api_key: str = Field(
         ...,
@@ -51,6 +70,90 @@ class Settings(BaseSettings):
         ge=1,
         le=32000,
     )
+    llm_max_concurrent: int = Field(
+        default=8,
+        description="Maximum number of concurrent LLM requests per process",
+        ge=1,
+        le=100,
+    )
+    llm_streaming_enabled: bool = Field(
+        default=False,
+        description="Stream dialog responses by editing the reply as tokens arrive",
+    )
+    llm_speculative_dialog: bool = Field(
+        default=False,
+        description="Start the dialog model in parallel with the auxiliary "
+        "analysis, assuming the topic doesn't change",
+    )
+    llm_dialog_cache_enabled: bool = Field(
+        default=False,
+        description="Reuse dialog responses to exactly identical requests "
+        "(same model, prompt, history and context)",
+    )
+
+    aux_batching_enabled: bool = Field(
+        default=False,
+        description="Analyze concurrent messages with one auxiliary model request",
+    )
+    aux_batch_max_size: int = Field(
+        default=16,
+        description="Maximum number of messages in one auxiliary model request",
+        ge=2,
+        le=64,
+    )
+    aux_batch_max_wait_ms: int = Field(
+        default=50,
+        description="Time to wait for more messages before sending a batch",
+        ge=1,
+        le=1000,
+    )
+
+    # Semantic Cache Configuration
+    semantic_cache_enabled: bool = Field(
+        default=False,
+        description="Reuse responses to semantically similar questions",
+    )
+    embedding_model: str = Field(
+        default="openai/text-embedding-3-small",
+        description="Embedding model used for semantic cache lookups",
+    )
+    semantic_cache_threshold: float = Field(
+        default=0.92,
+        description="Minimum cosine similarity for a semantic cache hit",
+        ge=0.0,
+        le=1.0,
+    )
+    semantic_cache_ttl: int = Field(
+        default=3600,
+        description="Semantic cache entry lifetime in seconds",
+        ge=1,
+        le=604800,
+    )
+    semantic_cache_max_entries: int = Field(
+        default=1000,
+        description="Maximum number of cached responses",
+        ge=1,
+        le=100000,
+    )
+
+    # History Retrieval Configuration
+    history_retrieval_enabled: bool = Field(
+        default=False,
+        description="Send the dialog model recent messages plus the earlier "
+        "messages most relevant to the current one instead of the full history",
+    )
+    history_retrieval_top_k: int = Field(
+        default=10,
+        description="Number of earlier messages selected by relevance",
+        ge=1,
+        le=100,
+    )
+    history_retrieval_recent: int = Field(
+        default=6,
+        description="Number of latest messages always kept in dialog history",
+        ge=1,
+        le=100,
+    )
 
     # Application Settings
     history_limit: int = Field(
@@ -101,12 +204,25 @@ class Settings(BaseSettings):
         default="gpt-4o",
         description="Vision model for image analysis",
     )
+    vision_detail: str = Field(
+        default="auto",
+        description="Vision API image detail level for general image discussion "
+        "(auto, low, high)",
+        pattern="^(auto|low|high)$",
+    )
     max_image_size: int = Field(
         default=5242880,  # 5MB
         description="Maximum image file size in bytes",
         ge=1024,
         le=20971520,  # 20MB
     )
+    max_in_memory_image_size: int = Field(
+        default=10485760,  # 10MB
+        description="Images up to this size in bytes are processed in memory; "
+        "larger ones are buffered in a temporary file",
+        ge=0,
+        le=20971520,  # 20MB
+    )
     max_audio_duration: int = Field(
         default=60,
         description="Maximum audio duration in seconds",
@@ -0,0 +1,121 @@
+"""Tests for micro-batching of auxiliary model requests."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import orjson
+import pytest
+
+from core.context.aux_batcher import AuxBatcher
+
+
+class TestAuxBatcher:
+    """Test cases for AuxBatcher class."""
+
+    @pytest.fixture
+    def mock_settings(self):
+        """Mock settings for testing."""
+        with patch("core.context.aux_batcher.get_settings") as mock:
+            mock_settings = MagicMock()
+            mock_settings.aux_batching_enabled = True
+            mock_settings.aux_batch_max_size = 16
+            mock_settings.aux_batch_max_wait_ms = 10
+            mock.return_value = mock_settings
+            yield mock_settings
+
+    @pytest.fixture
+    def mock_llm_client(self):
+        """Create mock LLM client."""
+        client = MagicMock()
+        client.generate_response = AsyncMock()
+        return client
+
+    @staticmethod
+    def conversation(text):
+        """Build auxiliary request messages."""
+        return [
+            {"role": "system", "content": "Extract dialog parameters."},
+            {"role": "user", "content": text},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_call(
+        self, mock_settings, mock_llm_client
+    ):
+        """Test that requests within the window are sent as one batch."""
+        mock_llm_client.generate_response.return_value = orjson.dumps(
+            {"results": [{"topic": "math"}, {"topic": "space"}]}
+        ).decode()
+        batcher = AuxBatcher(mock_llm_client)
+
+        first, second = await asyncio.gather(
+            batcher.submit(self.conversation("fractions")),
+            batcher.submit(self.conversation("planets")),
+        )
+
+        assert orjson.loads(first) == {"topic": "math"}
+        assert orjson.loads(second) == {"topic": "space"}
+        mock_llm_client.generate_response.assert_called_once()
+        call_kwargs = mock_llm_client.generate_response.call_args.kwargs
+        assert call_kwargs["max_tokens"] == 400
+        prompt = call_kwargs["messages"][1]["content"]
+        assert "Conversation 1:\nuser: fractions" in prompt
+        assert "Conversation 2:\nuser: planets" in prompt
+
+    @pytest.mark.asyncio
+    async def test_single_request_is_sent_unchanged(
+        self, mock_settings, mock_llm_client
+    ):
+        """Test that a lone request is sent with its own messages."""
+        mock_llm_client.generate_response.return_value = '{"topic": "math"}'
+        batcher = AuxBatcher(mock_llm_client)
+        messages = self.conversation("fractions")
+
+        result = await batcher.submit(messages)
+
+        assert result == '{"topic": "math"}'
+        mock_llm_client.generate_response.assert_called_once_with(
+            messages=messages, temperature=0.1, max_tokens=200, cacheable=True
+        )
+
+    @pytest.mark.asyncio
+    async def test_full_batch_is_sent_without_waiting(
+        self, mock_settings, mock_llm_client
+    ):
+        """Test that reaching the batch size sends the batch immediately."""
+        mock_settings.aux_batch_max_size = 2
+        mock_settings.aux_batch_max_wait_ms = 60_000
+        mock_llm_client.generate_response.return_value = orjson.dumps(
+            {"results": [{}, {}]}
+        ).decode()
+        batcher = AuxBatcher(mock_llm_client)
+
+        await asyncio.wait_for(
+            asyncio.gather(
+                batcher.submit(self.conversation("a")),
+                batcher.submit(self.conversation("b")),
+            ),
+            timeout=1,
+        )
+
+        mock_llm_client.generate_response.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_malformed_batch_falls_back_to_separate_requests(
+        self, mock_settings, mock_llm_client
+    ):
+        """Test that a batch response with wrong shape is retried per request."""
+        mock_llm_client.generate_response.side_effect = [
+            '{"results": [{"topic": "math"}]}',
+            '{"topic": "math"}',
+            '{"topic": "space"}',
+        ]
+        batcher = AuxBatcher(mock_llm_client)
+
+        results = await asyncio.gather(
+            batcher.submit(self.conversation("fractions")),
+            batcher.submit(self.conversation("planets")),
+        )
+
+        assert results == ['{"topic": "math"}', '{"topic": "space"}']
+        assert mock_llm_client.generate_response.call_count == 3
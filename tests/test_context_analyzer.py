@@ -16,6 +16,7 @@ class TestContextAnalyzer:
         """Create mock session for testing."""
         session = MagicMock(spec=SessionState)
         session.chat_id = 12345
+        session.scenario = "discussion"
         session.understanding_level = 5
         session.previous_understanding_level = 4
         session.topic = "math"
@@ -103,7 +104,7 @@ class TestContextAnalyzer:
         # Mock LLM error
         mock_llm_client.generate_response.side_effect = Exception("LLM error")
 
-        with patch("core.graceful_degradation.get_graceful_degradation_manager") as mock_degradation:
+        with patch("core.context.context_analyzer.get_graceful_degradation_manager") as mock_degradation:
             mock_degradation_manager = MagicMock()
             mock_degradation_manager.handle_auxiliary_model_failure.return_value = {
                 "scenario": "unknown",
@@ -130,6 +131,114 @@ class TestContextAnalyzer:
                 mock_session, "Test message"
             )
 
+    @pytest.mark.asyncio
+    async def test_analyze_context_with_auxiliary_model_uses_cache(
+        self, mock_session, mock_llm_client
+    ):
+        """Test that repeated messages in the same context reuse the analysis."""
+        mock_llm_client.generate_response.return_value = (
+            '{"scenario": "discussion", "topic": "math"}'
+        )
+
+        analyzer = ContextAnalyzer(mock_llm_client)
+        first = await analyzer.analyze_context_with_auxiliary_model(mock_session, "Да")
+        second = await analyzer.analyze_context_with_auxiliary_model(
+            mock_session, " да "
+        )
+
+        assert first == second == {"scenario": "discussion", "topic": "math"}
+        mock_llm_client.generate_response.assert_called_once()
+
+        # A different topic is a different context
+        mock_session.topic = "science"
+        await analyzer.analyze_context_with_auxiliary_model(mock_session, "Да")
+        assert mock_llm_client.generate_response.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_analyze_context_with_auxiliary_model_cache_is_per_chat(
+        self, mock_session, mock_llm_client
+    ):
+        """Test that the same message in another chat is analyzed separately."""
+        mock_llm_client.generate_response.side_effect = [
+            '{"question": "What is a fraction?"}',
+            '{"question": "What is a cell?"}',
+        ]
+        other_session = MagicMock(spec=SessionState)
+        other_session.chat_id = 67890
+        other_session.scenario = mock_session.scenario
+        other_session.topic = mock_session.topic
+        other_session.understanding_level = mock_session.understanding_level
+        other_session.get_recent_messages.return_value = (
+            mock_session.get_recent_messages.return_value
+        )
+
+        analyzer = ContextAnalyzer(mock_llm_client)
+        first = await analyzer.analyze_context_with_auxiliary_model(
+            mock_session, "объясни ещё раз"
+        )
+        second = await analyzer.analyze_context_with_auxiliary_model(
+            other_session, "объясни ещё раз"
+        )
+
+        assert first == {"question": "What is a fraction?"}
+        assert second == {"question": "What is a cell?"}
+        assert mock_llm_client.generate_response.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_analyze_context_with_auxiliary_model_cache_keys_on_history(
+        self, mock_session, mock_llm_client
+    ):
+        """Test that a different recent history is a different context."""
+        mock_llm_client.generate_response.return_value = '{"scenario": "discussion"}'
+
+        analyzer = ContextAnalyzer(mock_llm_client)
+        await analyzer.analyze_context_with_auxiliary_model(mock_session, "Да")
+        mock_session.get_recent_messages.return_value = [
+            MagicMock(role="bot", content="Want another example?"),
+        ]
+        await analyzer.analyze_context_with_auxiliary_model(mock_session, "Да")
+
+        assert mock_llm_client.generate_response.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_analyze_context_with_auxiliary_model_cache_expires(
+        self, mock_session, mock_llm_client
+    ):
+        """Test that cached analyses are dropped after the TTL."""
+        mock_llm_client.generate_response.return_value = '{"scenario": "discussion"}'
+
+        analyzer = ContextAnalyzer(mock_llm_client)
+        with patch("core.context.context_analyzer.time.monotonic", return_value=0.0):
+            await analyzer.analyze_context_with_auxiliary_model(mock_session, "Да")
+        with patch(
+            "core.context.context_analyzer.time.monotonic", return_value=3601.0
+        ):
+            await analyzer.analyze_context_with_auxiliary_model(mock_session, "Да")
+
+        assert mock_llm_client.generate_response.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_analyze_context_with_auxiliary_model_uses_batcher(
+        self, mock_session, mock_llm_client
+    ):
+        """Test that the request goes through the batcher when batching is enabled."""
+        batcher = MagicMock()
+        batcher.enabled = True
+        batcher.submit = AsyncMock(return_value='{"scenario": "explanation"}')
+
+        analyzer = ContextAnalyzer(mock_llm_client, batcher=batcher)
+        result = await analyzer.analyze_context_with_auxiliary_model(
+            mock_session, "What is 2+2?"
+        )
+
+        assert result == {"scenario": "explanation"}
+        batcher.submit.assert_awaited_once()
+        assert batcher.submit.call_args.args[0][-1] == {
+            "role": "user",
+            "content": "What is 2+2?",
+        }
+        mock_llm_client.generate_response.assert_not_called()
+
     def test_get_fallback_context(self, mock_session):
         """Test fallback context generation."""
         analyzer = ContextAnalyzer()
@@ -1,6 +1,6 @@
 """Tests for Context Processor merging logic."""
 
-from core.context_processor import process_aux_result
+from core.context_processor import preview_dynamic_context, process_aux_result
 from core.session_state import SessionState
 
 
@@ -56,3 +56,20 @@ class TestContextProcessor:
             True,
         }  # depends on initial state after set_topic
         assert ctx["is_new_question"] is False
+
+    def test_preview_matches_unchanged_turn(self):
+        """Preview should predict the context of a turn that changes nothing."""
+        session = SessionState(chat_id="cp5")
+        session.scenario = "discussion"
+        session.topic = "Физика"
+        session.understanding_level = 9
+
+        preview = preview_dynamic_context(session)
+        ctx = process_aux_result(
+            session, {"scenario": "discussion", "topic": "Физика"}
+        )
+
+        for key in ("scenario", "topic", "question", "understanding_level"):
+            assert preview[key] == ctx[key]
+        assert preview["recommendation"] == ctx["recommendation"]
+        assert preview["is_new_topic"] is False
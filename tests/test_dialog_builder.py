@@ -98,11 +98,49 @@ class TestDialogBuilder:
             assert result[-1]["role"] == "user"
             assert result[-1]["content"] == "Test message"
 
-            # Verify system prompt contains dynamic context
-            system_content = result[0]["content"]
-            assert "Context:" in system_content
-            assert "scenario: discussion" in system_content
-            assert "topic: math" in system_content
+            # Static prompts come first, dynamic context right before the user
+            assert result[0]["content"] == "Base system prompt\n\nScenario prompt"
+            dynamic_content = result[-2]["content"]
+            assert result[-2]["role"] == "system"
+            assert "Context:" in dynamic_content
+            assert "scenario: discussion" in dynamic_content
+            assert "topic: math" in dynamic_content
+
+    def test_build_dialog_context_memoizes_system_prompt(
+        self, mock_session, mock_prompt_loader
+    ):
+        """Test that the system prompt is built once per scenario."""
+        builder = DialogBuilder(mock_prompt_loader)
+
+        first = builder.build_dialog_context(
+            mock_session, {"scenario": "discussion"}, "One"
+        )
+        second = builder.build_dialog_context(
+            mock_session, {"scenario": "discussion"}, "Two"
+        )
+
+        assert first[0] == second[0]
+        mock_prompt_loader.get_scenario_prompt.assert_called_once_with("discussion")
+
+    def test_build_dialog_context_does_not_memoize_fallback(self, mock_session):
+        """Test that a prompt loading failure is retried on the next request."""
+        loader = MagicMock()
+        loader.get_system_prompt.return_value = "Base system prompt"
+        loader.get_scenario_prompt.side_effect = [None, "Scenario prompt"]
+        builder = DialogBuilder(loader)
+
+        with patch.object(
+            builder, "_handle_prompt_loading_failure", return_value="Fallback"
+        ):
+            first = builder.build_dialog_context(
+                mock_session, {"scenario": "discussion"}, "One"
+            )
+        second = builder.build_dialog_context(
+            mock_session, {"scenario": "discussion"}, "Two"
+        )
+
+        assert first[0]["content"] == "Base system prompt\n\nFallback"
+        assert second[0]["content"] == "Base system prompt\n\nScenario prompt"
 
     def test_build_dynamic_context_block(self):
         """Test building dynamic context block."""
@@ -202,7 +240,7 @@ class TestDialogBuilder:
 
     def test_handle_prompt_loading_failure(self):
         """Test handling prompt loading failure."""
-        with patch("core.graceful_degradation.get_graceful_degradation_manager") as mock_degradation:
+        with patch("core.dialog.dialog_builder.get_graceful_degradation_manager") as mock_degradation:
             mock_degradation_manager = MagicMock()
             mock_degradation_manager.handle_prompt_loading_failure.return_value = "Fallback prompt"
             mock_degradation.return_value = mock_degradation_manager
@@ -26,8 +26,10 @@ class TestDialogBuilding:
         )
 
         assert messages[0]["role"] == "system"
-        content = messages[0]["content"]
-        # Base + dynamic + scenario prompt must be stitched
+        assert "Context:" not in messages[0]["content"]
+        # Dynamic block follows history so the static prefix stays cacheable
+        assert messages[-2]["role"] == "system"
+        content = messages[-2]["content"]
         assert "Context:" in content
         assert "scenario" in content
         assert "Дроби" in content
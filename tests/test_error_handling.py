@@ -28,6 +28,7 @@ class TestLLMClientErrorHandling:
             mock_settings.return_value.openrouter_model = "test_model"
             mock_settings.return_value.llm_temperature = 0.9
             mock_settings.return_value.llm_max_tokens = 1000
+            mock_settings.return_value.llm_max_concurrent = 8
             return LLMClient()
 
     @pytest.mark.asyncio
@@ -92,7 +92,7 @@ class TestFormattingConfiguration:
             input_text = "**Bold text**"
             
             # Mock time to simulate slow formatting
-            with patch('time.time') as mock_time:
+            with patch('time.perf_counter') as mock_time:
                 mock_time.side_effect = [0, 0.002]  # 2ms > 1ms limit
                 result = formatter.format_message(input_text, "math")
                 
@@ -0,0 +1,107 @@
+"""Tests for relevance-based dialog history selection."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from core.history_retriever import HistoryRetriever
+from core.session_state import SessionState
+
+
+class TestHistoryRetriever:
+    """Test cases for HistoryRetriever class."""
+
+    @pytest.fixture
+    def mock_settings(self):
+        """Mock settings for testing."""
+        with patch("core.history_retriever.get_settings") as mock:
+            mock_settings = MagicMock()
+            mock_settings.openrouter_api_key = "test_api_key"
+            mock_settings.history_retrieval_enabled = True
+            mock_settings.history_retrieval_top_k = 2
+            mock_settings.history_retrieval_recent = 2
+            mock_settings.embedding_model = "openai/text-embedding-3-small"
+            mock.return_value = mock_settings
+            yield mock_settings
+
+    @pytest.fixture
+    def retriever(self, mock_settings):
+        """Create history retriever for testing."""
+        return HistoryRetriever()
+
+    @staticmethod
+    def embeddings_response(*vectors):
+        """Build embeddings API response."""
+        response = MagicMock()
+        response.data = [MagicMock(embedding=list(vector)) for vector in vectors]
+        return response
+
+    @pytest.mark.asyncio
+    async def test_short_history_uses_default(self, retriever):
+        """Test that dialogs fitting into the budget skip retrieval."""
+        session = SessionState(chat_id=1)
+        for text in ("a", "b", "c", "d"):
+            session.add_message("user", text)
+        retriever.client.embeddings.create = AsyncMock()
+
+        assert await retriever.select_history(session, "query") is None
+        retriever.client.embeddings.create.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_selects_relevant_earlier_messages(self, retriever):
+        """Test that the most similar earlier messages precede the recent ones."""
+        session = SessionState(chat_id=1)
+        for text in ("fractions", "weather", "decimals", "sports", "latest", "now"):
+            session.add_message("user", text)
+        retriever.client.embeddings.create = AsyncMock(
+            return_value=self.embeddings_response(
+                (1.0, 0.0),  # query
+                (0.9, 0.1),  # fractions
+                (0.0, 1.0),  # weather
+                (0.8, 0.2),  # decimals
+                (0.1, 0.9),  # sports
+            )
+        )
+
+        history = await retriever.select_history(session, "percentages")
+
+        assert [msg.content for msg in history] == [
+            "fractions",
+            "decimals",
+            "latest",
+            "now",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_embeddings_are_reused_across_turns(self, retriever):
+        """Test that only new messages are embedded on the next turn."""
+        session = SessionState(chat_id=1)
+        for text in ("a", "b", "c", "d", "e"):
+            session.add_message("user", text)
+        retriever.client.embeddings.create = AsyncMock(
+            return_value=self.embeddings_response(
+                (1.0, 0.0), (1.0, 0.0), (0.0, 1.0), (1.0, 1.0)
+            )
+        )
+        await retriever.select_history(session, "query")
+
+        session.add_message("user", "f")
+        retriever.client.embeddings.create = AsyncMock(
+            return_value=self.embeddings_response((1.0, 0.0), (0.5, 0.5))
+        )
+        await retriever.select_history(session, "query")
+
+        call = retriever.client.embeddings.create.call_args
+        assert call.kwargs["input"] == ["query", "d"]
+
+    @pytest.mark.asyncio
+    async def test_embedding_failure_uses_default(self, retriever):
+        """Test that an embedding error falls back to recent history."""
+        session = SessionState(chat_id=1)
+        for text in ("a", "b", "c", "d", "e"):
+            session.add_message("user", text)
+        retriever.client.embeddings.create = AsyncMock(
+            side_effect=Exception("Service unavailable")
+        )
+
+        assert await retriever.select_history(session, "query") is None
@@ -0,0 +1,57 @@
+"""Tests for shared HTTP connection pool."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from core import http_client
+from core.http_client import close_http_client, get_http_client
+from core.llm_client import LLMClient
+
+
+class TestHttpClient:
+    """Test cases for global HTTP client."""
+
+    @pytest.mark.asyncio
+    async def test_get_http_client_singleton(self):
+        """Test that all API clients share one connection pool."""
+        client1 = get_http_client()
+        client2 = get_http_client()
+
+        assert client1 is client2
+        assert client1.timeout.read == 30.0
+        assert client1.timeout.connect == 5.0
+
+    @pytest.mark.asyncio
+    async def test_http2_used_when_available(self, monkeypatch):
+        """Test that HTTP/2 is requested only when the h2 package is installed."""
+        await close_http_client()
+        async_client = MagicMock()
+        monkeypatch.setattr(http_client.httpx, "AsyncClient", async_client)
+
+        for available in (True, False):
+            monkeypatch.setattr(http_client, "_HTTP2_AVAILABLE", available)
+            http_client._http_client = None
+
+            get_http_client()
+
+            assert async_client.call_args.kwargs["http2"] is available
+        http_client._http_client = None
+
+    @pytest.mark.asyncio
+    async def test_close_http_client(self):
+        """Test that closing releases the pool and a new one is created later."""
+        client = get_http_client()
+
+        await close_http_client()
+
+        assert client.is_closed
+        assert http_client._http_client is None
+        assert get_http_client() is not client
+
+    @pytest.mark.asyncio
+    async def test_llm_client_uses_shared_pool(self):
+        """Test that LLM client requests go through the shared pool."""
+        llm_client = LLMClient()
+
+        assert llm_client.client._client is get_http_client()
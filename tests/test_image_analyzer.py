@@ -0,0 +1,62 @@
+"""Tests for image analyzer functionality."""
+
+import numpy as np
+import pytest
+from unittest.mock import patch
+
+from PIL import Image, ImageEnhance
+
+from core.image_analyzer import ImageAnalyzer
+
+
+class TestImageAnalyzer:
+    """Test cases for ImageAnalyzer class."""
+
+    @pytest.fixture
+    def image_analyzer(self):
+        """Create ImageAnalyzer instance for testing."""
+        with patch('core.image_analyzer.get_settings') as mock_settings:
+            mock_settings.return_value.vision_model = "gpt-4o"
+            mock_settings.return_value.openrouter_api_key = "test-key"
+            mock_settings.return_value.image_analysis_enabled = True
+            mock_settings.return_value.max_image_size = 5242880
+            return ImageAnalyzer()
+
+    @pytest.fixture
+    def sample_image_path(self, tmp_path):
+        """Create a noisy sample image for enhancement tests."""
+        rng = np.random.default_rng(42)
+        pixels = rng.integers(0, 256, size=(64, 96, 3), dtype=np.uint8)
+        img_path = tmp_path / "sample.png"
+        Image.fromarray(pixels).save(img_path)
+        return img_path
+
+    @pytest.mark.asyncio
+    async def test_optimize_image_matches_image_enhance(
+        self, image_analyzer, sample_image_path, tmp_path
+    ):
+        """Fused enhancement should match sequential ImageEnhance output."""
+        output_path = tmp_path / "optimized.png"
+        with patch.object(Image.Image, "save", autospec=True) as mock_save:
+            result = await image_analyzer.optimize_image_for_analysis(
+                sample_image_path, output_path
+            )
+
+        assert result is True
+        optimized = np.asarray(mock_save.call_args.args[0], dtype=np.int16)
+
+        with Image.open(sample_image_path) as img:
+            expected = ImageEnhance.Contrast(img.convert("RGB")).enhance(1.2)
+            expected = ImageEnhance.Brightness(expected).enhance(1.1)
+        expected_arr = np.asarray(expected, dtype=np.int16)
+
+        assert optimized.shape == expected_arr.shape
+        assert np.abs(optimized - expected_arr).max() <= 2
+
+    @pytest.mark.asyncio
+    async def test_optimize_image_invalid_input(self, image_analyzer, tmp_path):
+        """Optimization of a missing file should fail gracefully."""
+        result = await image_analyzer.optimize_image_for_analysis(
+            tmp_path / "missing.jpg", tmp_path / "out.jpg"
+        )
+        assert result is False
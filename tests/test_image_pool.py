@@ -0,0 +1,88 @@
+"""Tests for image process pool helpers."""
+
+import base64
+import io
+
+import pytest
+from PIL import Image
+
+from core.image_pool import (
+    get_image_executor,
+    process_image_for_vision,
+    run_image_job,
+    shutdown_image_executor,
+)
+
+
+def _decode(image_data: str) -> Image.Image:
+    """Decode base64 JPEG data returned by the pool helpers."""
+    return Image.open(io.BytesIO(base64.b64decode(image_data)))
+
+
+class TestProcessImageForVision:
+    """Test cases for the picklable image preparation function."""
+
+    def test_small_jpeg_bytes_are_reused(self):
+        """Small RGB JPEGs are base64 encoded without re-encoding."""
+        buffer = io.BytesIO()
+        Image.new("RGB", (50, 40), color="red").save(buffer, format="JPEG")
+        raw = buffer.getvalue()
+
+        result = process_image_for_vision(raw, 1024)
+
+        assert base64.b64decode(result) == raw
+
+    def test_large_image_is_resized(self, tmp_path):
+        """Oversized images are downscaled to fit max_size."""
+        img_path = tmp_path / "large.jpg"
+        Image.new("RGB", (4000, 3000), color="green").save(img_path)
+
+        result = process_image_for_vision(img_path, 1024)
+
+        with _decode(result) as img:
+            assert img.format == "JPEG"
+            assert img.size == (1024, 768)
+
+    def test_non_rgb_image_is_converted(self):
+        """Images in other modes are converted to RGB JPEG."""
+        buffer = io.BytesIO()
+        Image.new("RGBA", (30, 30), color=(0, 0, 255, 128)).save(buffer, format="PNG")
+
+        result = process_image_for_vision(buffer.getvalue(), 1024)
+
+        with _decode(result) as img:
+            assert img.mode == "RGB"
+            assert img.size == (30, 30)
+
+
+class TestImageExecutor:
+    """Test cases for the global image process pool."""
+
+    @pytest.mark.asyncio
+    async def test_run_image_job_in_pool(self):
+        """Jobs run in the process pool and return base64 data."""
+        buffer = io.BytesIO()
+        Image.new("RGB", (2048, 100), color="blue").save(buffer, format="PNG")
+
+        try:
+            result = await run_image_job(buffer.getvalue(), 512)
+        finally:
+            shutdown_image_executor()
+
+        with _decode(result) as img:
+            assert img.size == (512, 25)
+
+    def test_executor_singleton(self):
+        """The executor is created once and recreated after shutdown."""
+        try:
+            executor1 = get_image_executor()
+            executor2 = get_image_executor()
+            assert executor1 is executor2
+        finally:
+            shutdown_image_executor()
+
+        executor3 = get_image_executor()
+        try:
+            assert executor3 is not executor1
+        finally:
+            shutdown_image_executor()
@@ -71,6 +71,30 @@ class TestImageProcessor:
         # Should be base64 encoded
         assert len(result) > 0
 
+    @pytest.mark.asyncio
+    async def test_prepare_image_reuses_small_jpeg(self, image_processor, sample_image_path):
+        """Test that small RGB JPEGs are sent without re-encoding."""
+        import base64
+
+        result = await image_processor.prepare_image(sample_image_path)
+        assert result == base64.b64encode(sample_image_path.read_bytes()).decode("ascii")
+
+    @pytest.mark.asyncio
+    async def test_prepare_image_reencodes_large_image(self, image_processor, tmp_path):
+        """Test that oversized images are resized and re-encoded as JPEG."""
+        import base64
+        import io
+
+        from PIL import Image
+        img_path = tmp_path / "large.png"
+        Image.new('RGB', (2000, 1000), color='blue').save(img_path)
+
+        result = await image_processor.prepare_image(img_path)
+
+        with Image.open(io.BytesIO(base64.b64decode(result))) as prepared:
+            assert prepared.format == "JPEG"
+            assert prepared.size == (1024, 512)
+
     @pytest.mark.asyncio
     async def test_prepare_image_invalid(self, image_processor):
         """Test image preparation with invalid file."""
@@ -118,6 +142,11 @@ class TestImageProcessor:
         assert result["extracted_text"] == "2+2=?"
         assert result["subject"] == "mathematics"
 
+        # General discussion uses the configurable detail level, not "high"
+        call_kwargs = mock_client.chat.completions.create.call_args.kwargs
+        image_part = call_kwargs["messages"][0]["content"][1]
+        assert image_part["image_url"]["detail"] == image_processor.vision_detail
+
     @pytest.mark.asyncio
     @patch('core.image_processor.openai.AsyncOpenAI')
     async def test_analyze_with_vision_api_json_error(self, mock_openai, image_processor):
@@ -151,22 +180,21 @@ class TestImageProcessor:
         mock_file.file_path = "photos/file_123.jpg"
         mock_bot.get_file.return_value = mock_file
         
-        # Mock file content
-        mock_content = MagicMock()
-        mock_content.read.return_value = b"fake image data"
-        mock_bot.download_file.return_value = mock_content
-        
-        # Mock tempfile to use our tmp_path
-        with patch('tempfile.NamedTemporaryFile') as mock_temp:
-            mock_temp_file = MagicMock()
-            mock_temp_file.name = str(tmp_path / "temp_image.jpg")
-            mock_temp.return_value = mock_temp_file
-            
-            result = await image_processor.download_image("file_123")
-            
-            assert result is not None
-            assert result.exists()
-            assert result.read_bytes() == b"fake image data"
+        # Mock streaming the file content to the destination
+        async def download_file(file_path, destination):
+            destination.write_bytes(b"fake image data")
+
+        mock_bot.download_file.side_effect = download_file
+        image_processor.temp_dir = tmp_path
+
+        result = await image_processor.download_image("file_123")
+
+        assert result is not None
+        assert result.parent == tmp_path
+        assert result.read_bytes() == b"fake image data"
+        mock_bot.download_file.assert_awaited_once_with(
+            "photos/file_123.jpg", destination=result
+        )
 
     @pytest.mark.asyncio
     async def test_download_image_no_bot(self, image_processor):
@@ -184,9 +212,12 @@ class TestImageProcessor:
         assert result is None
 
     @pytest.mark.asyncio
-    async def test_download_image_failed_download(self, image_processor, mock_bot):
+    async def test_download_image_failed_download(
+        self, image_processor, mock_bot, tmp_path
+    ):
         """Test image download with failed download_file."""
         image_processor.bot = mock_bot
+        image_processor.temp_dir = tmp_path
         
         # Mock file info
         mock_file = MagicMock()
@@ -194,7 +225,52 @@ class TestImageProcessor:
         mock_bot.get_file.return_value = mock_file
         
         # Mock failed download
-        mock_bot.download_file.return_value = None
+        mock_bot.download_file.side_effect = Exception("Network error")
         
         result = await image_processor.download_image("file_123")
         assert result is None
+        # The temporary file is removed again
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_process_image_in_memory(self, image_processor, mock_bot, sample_image_path):
+        """Test that small images are analyzed without a temporary file."""
+        import io
+
+        image_processor.bot = mock_bot
+        mock_file = MagicMock()
+        mock_file.file_path = "photos/file_123.jpg"
+        mock_file.file_size = sample_image_path.stat().st_size
+        mock_bot.get_file.return_value = mock_file
+        mock_bot.download_file.return_value = io.BytesIO(sample_image_path.read_bytes())
+
+        with patch.object(image_processor, '_download_to_disk') as mock_disk, \
+             patch.object(image_processor, '_analyze_with_vision_api',
+                          new=AsyncMock(return_value={"content_type": "photo"})) as mock_analyze:
+            result = await image_processor.process_image_for_analysis("file_123")
+
+        assert result == {"content_type": "photo"}
+        mock_disk.assert_not_called()
+        mock_bot.get_file.assert_awaited_once_with("file_123")
+        assert isinstance(mock_analyze.call_args.args[0], str)
+
+    @pytest.mark.asyncio
+    async def test_process_image_large_file_uses_disk(self, image_processor, mock_bot, sample_image_path):
+        """Test that images above the in-memory cap are buffered on disk."""
+        image_processor.bot = mock_bot
+        mock_file = MagicMock()
+        mock_file.file_path = "photos/file_123.jpg"
+        mock_file.file_size = image_processor.max_in_memory_image_size + 1
+        mock_bot.get_file.return_value = mock_file
+
+        with patch.object(image_processor, '_download_to_memory') as mock_memory, \
+             patch.object(image_processor, '_download_to_disk',
+                          new=AsyncMock(return_value=sample_image_path)), \
+             patch.object(image_processor, '_analyze_with_vision_api',
+                          new=AsyncMock(return_value={"content_type": "photo"})):
+            result = await image_processor.process_image_for_analysis("file_123")
+
+        assert result == {"content_type": "photo"}
+        mock_memory.assert_not_called()
+        # Temporary file is removed after processing
+        assert not sample_image_path.exists()
@@ -1,5 +1,6 @@
 """Tests for LLM client functionality."""
 
+import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -28,6 +29,7 @@ class TestLLMClient:
             mock_settings.openrouter_model = "gpt-4o-mini"
             mock_settings.llm_temperature = 0.9
             mock_settings.llm_max_tokens = 1000
+            mock_settings.llm_max_concurrent = 8
             mock.return_value = mock_settings
             yield mock_settings
 
@@ -310,6 +312,383 @@ class TestLLMClient:
         with pytest.raises(LLMError):
             await llm_client.generate_response(messages)
 
+    @pytest.mark.asyncio
+    async def test_generate_response_retries_with_backoff(self, llm_client):
+        """Test transient errors are retried up to three attempts with backoff."""
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = "Third time lucky"
+        mock_response.usage = None
+
+        mock_request = MagicMock()
+        error = APIConnectionError(request=mock_request, message="Connection failed")
+
+        llm_client.client.chat.completions.create = AsyncMock(
+            side_effect=[error, error, mock_response],
+        )
+
+        messages = [{"role": "user", "content": "Test"}]
+        with patch("core.llm_client.asyncio.sleep", new=AsyncMock()) as mock_sleep:
+            response = await llm_client.generate_response(messages)
+
+        assert response == "Third time lucky"
+        assert llm_client.client.chat.completions.create.call_count == 3
+        delays = [call.args[0] for call in mock_sleep.await_args_list]
+        assert len(delays) == 2
+        assert 0.5 <= delays[0] <= 0.75
+        assert 1.0 <= delays[1] <= 1.25
+
+    @pytest.mark.asyncio
+    async def test_generate_response_limits_concurrency(self, mock_settings):
+        """Test that in-flight requests are bounded by llm_max_concurrent."""
+        mock_settings.llm_max_concurrent = 2
+        llm_client = LLMClient()
+
+        in_flight = 0
+        max_in_flight = 0
+
+        async def slow_create(**kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            response = MagicMock()
+            response.choices = [MagicMock()]
+            response.choices[0].message.content = "ok"
+            response.usage = None
+            return response
+
+        llm_client.client.chat.completions.create = slow_create
+
+        results = await asyncio.gather(
+            *(
+                llm_client.generate_response([{"role": "user", "content": f"Test {i}"}])
+                for i in range(5)
+            )
+        )
+
+        assert results == ["ok"] * 5
+        assert max_in_flight == 2
+
+    @pytest.mark.asyncio
+    async def test_generate_response_coalesces_identical_requests(self, llm_client):
+        """Test that identical concurrent requests share one API call."""
+        calls = 0
+
+        async def slow_create(**kwargs):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            response = MagicMock()
+            response.choices = [MagicMock()]
+            response.choices[0].message.content = "shared"
+            response.usage = None
+            return response
+
+        llm_client.client.chat.completions.create = slow_create
+
+        messages = [{"role": "user", "content": "Test"}]
+        results = await asyncio.gather(
+            *(llm_client.generate_response(messages) for _ in range(3))
+        )
+
+        assert results == ["shared"] * 3
+        assert calls == 1
+        assert llm_client._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_generate_response_coalesced_error_reaches_all_callers(
+        self, llm_client
+    ):
+        """Test that a failed shared request raises for every waiting caller."""
+
+        async def failing_create(**kwargs):
+            await asyncio.sleep(0.01)
+            raise APIError("Bad request", request=MagicMock(), body=None)
+
+        llm_client.client.chat.completions.create = failing_create
+
+        messages = [{"role": "user", "content": "Test"}]
+        results = await asyncio.gather(
+            *(llm_client.generate_response(messages) for _ in range(2)),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(result, LLMAPIError) for result in results)
+        assert llm_client._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_shared_request(self, llm_client):
+        """Test that cancelling one caller leaves the shared request running."""
+
+        async def slow_create(**kwargs):
+            await asyncio.sleep(0.02)
+            response = MagicMock()
+            response.choices = [MagicMock()]
+            response.choices[0].message.content = "shared"
+            response.usage = None
+            return response
+
+        llm_client.client.chat.completions.create = slow_create
+
+        messages = [{"role": "user", "content": "Test"}]
+        first = asyncio.create_task(llm_client.generate_response(messages))
+        second = asyncio.create_task(llm_client.generate_response(messages))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == "shared"
+        assert first.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_sole_caller_cancels_request(self, llm_client):
+        """Test that a request nobody waits for anymore is cancelled."""
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def slow_create(**kwargs):
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        llm_client.client.chat.completions.create = slow_create
+
+        messages = [{"role": "user", "content": "Test"}]
+        caller = asyncio.create_task(llm_client.generate_response(messages))
+        await started.wait()
+        caller.cancel()
+
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        assert caller.cancelled()
+        assert llm_client._inflight == {}
+        assert llm_client._inflight_waiters == {}
+
+    @pytest.mark.asyncio
+    async def test_generate_response_cache_hit_skips_request(self, llm_client):
+        """Test that deterministic requests are served from cache."""
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = "Cached response"
+        mock_response.usage = None
+
+        llm_client.client.chat.completions.create = AsyncMock(
+            return_value=mock_response
+        )
+
+        messages = [{"role": "user", "content": "Test"}]
+        first = await llm_client.generate_response(messages, temperature=0.0)
+        second = await llm_client.generate_response(messages, temperature=0.0)
+
+        assert first == second == "Cached response"
+        assert llm_client.client.chat.completions.create.call_count == 1
+        assert llm_client.cache_stats() == {"hits": 1, "misses": 1, "size": 1}
+
+    @pytest.mark.asyncio
+    async def test_generate_response_cacheable_flag(self, llm_client):
+        """Test that cacheable requests are cached above zero temperature."""
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = "Aux response"
+        mock_response.usage = None
+
+        llm_client.client.chat.completions.create = AsyncMock(
+            return_value=mock_response
+        )
+
+        messages = [{"role": "user", "content": "Test"}]
+        for _ in range(2):
+            await llm_client.generate_response(
+                messages, temperature=0.1, cacheable=True
+            )
+        # Same payload with a different max_tokens is a separate entry
+        await llm_client.generate_response(
+            messages, temperature=0.1, max_tokens=50, cacheable=True
+        )
+
+        assert llm_client.client.chat.completions.create.call_count == 2
+        assert llm_client.cache_stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_generate_response_not_cached_by_default(self, llm_client):
+        """Test that non-deterministic requests always hit the API."""
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = "Fresh response"
+        mock_response.usage = None
+
+        llm_client.client.chat.completions.create = AsyncMock(
+            return_value=mock_response
+        )
+
+        messages = [{"role": "user", "content": "Test"}]
+        await llm_client.generate_response(messages)
+        await llm_client.generate_response(messages)
+
+        assert llm_client.client.chat.completions.create.call_count == 2
+        assert llm_client.cache_stats() == {"hits": 0, "misses": 0, "size": 0}
+
+    @pytest.mark.asyncio
+    async def test_generate_response_cache_evicts_oldest(self, llm_client):
+        """Test that the cache is bounded and evicts least recently used."""
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = "ok"
+        mock_response.usage = None
+
+        llm_client.client.chat.completions.create = AsyncMock(
+            return_value=mock_response
+        )
+
+        with patch("core.llm_client._RESPONSE_CACHE_SIZE", 2):
+            for content in ("a", "b", "c"):
+                await llm_client.generate_response(
+                    [{"role": "user", "content": content}], temperature=0.0
+                )
+            await llm_client.generate_response(
+                [{"role": "user", "content": "a"}], temperature=0.0
+            )
+
+        assert llm_client.cache_stats()["size"] == 2
+        assert llm_client.cache_stats()["hits"] == 0
+        assert llm_client.client.chat.completions.create.call_count == 4
+
+    @pytest.mark.asyncio
+    async def test_generate_response_marks_system_prompt_for_anthropic(
+        self, mock_settings
+    ):
+        """Test that Anthropic models get a cache_control breakpoint."""
+        mock_settings.openrouter_model = "anthropic/claude-3.5-haiku"
+        llm_client = LLMClient()
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = "ok"
+        mock_response.usage = None
+
+        llm_client.client.chat.completions.create = AsyncMock(
+            return_value=mock_response
+        )
+
+        messages = [
+            {"role": "system", "content": "Base prompt"},
+            {"role": "user", "content": "Test"},
+        ]
+        await llm_client.generate_response(messages)
+
+        sent = llm_client.client.chat.completions.create.call_args[1]["messages"]
+        assert sent[0]["content"] == [
+            {
+                "type": "text",
+                "text": "Base prompt",
+                "cache_control": {"type": "ephemeral"},
+            }
+        ]
+        assert sent[1] == messages[1]
+        # Caller's messages are left untouched
+        assert messages[0]["content"] == "Base prompt"
+
+    @pytest.mark.asyncio
+    async def test_generate_response_marks_history_prefix_for_anthropic(
+        self, mock_settings
+    ):
+        """Test that the last history message before dynamic context is marked."""
+        mock_settings.openrouter_model = "anthropic/claude-3.5-haiku"
+        llm_client = LLMClient()
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = "ok"
+        mock_response.usage = None
+
+        llm_client.client.chat.completions.create = AsyncMock(
+            return_value=mock_response
+        )
+
+        messages = [
+            {"role": "system", "content": "Base prompt"},
+            {"role": "user", "content": "Hi"},
+            {"role": "assistant", "content": "Hello"},
+            {"role": "system", "content": "Context:"},
+            {"role": "user", "content": "Test"},
+        ]
+        await llm_client.generate_response(messages)
+
+        sent = llm_client.client.chat.completions.create.call_args[1]["messages"]
+        assert sent[2] == {
+            "role": "assistant",
+            "content": [
+                {
+                    "type": "text",
+                    "text": "Hello",
+                    "cache_control": {"type": "ephemeral"},
+                }
+            ],
+        }
+        assert sent[1] == messages[1]
+        assert sent[3:] == messages[3:]
+
+    @staticmethod
+    def make_stream(*parts, error=None):
+        """Build async chunk stream like the one returned with stream=True."""
+
+        async def stream():
+            for part in parts:
+                chunk = MagicMock()
+                chunk.choices = [MagicMock()]
+                chunk.choices[0].delta.content = part
+                yield chunk
+            if error is not None:
+                raise error
+
+        return stream()
+
+    @pytest.mark.asyncio
+    async def test_generate_response_stream(self, llm_client):
+        """Test that streamed chunks are yielded as they arrive."""
+        llm_client.client.chat.completions.create = AsyncMock(
+            return_value=self.make_stream("Hel", None, "lo")
+        )
+
+        messages = [{"role": "user", "content": "Test"}]
+        chunks = [c async for c in llm_client.generate_response_stream(messages)]
+
+        assert chunks == ["Hel", "lo"]
+        assert llm_client.client.chat.completions.create.call_args[1]["stream"]
+
+    @pytest.mark.asyncio
+    async def test_generate_response_stream_retries_open(self, llm_client):
+        """Test that opening the stream is retried on connection errors."""
+        error = APIConnectionError(request=MagicMock(), message="Connection failed")
+        llm_client.client.chat.completions.create = AsyncMock(
+            side_effect=[error, self.make_stream("ok")]
+        )
+
+        messages = [{"role": "user", "content": "Test"}]
+        with patch("core.llm_client.asyncio.sleep", new=AsyncMock()):
+            chunks = [c async for c in llm_client.generate_response_stream(messages)]
+
+        assert chunks == ["ok"]
+        assert llm_client.client.chat.completions.create.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_generate_response_stream_interrupted(self, llm_client):
+        """Test that a broken stream raises LLMError without retrying."""
+        error = APIConnectionError(request=MagicMock(), message="Connection reset")
+        llm_client.client.chat.completions.create = AsyncMock(
+            return_value=self.make_stream("partial", error=error)
+        )
+
+        messages = [{"role": "user", "content": "Test"}]
+        chunks = []
+        with pytest.raises(LLMError):
+            async for chunk in llm_client.generate_response_stream(messages):
+                chunks.append(chunk)
+
+        assert chunks == ["partial"]
+        assert llm_client.client.chat.completions.create.call_count == 1
+
     @pytest.mark.asyncio
     async def test_generate_response_empty_content(self, llm_client):
         """Test response with empty content."""
@@ -355,6 +734,7 @@ class TestGlobalLLMClient:
             mock_settings.return_value.openrouter_model = "test_model"
             mock_settings.return_value.llm_temperature = 0.9
             mock_settings.return_value.llm_max_tokens = 1000
+            mock_settings.return_value.llm_max_concurrent = 8
 
             client1 = get_llm_client()
             client2 = get_llm_client()
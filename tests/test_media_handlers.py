@@ -17,6 +17,13 @@ class TestMediaHandlers:
         mock_bot = MagicMock()
         return MediaHandlers(mock_bot)
 
+    def test_media_processor_shares_handlers(self, media_handlers):
+        """Test that media handlers and processor use the same API clients."""
+        processor = media_handlers.media_processor
+
+        assert processor._audio_handler is media_handlers.audio_handler
+        assert processor._image_analyzer is media_handlers.image_analyzer
+
     @pytest.fixture
     def mock_message(self):
         """Create mock Telegram message for testing."""
@@ -219,6 +226,18 @@ class TestMediaHandlers:
         assert result is not None
         assert "только изображения" in result.lower()
 
+    @pytest.mark.asyncio
+    async def test_handle_document_message_unsupported_image(
+        self, media_handlers, mock_document_message
+    ):
+        """Test that image types the analyzer cannot read are rejected."""
+        mock_document_message.document.mime_type = "image/svg+xml"
+
+        result = await media_handlers.handle_document_message(mock_document_message, None)
+
+        assert result is not None
+        assert "только изображения" in result.lower()
+
     @pytest.mark.asyncio
     async def test_generate_media_response_explanation(self, media_handlers):
         """Test media response generation for explanation scenario."""
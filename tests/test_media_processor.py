@@ -115,17 +115,82 @@ class TestMediaProcessor:
             assert "Failed to download file" in result["error"]
 
     @pytest.mark.asyncio
-    async def test_is_media_supported(self, media_processor):
+    async def test_download_file_streams_to_disk(self, media_processor, tmp_path):
+        """Test that downloads are written straight to the temp file path."""
+        media_processor.temp_dir = tmp_path
+        mock_file = MagicMock()
+        mock_file.file_path = "voice/file_123.ogg"
+        media_processor.bot.get_file = AsyncMock(return_value=mock_file)
+        media_processor.bot.download_file = AsyncMock(return_value=None)
+
+        result = await media_processor._download_file("file_123", "voice")
+
+        assert result is not None
+        assert result.parent == tmp_path
+        assert result.suffix == ".ogg"
+        media_processor.bot.download_file.assert_awaited_once_with(
+            "voice/file_123.ogg", destination=result
+        )
+
+    @pytest.mark.asyncio
+    async def test_download_file_failure_removes_temp_file(
+        self, media_processor, tmp_path
+    ):
+        """Test that a failed download doesn't leave a temp file behind."""
+        media_processor.temp_dir = tmp_path
+        mock_file = MagicMock()
+        mock_file.file_path = "voice/file_123.ogg"
+        media_processor.bot.get_file = AsyncMock(return_value=mock_file)
+        media_processor.bot.download_file = AsyncMock(
+            side_effect=Exception("Connection reset")
+        )
+
+        result = await media_processor._download_file("file_123", "voice")
+
+        assert result is None
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_audio_handler_reused_across_requests(self, media_processor):
+        """Test that the audio handler is created once and reused."""
+        with patch('core.media_processor.AudioHandler') as mock_handler_class:
+            handler = mock_handler_class.return_value
+            handler.transcribe_audio = AsyncMock(return_value={"transcript": "Привет"})
+            handler.analyze_audio_intent = AsyncMock(return_value={})
+
+            await media_processor._process_audio(Path("a.ogg"))
+            await media_processor._process_audio(Path("b.ogg"))
+
+            mock_handler_class.assert_called_once_with()
+            assert handler.transcribe_audio.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_process_audio_can_skip_intent_analysis(self, media_processor):
+        """Test that callers analyzing the transcript themselves skip intent."""
+        with patch('core.media_processor.AudioHandler') as mock_handler_class:
+            handler = mock_handler_class.return_value
+            handler.transcribe_audio = AsyncMock(return_value={"transcript": "Привет"})
+            handler.analyze_audio_intent = AsyncMock(return_value={"intent": "question"})
+
+            result = await media_processor._process_audio(
+                Path("a.ogg"), analyze_intent=False
+            )
+
+            assert result["transcript"] == "Привет"
+            assert "intent" not in result
+            handler.analyze_audio_intent.assert_not_called()
+
+    def test_is_media_supported(self, media_processor):
         """Test media type support checking."""
         # Test supported types
-        assert await media_processor.is_media_supported("audio") is True
-        assert await media_processor.is_media_supported("voice") is True
-        assert await media_processor.is_media_supported("image") is True
-        assert await media_processor.is_media_supported("photo") is True
+        assert media_processor.is_media_supported("audio") is True
+        assert media_processor.is_media_supported("voice") is True
+        assert media_processor.is_media_supported("image") is True
+        assert media_processor.is_media_supported("photo") is True
         
         # Test unsupported types
-        assert await media_processor.is_media_supported("video") is False
-        assert await media_processor.is_media_supported("document") is False
+        assert media_processor.is_media_supported("video") is False
+        assert media_processor.is_media_supported("document") is False
 
     def test_get_file_suffix(self, media_processor):
         """Test file suffix mapping."""
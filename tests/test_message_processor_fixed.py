@@ -123,6 +123,7 @@ class TestUnifiedMessageProcessor:
             assert result == "Test response"
             mock_session.add_message.assert_any_call("user", "Test message")
             mock_session.add_message.assert_called_with("assistant", "Test response")
+            await processor.flush_pending_saves()
             mock_session_manager.return_value.save_session.assert_called_once_with(
                 mock_session
             )
@@ -247,6 +248,7 @@ class TestUnifiedMessageProcessor:
                 file_type="voice",
                 chat_id="67890",
                 session_context={"chat_id": "67890"},
+                analyze_intent=False,
             )
             mock_session.add_message.assert_any_call("user", "Transcribed text")
 
@@ -353,25 +355,6 @@ class TestUnifiedMessageProcessor:
             from core.message_processor import UnifiedMessageProcessor
 
             processor = UnifiedMessageProcessor()
-            result = await processor._extract_message_content(mock_message, "unknown")
+            result = await processor._extract_message_content(mock_message, "unknown", None)
 
             assert result is None
-
-    @pytest.mark.asyncio
-    async def test_create_synthetic_message(self, mock_voice_message):
-        """Test creation of synthetic message from transcript."""
-        with patch("core.service_registry.get_session_manager") as mock_session_manager:
-            mock_session_manager.return_value = MagicMock()
-            
-            from core.message_processor import UnifiedMessageProcessor
-
-            processor = UnifiedMessageProcessor()
-            synthetic = processor._create_synthetic_message(
-                "Transcribed text", mock_voice_message
-            )
-
-            assert synthetic.text == "Transcribed text"
-            assert synthetic.voice is None
-            assert synthetic.photo is None
-            assert synthetic.document is None
-            assert synthetic.content_type == "text"
@@ -1,5 +1,6 @@
 """Simplified tests for unified message processor functionality."""
 
+import asyncio
 import datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -72,10 +73,55 @@ class TestUnifiedMessageProcessorSimple:
             assert result == "Test response"
             mock_session.add_message.assert_any_call("user", "Test message")
             mock_session.add_message.assert_called_with("assistant", "Test response")
+            await processor.flush_pending_saves()
             mock_session_manager.return_value.save_session.assert_called_once_with(
                 mock_session
             )
 
+    @pytest.mark.asyncio
+    async def test_process_text_message_dialog_cache(self, mock_message):
+        """Test that the dialog request is marked cacheable when enabled."""
+        with (
+            patch("core.message_processor.get_session_manager") as mock_session_manager,
+            patch("core.message_processor.get_prompt_store") as mock_prompt_store,
+            patch("core.message_processor.get_llm_client") as mock_llm_client,
+            patch("core.message_processor.process_aux_result") as mock_process_aux,
+        ):
+            mock_session = MagicMock()
+            mock_session_manager.return_value.get_session = AsyncMock(
+                return_value=mock_session
+            )
+            mock_session_manager.return_value.save_session = AsyncMock()
+
+            mock_store = MagicMock()
+            mock_store.analyze_context_with_auxiliary_model = AsyncMock(
+                return_value={"scenario": "discussion", "topic": "test"}
+            )
+            mock_store.build_dialog_context.return_value = [
+                {"role": "user", "content": "test"}
+            ]
+            mock_prompt_store.return_value = mock_store
+
+            mock_client = MagicMock()
+            mock_client.generate_response = AsyncMock(return_value="Test response")
+            mock_llm_client.return_value = mock_client
+
+            mock_process_aux.return_value = {"scenario": "discussion", "topic": "test"}
+
+            from core.message_processor import UnifiedMessageProcessor
+
+            processor = UnifiedMessageProcessor()
+            processor.dialog_cache_enabled = True
+            result = await processor.process_message(mock_message, "text")
+
+            assert result == "Test response"
+            mock_client.generate_response.assert_called_once_with(
+                messages=[{"role": "user", "content": "test"}],
+                temperature=0.3,
+                max_tokens=512,
+                cacheable=True,
+            )
+
     @pytest.mark.asyncio
     async def test_process_text_message_llm_error_with_graceful_degradation(
         self, mock_message
@@ -86,7 +132,7 @@ class TestUnifiedMessageProcessorSimple:
             patch("core.message_processor.get_prompt_store") as mock_prompt_store,
             patch("core.message_processor.get_llm_client") as mock_llm_client,
             patch("core.message_processor.process_aux_result") as mock_process_aux,
-            patch("core.graceful_degradation.get_graceful_degradation_manager") as mock_degradation,
+            patch("core.message_processor.get_graceful_degradation_manager") as mock_degradation,
         ):
             # Mock session
             mock_session = MagicMock()
@@ -146,25 +192,304 @@ class TestUnifiedMessageProcessorSimple:
             from core.message_processor import UnifiedMessageProcessor
 
             processor = UnifiedMessageProcessor()
-            result = await processor._extract_message_content(mock_message, "unknown")
+            result = await processor._extract_message_content(mock_message, "unknown", None)
 
             assert result is None
 
     @pytest.mark.asyncio
-    async def test_create_synthetic_message(self, mock_message):
-        """Test creation of synthetic message from transcript."""
+    async def test_extract_media_content_leaves_history_to_caller(self):
+        """Test that photo extraction returns the history entry instead of adding it."""
+        with patch("core.message_processor.get_session_manager"):
+            from core.message_processor import UnifiedMessageProcessor
+
+            processor = UnifiedMessageProcessor()
+            image_processor = MagicMock()
+            image_processor.process_image_for_analysis = AsyncMock(
+                return_value={"extracted_text": "2 + 2", "content_type": "math_problem"}
+            )
+            processor._get_image_processor = MagicMock(return_value=image_processor)
+            processor._generate_image_analysis_response = MagicMock(
+                return_value="Image response"
+            )
+            message = MagicMock()
+            message.photo = [MagicMock(file_id="photo_file_id")]
+            session = MagicMock()
+            session.image_analysis_count = 0
+
+            result = await processor._extract_media_content(message, "photo", session)
+
+            assert result == ("Image response", "[math_problem] 2 + 2")
+            assert session.image_analysis_count == 1
+            session.add_message.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_session_saved_in_background(self, mock_message):
+        """Test that the reply doesn't wait for the session write."""
+        with (
+            patch("core.message_processor.get_session_manager") as mock_session_manager,
+            patch("core.message_processor.get_prompt_store") as mock_prompt_store,
+            patch("core.message_processor.get_llm_client") as mock_llm_client,
+            patch("core.message_processor.process_aux_result"),
+        ):
+            save_started = asyncio.Event()
+            release_save = asyncio.Event()
+            saved = []
+
+            async def slow_save(session):
+                save_started.set()
+                await release_save.wait()
+                saved.append(session)
+
+            mock_session = MagicMock()
+            mock_session_manager.return_value.get_session = AsyncMock(
+                return_value=mock_session
+            )
+            mock_session_manager.return_value.save_session = slow_save
+
+            mock_store = MagicMock()
+            mock_store.analyze_context_with_auxiliary_model = AsyncMock(return_value={})
+            mock_prompt_store.return_value = mock_store
+
+            mock_client = MagicMock()
+            mock_client.generate_response = AsyncMock(return_value="Test response")
+            mock_llm_client.return_value = mock_client
+
+            from core.message_processor import UnifiedMessageProcessor
+
+            processor = UnifiedMessageProcessor()
+            result = await processor.process_message(mock_message, "text")
+
+            assert result == "Test response"
+            await save_started.wait()
+            assert saved == []
+
+            release_save.set()
+            await processor.flush_pending_saves()
+            assert saved == [mock_session]
+            assert not processor._dirty_sessions
+
+    @pytest.mark.asyncio
+    async def test_session_saves_are_coalesced(self):
+        """Test that repeated saves of one chat in a burst are written once."""
         with patch("core.message_processor.get_session_manager") as mock_session_manager:
-            mock_session_manager.return_value = MagicMock()
-            
+            mock_session_manager.return_value.save_session = AsyncMock()
+
+            from core.message_processor import UnifiedMessageProcessor
+
+            processor = UnifiedMessageProcessor()
+            first_chat = MagicMock(chat_id=1)
+            second_chat = MagicMock(chat_id=2)
+
+            processor._schedule_save(first_chat)
+            processor._schedule_save(second_chat)
+            processor._schedule_save(first_chat)
+            await processor.flush_pending_saves()
+
+            save_session = mock_session_manager.return_value.save_session
+            assert save_session.await_count == 2
+            save_session.assert_any_await(first_chat)
+            save_session.assert_any_await(second_chat)
+
+    @pytest.mark.asyncio
+    async def test_process_text_message_streaming(self, mock_message):
+        """Test that streamed responses are reported as they grow."""
+        with (
+            patch("core.message_processor.get_session_manager") as mock_session_manager,
+            patch("core.message_processor.get_prompt_store") as mock_prompt_store,
+            patch("core.message_processor.get_llm_client") as mock_llm_client,
+            patch("core.message_processor.process_aux_result"),
+        ):
+            mock_session = MagicMock()
+            mock_session_manager.return_value.get_session = AsyncMock(
+                return_value=mock_session
+            )
+            mock_session_manager.return_value.save_session = AsyncMock()
+
+            mock_store = MagicMock()
+            mock_store.analyze_context_with_auxiliary_model = AsyncMock(return_value={})
+            mock_prompt_store.return_value = mock_store
+
+            async def stream(**kwargs):
+                for part in ("Hello", ", ", "world"):
+                    yield part
+
+            mock_client = MagicMock()
+            mock_client.generate_response_stream = stream
+            mock_llm_client.return_value = mock_client
+
+            from core.message_processor import UnifiedMessageProcessor
+
+            partials = []
+
+            async def on_partial(text):
+                partials.append(text)
+
+            processor = UnifiedMessageProcessor()
+            result = await processor.process_message(
+                mock_message, "text", on_partial=on_partial
+            )
+
+            assert result == "Hello, world"
+            assert partials == ["Hello", "Hello, ", "Hello, world"]
+            mock_client.generate_response.assert_not_called()
+            mock_session.add_message.assert_called_with("assistant", "Hello, world")
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("aux_ctx", "expected_calls", "expected_response"),
+        [
+            ({"scenario": "discussion", "topic": "math"}, 1, "About math"),
+            ({"scenario": "discussion", "topic": "physics"}, 2, "About physics"),
+        ],
+    )
+    async def test_process_text_message_speculative_dialog(
+        self, mock_message, aux_ctx, expected_calls, expected_response
+    ):
+        """Test that speculative response is used only if the context holds."""
+        with (
+            patch("core.message_processor.get_session_manager") as mock_session_manager,
+            patch("core.message_processor.get_prompt_store") as mock_prompt_store,
+            patch("core.message_processor.get_llm_client") as mock_llm_client,
+            patch("core.message_processor.process_aux_result") as mock_process_aux,
+            patch("core.message_processor.preview_dynamic_context") as mock_preview,
+        ):
+            mock_session = MagicMock()
+            mock_session_manager.return_value.get_session = AsyncMock(
+                return_value=mock_session
+            )
+            mock_session_manager.return_value.save_session = AsyncMock()
+
+            mock_store = MagicMock()
+            mock_store.analyze_context_with_auxiliary_model = AsyncMock(return_value={})
+            mock_store.build_dialog_context.side_effect = lambda session, ctx, text, history: [
+                {"role": "system", "content": ctx["topic"]}
+            ]
+            mock_prompt_store.return_value = mock_store
+
+            mock_preview.return_value = {"scenario": "discussion", "topic": "math"}
+            mock_process_aux.return_value = aux_ctx
+
+            async def generate(messages, **kwargs):
+                return f"About {messages[0]['content']}"
+
+            mock_client = MagicMock()
+            mock_client.generate_response = AsyncMock(side_effect=generate)
+            mock_llm_client.return_value = mock_client
+
+            from core.message_processor import UnifiedMessageProcessor
+
+            processor = UnifiedMessageProcessor()
+            processor.speculative_dialog = True
+            result = await processor.process_message(mock_message, "text")
+
+            assert result == expected_response
+            assert mock_client.generate_response.call_count == expected_calls
+
+    @pytest.mark.asyncio
+    async def test_process_text_message_semantic_cache_hit_cancels_aux(
+        self, mock_message
+    ):
+        """Test that a semantic cache hit cancels the overlapping aux analysis."""
+        with (
+            patch("core.message_processor.get_session_manager") as mock_session_manager,
+            patch("core.message_processor.get_prompt_store") as mock_prompt_store,
+            patch("core.message_processor.get_llm_client") as mock_llm_client,
+            patch("core.message_processor.get_semantic_cache") as mock_semantic_cache,
+        ):
+            mock_session = MagicMock()
+            mock_session_manager.return_value.get_session = AsyncMock(
+                return_value=mock_session
+            )
+            mock_session_manager.return_value.save_session = AsyncMock()
+
+            aux_started = asyncio.Event()
+            aux_cancelled = asyncio.Event()
+
+            async def slow_aux(session, content):
+                aux_started.set()
+                try:
+                    await asyncio.Event().wait()
+                except asyncio.CancelledError:
+                    aux_cancelled.set()
+                    raise
+
+            async def embed(content):
+                await aux_started.wait()
+                return [1.0]
+
+            mock_store = MagicMock()
+            mock_store.analyze_context_with_auxiliary_model = slow_aux
+            mock_prompt_store.return_value = mock_store
+
+            cache = MagicMock()
+            cache.enabled = True
+            cache.is_cacheable_query.return_value = True
+            cache.embed = embed
+            cache.lookup.return_value = "Cached response"
+            mock_semantic_cache.return_value = cache
+
+            mock_client = MagicMock()
+            mock_client.generate_response = AsyncMock()
+            mock_llm_client.return_value = mock_client
+
+            from core.message_processor import UnifiedMessageProcessor
+
+            processor = UnifiedMessageProcessor()
+            result = await processor.process_message(mock_message, "text")
+
+            assert result == "Cached response"
+            await asyncio.wait_for(aux_cancelled.wait(), timeout=1)
+            mock_client.generate_response.assert_not_called()
+
+    @pytest.mark.parametrize(
+        ("content_type", "extracted_text", "expected_start", "expected_tail"),
+        [
+            ("math_problem", "", "Я вижу математическую задачу по теме 'fractions'", None),
+            ("diagram", "A -> B", "Отличная схема! 📊", "Обрати внимание на: arrows"),
+            ("text", "Once upon a time", "Полезный текст! 📝", "Можем обсудить: a, b, c"),
+            ("unknown", "", "Интересное изображение! 🤔", "Обрати внимание на: arrows"),
+        ],
+    )
+    def test_generate_engaging_response_templates(
+        self, content_type, extracted_text, expected_start, expected_tail
+    ):
+        """Test that image replies are rendered from the content type template."""
+        with (
+            patch("core.message_processor.get_session_manager"),
+            patch("core.message_processor.get_prompt_store"),
+            patch("core.message_processor.get_llm_client"),
+            patch("core.message_processor._pick_phrase", side_effect=lambda seq: seq[0]),
+        ):
             from core.message_processor import UnifiedMessageProcessor
 
             processor = UnifiedMessageProcessor()
-            synthetic = processor._create_synthetic_message(
-                "Transcribed text", mock_message
+            result = processor._generate_engaging_response(
+                content_type,
+                extracted_text,
+                "math",
+                "fractions",
+                5,
+                [],
+                "medium",
+                "arrows",
+                ["a", "b", "c", "d"],
+                "high",
             )
 
-            assert synthetic.text == "Transcribed text"
-            assert synthetic.voice is None
-            assert synthetic.photo is None
-            assert synthetic.document is None
-            assert synthetic.content_type == "text"
+            assert result.startswith(expected_start)
+            if extracted_text:
+                assert f"\n\n{extracted_text}\n\n" in result
+            if expected_tail:
+                assert result.endswith(expected_tail)
+
+    def test_pick_phrase_uses_every_phrase_before_repeating(self):
+        """Test that phrases are not repeated within one pass over a tuple."""
+        from core.message_processor import _pick_phrase
+
+        phrases = ("one", "two", "three")
+
+        first_pass = [_pick_phrase(phrases) for _ in phrases]
+        second_pass = [_pick_phrase(phrases) for _ in phrases]
+
+        assert sorted(first_pass) == sorted(phrases)
+        assert sorted(second_pass) == sorted(phrases)
@@ -0,0 +1,84 @@
+"""Tests for rate limiting of outgoing Telegram API calls."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+
+from bot.outbound_limiter import OutboundRateLimiter
+
+
+class TestOutboundRateLimiter:
+    """Test cases for OutboundRateLimiter class."""
+
+    @pytest.fixture
+    def clock(self):
+        """Patch monotonic time with a controllable clock."""
+        now = SimpleNamespace(value=100.0)
+        with patch(
+            "bot.outbound_limiter.time.monotonic", side_effect=lambda: now.value
+        ):
+            yield now
+
+    @pytest.fixture
+    def sleep(self):
+        """Patch asyncio.sleep so waits are recorded instead of taken."""
+        with patch(
+            "bot.outbound_limiter.asyncio.sleep", new_callable=AsyncMock
+        ) as mock:
+            yield mock
+
+    @pytest.mark.asyncio
+    async def test_calls_without_chat_pass_through(self, clock, sleep):
+        """Test that polling and file calls are not throttled."""
+        limiter = OutboundRateLimiter(global_rate=1, chat_rate=1, chat_burst=1)
+        make_request = AsyncMock(return_value="ok")
+        method = SimpleNamespace()
+
+        for _ in range(5):
+            assert await limiter(make_request, MagicMock(), method) == "ok"
+
+        sleep.assert_not_awaited()
+        assert make_request.await_count == 5
+
+    @pytest.mark.asyncio
+    async def test_chat_burst_then_throttled(self, clock, sleep):
+        """Test that a chat gets its burst at once and then waits per token."""
+        limiter = OutboundRateLimiter(global_rate=30, chat_rate=1, chat_burst=2)
+        make_request = AsyncMock(return_value="ok")
+        method = SimpleNamespace(chat_id=1)
+
+        for _ in range(3):
+            await limiter(make_request, MagicMock(), method)
+
+        sleep.assert_awaited_once_with(pytest.approx(1.0))
+
+    @pytest.mark.asyncio
+    async def test_chats_are_limited_separately(self, clock, sleep):
+        """Test that one busy chat does not delay another."""
+        limiter = OutboundRateLimiter(global_rate=30, chat_rate=1, chat_burst=1)
+        make_request = AsyncMock(return_value="ok")
+
+        await limiter(make_request, MagicMock(), SimpleNamespace(chat_id=1))
+        await limiter(make_request, MagicMock(), SimpleNamespace(chat_id=2))
+
+        sleep.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_retry_after_pauses_and_retries(self, clock, sleep):
+        """Test that a 429 response pauses sending for retry_after and retries."""
+        limiter = OutboundRateLimiter(global_rate=30, chat_rate=1, chat_burst=3)
+        method = SimpleNamespace(chat_id=1)
+        make_request = AsyncMock(
+            side_effect=[
+                TelegramRetryAfter(method=MagicMock(), message="Flood", retry_after=5),
+                "ok",
+            ]
+        )
+
+        result = await limiter(make_request, MagicMock(), method)
+
+        assert result == "ok"
+        assert make_request.await_count == 2
+        sleep.assert_awaited_once_with(pytest.approx(5.0))
@@ -1,12 +1,19 @@
 """Simple tests for persistence layer."""
 
 import tempfile
+from datetime import datetime, timedelta
 from unittest.mock import patch
 
 import pytest
+import pytest_asyncio
 
 from core.persistence.database import DatabaseManager, get_database_manager
-from core.persistence.models import Message, Session
+from core.persistence.models import Base, Message, Session
+from core.persistence.repositories import (
+    MediaFileRepository,
+    MessageRepository,
+    SessionRepository,
+)
 from core.persistence.session_adapter import PersistenceAdapter
 
 
@@ -88,6 +95,15 @@ class TestDatabaseManager:
             manager = DatabaseManager()
             return manager
 
+    @pytest_asyncio.fixture
+    async def initialized_db(self, db_manager):
+        """Create initialized database manager with the schema in place."""
+        await db_manager.initialize()
+        async with db_manager.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        yield db_manager
+        await db_manager.close()
+
     @pytest.mark.asyncio
     async def test_database_initialization(self, db_manager):
         """Test database initialization."""
@@ -95,6 +111,193 @@ class TestDatabaseManager:
         assert db_manager.is_available
         await db_manager.close()
 
+    @pytest.mark.asyncio
+    async def test_database_uses_wal_journal(self, db_manager):
+        """Test that connections are configured for concurrent access."""
+        from sqlalchemy import text
+
+        await db_manager.initialize()
+        async with db_manager.engine.connect() as conn:
+            journal_mode = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+            synchronous = (await conn.execute(text("PRAGMA synchronous"))).scalar()
+        await db_manager.close()
+
+        assert journal_mode == "wal"
+        # 1 is NORMAL
+        assert synchronous == 1
+
+    @pytest.mark.asyncio
+    async def test_add_messages_keeps_order(self, initialized_db):
+        """Test that messages saved in one batch are read back in order."""
+        repo = MessageRepository()
+        repo.db_manager = initialized_db
+
+        saved = await repo.add_messages(
+            "chat",
+            [
+                {"role": "user", "content": "Question"},
+                {"role": "assistant", "content": "Answer"},
+            ],
+        )
+        messages = await repo.get_messages("chat")
+
+        assert saved
+        assert [(m["role"], m["content"]) for m in messages] == [
+            ("user", "Question"),
+            ("assistant", "Answer"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_get_message_count(self, initialized_db):
+        """Test that messages are counted per chat."""
+        repo = MessageRepository()
+        repo.db_manager = initialized_db
+
+        await repo.add_messages(
+            "chat",
+            [{"role": "user", "content": "a"}, {"role": "assistant", "content": "b"}],
+        )
+        await repo.add_messages("other", [{"role": "user", "content": "c"}])
+        counts = (
+            await repo.get_message_count("chat"),
+            await repo.get_message_count("other"),
+            await repo.get_message_count("empty"),
+        )
+
+        assert counts == (2, 1, 0)
+
+    @pytest.mark.asyncio
+    async def test_cleanup_old_sessions_removes_messages(self, initialized_db):
+        """Test that cleanup deletes old sessions together with their messages."""
+        session_repo = SessionRepository()
+        session_repo.db_manager = initialized_db
+        message_repo = MessageRepository()
+        message_repo.db_manager = initialized_db
+
+        async with initialized_db.session() as db_session:
+            db_session.add_all(
+                [
+                    Session(
+                        chat_id="old", updated_at=datetime.now() - timedelta(days=30)
+                    ),
+                    Session(chat_id="new", updated_at=datetime.now()),
+                ]
+            )
+            await db_session.commit()
+        await message_repo.add_messages("old", [{"role": "user", "content": "a"}])
+        await message_repo.add_messages("new", [{"role": "user", "content": "b"}])
+
+        deleted = await session_repo.cleanup_old_sessions(hours=24)
+        counts = (
+            await message_repo.get_message_count("old"),
+            await message_repo.get_message_count("new"),
+        )
+
+        assert deleted == 1
+        assert counts == (0, 1)
+
+    @pytest.mark.asyncio
+    async def test_save_session_inserts_then_updates(self, initialized_db):
+        """Test that saving an existing session updates it in place."""
+        repo = SessionRepository()
+        repo.db_manager = initialized_db
+
+        created = await repo.save_session({"chat_id": "chat", "topic": "math"})
+        updated = await repo.save_session(
+            {"chat_id": "chat", "topic": "space", "unknown_field": 1}
+        )
+        stored = await repo.get_session("chat")
+
+        assert created and updated
+        assert stored.topic == "space"
+        assert stored.scenario == "unknown"
+
+    @pytest.mark.asyncio
+    async def test_repository_call_releases_connection(self, initialized_db):
+        """Test that a connection is back in the pool once a call returns."""
+        repo = MessageRepository()
+        repo.db_manager = initialized_db
+
+        await repo.get_message_count("chat")
+        checked_out = initialized_db.engine.pool.checkedout()
+
+        assert checked_out == 0
+
+    @pytest.mark.asyncio
+    async def test_get_session_with_messages(self, initialized_db):
+        """Test that a session is loaded together with its recent messages."""
+        session_repo = SessionRepository()
+        session_repo.db_manager = initialized_db
+        message_repo = MessageRepository()
+        message_repo.db_manager = initialized_db
+
+        await session_repo.save_session({"chat_id": "chat", "topic": "math"})
+        await message_repo.add_messages(
+            "chat",
+            [{"role": "user", "content": "a"}, {"role": "assistant", "content": "b"}],
+        )
+        stored, messages = await session_repo.get_session_with_messages(
+            "chat", limit=1
+        )
+        missing = await session_repo.get_session_with_messages("other")
+
+        assert stored.topic == "math"
+        assert [m["content"] for m in messages] == ["b"]
+        assert missing == (None, [])
+
+    @pytest.mark.asyncio
+    async def test_add_media_files(self, initialized_db):
+        """Test adding a batch of media files at once."""
+        repo = MediaFileRepository()
+        repo.db_manager = initialized_db
+
+        rows = [
+            {
+                "chat_id": "chat",
+                "file_id": f"photo_{i}",
+                "file_type": "image",
+                "content_type": "image/jpeg",
+                "analysis_result": "{}",
+            }
+            for i in range(3)
+        ]
+        added = await repo.add_media_files(rows)
+        media_files = await repo.get_media_files("chat")
+
+        assert added
+        assert sorted(m["file_id"] for m in media_files) == [
+            "photo_0",
+            "photo_1",
+            "photo_2",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_save_session_state_stores_only_new_messages(self, initialized_db):
+        """Test that messages already stored are not written again."""
+        adapter = PersistenceAdapter()
+        adapter.db_manager = initialized_db
+        adapter.session_repo = SessionRepository()
+        adapter.session_repo.db_manager = initialized_db
+        adapter.message_repo = MessageRepository()
+        adapter.message_repo.db_manager = initialized_db
+
+        first = {"role": "user", "content": "a"}
+        second = {"role": "assistant", "content": "b"}
+        await adapter.save_session_state(
+            {"chat_id": "chat", "messages": [first], "persisted_message_count": 0}
+        )
+        saved = await adapter.save_session_state(
+            {
+                "chat_id": "chat",
+                "messages": [first, second],
+                "persisted_message_count": 1,
+            }
+        )
+        messages = await adapter.message_repo.get_messages("chat")
+
+        assert saved
+        assert [m["content"] for m in messages] == ["a", "b"]
+
     @pytest.mark.asyncio
     async def test_database_disabled(self):
         """Test database manager when database is disabled."""
@@ -0,0 +1,98 @@
+"""Tests for semantic response cache."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+
+from core.semantic_cache import SemanticCache
+
+
+class TestSemanticCache:
+    """Test cases for SemanticCache class."""
+
+    @pytest.fixture
+    def mock_settings(self):
+        """Mock settings for testing."""
+        with patch("core.semantic_cache.get_settings") as mock:
+            mock_settings = MagicMock()
+            mock_settings.openrouter_api_key = "test_api_key"
+            mock_settings.semantic_cache_enabled = True
+            mock_settings.embedding_model = "openai/text-embedding-3-small"
+            mock_settings.semantic_cache_threshold = 0.92
+            mock_settings.semantic_cache_ttl = 3600
+            mock_settings.semantic_cache_max_entries = 10
+            mock.return_value = mock_settings
+            yield mock_settings
+
+    @pytest.fixture
+    def cache(self, mock_settings):
+        """Create semantic cache for testing."""
+        return SemanticCache()
+
+    @staticmethod
+    def unit(*values):
+        """Build normalized float32 vector."""
+        vector = np.asarray(values, dtype=np.float32)
+        return vector / np.linalg.norm(vector)
+
+    def test_lookup_returns_similar_response(self, cache):
+        """Test that a close question in the same scope hits the cache."""
+        cache.store(self.unit(1.0, 0.0, 0.0), (5, "geography"), "Париж")
+
+        assert cache.lookup(self.unit(1.0, 0.1, 0.0), (5, "geography")) == "Париж"
+
+    def test_lookup_misses_below_threshold(self, cache):
+        """Test that dissimilar questions are not served from cache."""
+        cache.store(self.unit(1.0, 0.0, 0.0), (5, "geography"), "Париж")
+
+        assert cache.lookup(self.unit(1.0, 1.0, 0.0), (5, "geography")) is None
+
+    def test_lookup_is_scoped(self, cache):
+        """Test that entries don't leak across level/topic scopes."""
+        cache.store(self.unit(1.0, 0.0, 0.0), (5, "geography"), "Париж")
+
+        assert cache.lookup(self.unit(1.0, 0.0, 0.0), (2, "geography")) is None
+        assert cache.lookup(self.unit(1.0, 0.0, 0.0), (5, None)) is None
+
+    def test_expired_entries_are_evicted(self, cache):
+        """Test that entries past their TTL are dropped."""
+        with patch("core.semantic_cache.time.monotonic", return_value=0.0):
+            cache.store(self.unit(1.0, 0.0, 0.0), (5, "geography"), "Париж")
+
+        with patch("core.semantic_cache.time.monotonic", return_value=3600.0):
+            assert cache.lookup(self.unit(1.0, 0.0, 0.0), (5, "geography")) is None
+
+    def test_store_evicts_oldest_over_capacity(self, cache, mock_settings):
+        """Test that the cache size stays bounded."""
+        cache.max_entries = 2
+        cache.store(self.unit(1.0, 0.0, 0.0), (5, None), "first")
+        cache.store(self.unit(0.0, 1.0, 0.0), (5, None), "second")
+        cache.store(self.unit(0.0, 0.0, 1.0), (5, None), "third")
+
+        assert cache.lookup(self.unit(1.0, 0.0, 0.0), (5, None)) is None
+        assert cache.lookup(self.unit(0.0, 0.0, 1.0), (5, None)) == "third"
+
+    def test_is_cacheable_query(self, cache):
+        """Test that short context-dependent replies are not cached."""
+        assert cache.is_cacheable_query("Какая столица у Франции?")
+        assert not cache.is_cacheable_query("да")
+
+    @pytest.mark.asyncio
+    async def test_embed_normalizes_vector(self, cache):
+        """Test that embeddings are returned with unit length."""
+        response = MagicMock()
+        response.data = [MagicMock(embedding=[3.0, 4.0])]
+        cache.client.embeddings.create = AsyncMock(return_value=response)
+
+        vector = await cache.embed("Какая столица у Франции?")
+
+        assert vector.dtype == np.float32
+        np.testing.assert_allclose(vector, [0.6, 0.8], rtol=1e-6)
+
+    @pytest.mark.asyncio
+    async def test_embed_failure_returns_none(self, cache):
+        """Test that embedding errors don't break message processing."""
+        cache.client.embeddings.create = AsyncMock(side_effect=Exception("boom"))
+
+        assert await cache.embed("Какая столица у Франции?") is None
@@ -1,6 +1,7 @@
 """Tests for session state management."""
 
 from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
@@ -183,6 +184,19 @@ class TestSessionState:
         assert len(self.session.recent_messages) == 0
 
 
+    def test_to_dict_is_cached_until_modified(self):
+        """Test that to_dict reuses its result until the session changes."""
+        first = self.session.to_dict()
+        assert self.session.to_dict() is first
+
+        self.session.add_message("user", "Hello")
+        second = self.session.to_dict()
+        assert second is not first
+        assert [m["content"] for m in second["messages"]] == ["Hello"]
+
+        self.session.topic = "math"
+        assert self.session.to_dict()["topic"] == "math"
+
 class TestSessionManager:
     """Test cases for SessionManager class."""
 
@@ -285,6 +299,23 @@ class TestSessionManager:
         assert removed_count == 1
         assert "custom_age_chat" not in self.manager._sessions
 
+    @pytest.mark.asyncio
+    async def test_save_session_tracks_persisted_messages(self):
+        """Test that a successful save marks the saved messages as stored."""
+        adapter = MagicMock(is_available=True)
+        adapter.save_session_state = AsyncMock(return_value=True)
+        self.manager._persistence_adapter = adapter
+        session = SessionState("chat")
+        session.add_message("user", "Hello")
+
+        await self.manager.save_session(session)
+        session.add_message("assistant", "Hi")
+        await self.manager.save_session(session)
+
+        saved = [call.args[0] for call in adapter.save_session_state.await_args_list]
+        assert [s["persisted_message_count"] for s in saved] == [0, 1]
+        assert session.persisted_message_count == 2
+
 
 class TestGlobalSessionManager:
     """Test cases for global session manager."""
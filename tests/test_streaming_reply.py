@@ -0,0 +1,90 @@
+"""Tests for streamed Telegram replies."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from bot.streaming_reply import StreamingReply
+
+
+class TestStreamingReply:
+    """Test cases for StreamingReply class."""
+
+    @pytest.fixture
+    def message(self):
+        """Create mock incoming message."""
+        message = MagicMock()
+        message.answer = AsyncMock(return_value=MagicMock(edit_text=AsyncMock()))
+        return message
+
+    @pytest.mark.asyncio
+    async def test_first_update_sends_draft(self, message):
+        """Test that the first chunk is sent right away."""
+        reply = StreamingReply(message)
+
+        await reply.update("Hel")
+
+        message.answer.assert_awaited_once_with("Hel", parse_mode=None)
+        assert reply.started
+
+    @pytest.mark.asyncio
+    async def test_updates_are_throttled(self, message):
+        """Test that edits happen at most once per interval."""
+        reply = StreamingReply(message)
+        draft = message.answer.return_value
+
+        with patch("bot.streaming_reply.time.monotonic", side_effect=[10.0, 10.5, 11.2]):
+            await reply.update("Hel")
+            await reply.update("Hello")
+            await reply.update("Hello, world")
+
+        draft.edit_text.assert_awaited_once_with("Hello, world", parse_mode=None)
+
+    @pytest.mark.asyncio
+    async def test_partial_markup_is_sent_as_plain_text(self, message):
+        """Test that drafts with HTML special characters bypass the parse mode."""
+        reply = StreamingReply(message)
+        draft = message.answer.return_value
+
+        with patch("bot.streaming_reply.time.monotonic", side_effect=[10.0, 11.5]):
+            await reply.update("If x < 3 & y > 1, then <b")
+            await reply.update("If x < 3 & y > 1, then <b>x</b")
+
+        message.answer.assert_awaited_once_with(
+            "If x < 3 & y > 1, then <b", parse_mode=None
+        )
+        draft.edit_text.assert_awaited_once_with(
+            "If x < 3 & y > 1, then <b>x</b", parse_mode=None
+        )
+
+    @pytest.mark.asyncio
+    async def test_finish_edits_draft(self, message):
+        """Test that the final text replaces the draft."""
+        reply = StreamingReply(message)
+        await reply.update("Hello")
+        draft = message.answer.return_value
+
+        await reply.finish("<b>Hello</b>", parse_mode="HTML")
+
+        draft.edit_text.assert_awaited_once_with("<b>Hello</b>", parse_mode="HTML")
+
+    @pytest.mark.asyncio
+    async def test_finish_skips_unchanged_plain_text(self, message):
+        """Test that an identical plain-text edit is not sent."""
+        reply = StreamingReply(message)
+        await reply.update("Hello")
+        draft = message.answer.return_value
+
+        await reply.finish("Hello")
+
+        draft.edit_text.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_update_errors_are_logged(self, message):
+        """Test that Telegram errors don't abort generation."""
+        message.answer = AsyncMock(side_effect=Exception("Too Many Requests"))
+        reply = StreamingReply(message)
+
+        await reply.update("Hello")
+
+        assert not reply.started
@@ -0,0 +1,39 @@
+"""Tests for temporary file cleanup."""
+
+import os
+import time
+
+from core.temp_files import sweep_temp_dir
+
+
+class TestSweepTempDir:
+    """Test cases for sweep_temp_dir."""
+
+    def test_removes_only_stale_files(self, tmp_path):
+        """Test that old files are removed and recent ones are kept."""
+        stale = tmp_path / "stale.ogg"
+        fresh = tmp_path / "fresh.jpg"
+        stale.write_bytes(b"old")
+        fresh.write_bytes(b"new")
+        old_time = time.time() - 3600
+        os.utime(stale, (old_time, old_time))
+
+        removed = sweep_temp_dir(tmp_path, max_age_seconds=600)
+
+        assert removed == 1
+        assert not stale.exists()
+        assert fresh.exists()
+
+    def test_skips_directories(self, tmp_path):
+        """Test that subdirectories are left alone."""
+        subdir = tmp_path / "nested"
+        subdir.mkdir()
+        old_time = time.time() - 3600
+        os.utime(subdir, (old_time, old_time))
+
+        assert sweep_temp_dir(tmp_path, max_age_seconds=600) == 0
+        assert subdir.exists()
+
+    def test_missing_directory(self, tmp_path):
+        """Test that a missing temp directory is not an error."""
+        assert sweep_temp_dir(tmp_path / "missing") == 0